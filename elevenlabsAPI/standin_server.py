@@ -0,0 +1,199 @@
+# standin_server.py
+
+import os
+import re
+import sys
+import json
+import time
+import array
+import random
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from colorama import Fore, Style
+
+BASE_DIR = Path(__file__).parent.parent
+# Any recorded narration works; the stand-in ignores the requested text
+DEFAULT_CLIP = next(iter(sorted(BASE_DIR.glob("games/*/audio/starting_description_*.mp3"))), None)
+
+TTS_ROUTE = re.compile(r"^/v1/text-to-speech/(?P<voice_id>[^/]+)(?P<stream>/stream)?$")
+SFX_ROUTE = "/v1/sound-generation"
+
+
+def _pcm_22050_mono(clip_path: Path) -> bytes:
+    """Decodes a clip to 16-bit 22050 Hz mono (the 'pcm_22050' output format)."""
+    import pygame
+    if not pygame.mixer.get_init():
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.mixer.init(44100, -16, 2)
+    frequency, _, channels = pygame.mixer.get_init()
+    samples = array.array('h', pygame.mixer.Sound(str(clip_path)).get_raw())
+    # Left channel, every (frequency / 22050)th frame: crude, but it's a stand-in
+    step = channels * max(1, frequency // 22050)
+    return samples[0::step].tobytes()
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    """Doesn't print a traceback when a client drops a keep-alive connection."""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class FaultInjector:
+    """
+    Answers a reproducible share of a stand-in's requests with 429 (and a
+    Retry-After header) or 500 instead of the real response.
+    """
+
+    def __init__(self, error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: int = 0):
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.errors = 0
+        self.throttled = 0
+
+    def maybe_fail(self, handler: BaseHTTPRequestHandler) -> bool:
+        """Sends a failure on `handler` (whose request body was read) if this request draws one."""
+        with self.lock:
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                status, message = 429, "too_many_concurrent_requests"
+                self.throttled += 1
+            elif roll < self.throttle_rate + self.error_rate:
+                status, message = 500, "internal_error"
+                self.errors += 1
+            else:
+                return False
+        body = json.dumps({"error": {"code": status, "message": message, "status": message.upper()}}).encode()
+        handler.send_response(status)
+        if status == 429:
+            handler.send_header("Retry-After", f"{self.retry_after:g}")
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+        return True
+
+
+class ElevenLabsStandIn:
+    """
+    A local HTTP server that answers ElevenLabs text-to-speech requests with a
+    recorded clip, for testing the TTS pipeline offline.
+
+        POST /v1/text-to-speech/<voice>          the whole MP3, after the simulated synthesis time
+        POST /v1/text-to-speech/<voice>/stream   chunked audio as it is "synthesized"
+                                                 (?output_format=pcm_22050 for raw PCM, MP3 otherwise)
+        POST /v1/sound-generation                the whole MP3, as a sound effect
+
+    Synthesis runs `speed` times faster than real time and the first byte comes
+    after `first_byte_latency` seconds. `error_rate` and `throttle_rate` make a
+    share of the requests fail with 500 or 429 (see FaultInjector).
+    """
+
+    def __init__(self, clip_path=None, speed: float = 2.0, first_byte_latency: float = 0.3,
+                 chunk_bytes: int = 4096, host: str = "127.0.0.1", port: int = 0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0, seed: int = 0):
+        self.clip_path = Path(clip_path) if clip_path else DEFAULT_CLIP
+        if not self.clip_path or not self.clip_path.exists():
+            raise FileNotFoundError(f"Stand-in clip not found: {self.clip_path}")
+        self.speed = speed
+        self.first_byte_latency = first_byte_latency
+        self.chunk_bytes = chunk_bytes
+        self.mp3 = self.clip_path.read_bytes()
+        self.pcm = _pcm_22050_mono(self.clip_path)
+        self.duration = len(self.pcm) / (22050 * 2)
+        self.requests = 0
+        self.connections = 0  # fewer than requests when clients keep connections alive
+        self.faults = FaultInjector(error_rate, throttle_rate, retry_after, seed)
+        self.server = StandInHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serves on a background thread; returns the base URL to use instead of the API's."""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"{Style.DIM}ElevenLabs stand-in on {self.url} ({self.clip_path.name}, "
+              f"{self.duration:.1f} s at {self.speed}x){Style.RESET_ALL}")
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                standin.connections += 1
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                match = TTS_ROUTE.match(url.path)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not match and url.path != SFX_ROUTE:
+                    self.send_error(404)
+                    return
+                standin.requests += 1
+                if standin.faults.maybe_fail(self):
+                    return
+                output_format = parse_qs(url.query).get("output_format", ["mp3_44100_128"])[0]
+                body = standin.pcm if output_format.startswith("pcm_") else standin.mp3
+                content_type = "audio/pcm" if output_format.startswith("pcm_") else "audio/mpeg"
+
+                if not match or not match.group("stream"):
+                    time.sleep(standin.first_byte_latency + standin.duration / standin.speed)
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                time.sleep(standin.first_byte_latency)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                # Pace the chunks like a synthesizer running `speed` times faster than real time
+                seconds_per_byte = standin.duration / len(body) / standin.speed
+                try:
+                    for offset in range(0, len(body), standin.chunk_bytes):
+                        chunk = body[offset:offset + standin.chunk_bytes]
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                        self.wfile.flush()
+                        time.sleep(len(chunk) * seconds_per_byte)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    server = ElevenLabsStandIn()
+    server.start()
+    print(f"{Fore.GREEN}Set ELEVEN_API_URL={server.url} to use it. Ctrl+C to stop.{Style.RESET_ALL}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
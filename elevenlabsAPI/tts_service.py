@@ -1,23 +1,58 @@
 # tts_service.py
 
 import os
+import sys
+import wave
 import requests
 from dotenv import load_dotenv
 import colorama
 from colorama import Fore, Style
 from elevenlabsAPI.elevenlabs_manager import ElevenLabsClient
 from hardware.filename_service import FileNameService
+from hardware.api_client import get_client
+from elevenlabsAPI.tts_store import TTSStore
+
+# hardware/ modules import audio_transcoder flat; importing it as hardware.audio_transcoder
+# would load a second copy of the module
+HARDWARE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hardware')
+if HARDWARE_DIR not in sys.path:
+    sys.path.append(HARDWARE_DIR)
+
+from audio_transcoder import NativeClipWriter, PcmConverter, native_path, sidecar_path
 
 colorama.init(autoreset=True)
 
 # Load environment variables
 load_dotenv()
 
+# Override (e.g. with the local stand-in, see standin_server.py) to run without the real API
+ELEVEN_API_URL = os.getenv("ELEVEN_API_URL", "https://api.elevenlabs.io")
+
+MODEL_ID = "eleven_multilingual_v2"
+DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+
+# Streaming asks for raw PCM: the mixer can't decode a half-downloaded MP3,
+# and 22050 Hz upsamples exactly to the mixer's 44100 Hz
+STREAM_OUTPUT_FORMAT = "pcm_22050"
+STREAM_SAMPLE_RATE = 22050
+STREAM_CHUNK_BYTES = 4096
+STREAM_TIMEOUT = (10, 30)  # (connect, between chunks) in seconds
+DOWNLOAD_CHUNK_BYTES = 16384
+
 class TTSService: # Renamed from AudioService for clarity
-    def __init__(self, base_dir: str, default_voice_id="2EiwWnXFnvU5JabPnv8n"):
+    def __init__(self, base_dir: str, default_voice_id="2EiwWnXFnvU5JabPnv8n", api_url: str = None,
+                 store: TTSStore = None):
         self.eleven_client = ElevenLabsClient()
         self.file_service = FileNameService(base_dir) # <--- Use the central file service
         self.default_voice_id = default_voice_id
+        self.api_url = (api_url or ELEVEN_API_URL).rstrip("/")
+        # The process-wide ElevenLabs client: keep-alive connections, concurrency and
+        # rate limits, timeouts and retries (shared with every other TTS/SFX service)
+        self.client = get_client("elevenlabs")
+        self.max_concurrent_requests = self.client.max_concurrent
+        self.headers = {"xi-api-key": self.eleven_client.api_key or ""}
+        # Identical text is only synthesized once, across all games
+        self.store = store if store else TTSStore()
     
     def generate_and_save_audio(self, text, file_name, game_name, voice_id=None):
         if not self.eleven_client.is_ready():
@@ -34,40 +69,181 @@ class TTSService: # Renamed from AudioService for clarity
         if not os.path.exists(game_audio_dir):
              os.makedirs(game_audio_dir) # Create folder via os, but use service path
 
-        print(f"{Fore.CYAN}Connecting to ElevenLabs API for TTS: '{game_name}'...{Style.RESET_ALL}")
+        key = self.store.key(text, voice_id, MODEL_ID, DEFAULT_OUTPUT_FORMAT)
+        hit, token = self.store.lookup(key, {".mp3": file_path})
+        if hit:
+            print(f"{Fore.GREEN}Audio reused from the TTS store: {file_path}{Style.RESET_ALL}")
+            return file_path
+
+        # Waiters for this key are released on every way out, not just a failed request
+        stored = False
+        try:
+            if not self._download(text, voice_id, file_path, file_name):
+                return None
+            self.store.put(key, {".mp3": file_path}, token)
+            stored = True
+        finally:
+            if not stored:
+                self.store.abandon(key, token)
+        print(f"{Fore.GREEN}Audio saved: {file_path}{Style.RESET_ALL}")
+        return file_path
+
+    def prefetch_audio(self, text, voice_id=None) -> bool:
+        """
+        Synthesizes `text` into the TTS store only, before the game it belongs to
+        exists (e.g. while Gemini is still writing it). The game's clip later is a
+        store hit, or waits for this request if it is still running.
+
+        Returns:
+            bool: True if the clip is in the store.
+        """
+        if not self.eleven_client.is_ready() or not text:
+            return False
+        voice_id = voice_id if voice_id else self.default_voice_id
+        key = self.store.key(text, voice_id, MODEL_ID, DEFAULT_OUTPUT_FORMAT)
+        # Downloaded next to the store, linked into it, then dropped (the store keeps its link)
+        scratch_dir = self.store.store_dir / "prefetch"
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+        scratch_path = scratch_dir / f"{key}.mp3"
+        hit, token = self.store.lookup(key, {".mp3": scratch_path})
+        if hit:
+            scratch_path.unlink(missing_ok=True)
+            return True
+        stored = False
+        try:
+            print(f"{Fore.CYAN}Prefetching TTS: '{text[:40]}...'{Style.RESET_ALL}")
+            if not self._download(text, voice_id, str(scratch_path), f"prefetch {key[:12]}"):
+                return False
+            self.store.put(key, {".mp3": scratch_path}, token)
+            stored = True
+            return True
+        finally:
+            if not stored:
+                self.store.abandon(key, token)
+            scratch_path.unlink(missing_ok=True)
+
+    def _download(self, text, voice_id, file_path, label) -> bool:
+        """Synthesizes `text` into file_path (through a partial file); False if the request failed."""
+        print(f"{Fore.CYAN}Connecting to ElevenLabs API for TTS: '{label}'...{Style.RESET_ALL}")
         
-        # Use the official client's methods or stick to direct requests if preferred
-        api_url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        headers = {
-             "Content-Type": "application/json",
-             "xi-api-key": self.eleven_client.api_key # Use the shared key
-        }
+        api_url = f"{self.api_url}/v1/text-to-speech/{voice_id}"
         data = {
              "text": text,
-             "model_id": "eleven_multilingual_v2"
+             "model_id": MODEL_ID
         }
 
+        # The body goes to a partial file in chunks; only a complete clip replaces file_path
+        partial_path = file_path + ".part"
         try:
-            response = requests.post(api_url, json=data, headers=headers)
-            response.raise_for_status()
-            print(f"{Fore.GREEN}Successfully received audio stream.{Style.RESET_ALL}")
-            audio_data = response.content
+            with self.client.request("POST", api_url, params={"output_format": DEFAULT_OUTPUT_FORMAT},
+                                     json=data, headers=self.headers, stream=True) as response:
+                response.raise_for_status()
+                with open(partial_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                        f.write(chunk)
+            os.replace(partial_path, file_path)
+            return True
         except requests.exceptions.HTTPError as err:
-            print(f"{Fore.RED}HTTP Error: {err}{Style.RESET_ALL}")
-            return None
+            print(f"{Fore.RED}HTTP Error ({label}): {err}{Style.RESET_ALL}")
+            return False
         except requests.exceptions.RequestException as err:
-            print(f"{Fore.RED}Request Error: {err}{Style.RESET_ALL}")
+            print(f"{Fore.RED}Request Error ({label}): {err}{Style.RESET_ALL}")
+            return False
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def stream_and_save_audio(self, text, file_name, game_name, voice_id=None, stream=None):
+        """
+        Like generate_and_save_audio, but reads the response as it is synthesized:
+        every chunk is converted to the mixer's format, written to the clip's native
+        WAV (with its sidecar, as the AudioTranscoder would) and, if given, fed to
+        `stream` (an AudioStream the SoundController is already playing).
+        No MP3 is kept; playback resolves the WAV through playable_path().
+
+        Returns:
+            str: The path of the saved WAV, or None if the request failed.
+        """
+        if not self.eleven_client.is_ready():
+            if stream:
+                stream.close(error="TTS not available")
             return None
 
-        # Save audio to the specified game directory
+        voice_id = voice_id if voice_id else self.default_voice_id
         game_audio_dir = self.file_service.get_audio_folder_path(game_name)
         file_path = os.path.join(game_audio_dir, file_name)
+        if not os.path.exists(game_audio_dir):
+             os.makedirs(game_audio_dir)
 
-        print(f"{Fore.CYAN}Saving audio to: {file_path}{Style.RESET_ALL}")
-        with open(file_path, 'wb') as f:
-            f.write(audio_data)
-        print(f"{Fore.GREEN}Audio saved successfully.{Style.RESET_ALL}")
-        return file_path
+        saved_path = str(native_path(file_path))
+        key = self.store.key(text, voice_id, MODEL_ID, STREAM_OUTPUT_FORMAT)
+        hit, token = self.store.lookup(key, {".wav": saved_path, ".meta.json": sidecar_path(file_path)})
+        if hit:
+            print(f"{Fore.GREEN}Audio reused from the TTS store: {saved_path}{Style.RESET_ALL}")
+            if stream:
+                self._replay(saved_path, stream)
+            return saved_path
+
+        print(f"{Fore.CYAN}Streaming TTS from ElevenLabs: '{file_name}'...{Style.RESET_ALL}")
+        api_url = f"{self.api_url}/v1/text-to-speech/{voice_id}/stream"
+        data = {
+             "text": text,
+             "model_id": MODEL_ID
+        }
+
+        writer = None
+        stored = False
+        try:
+            converter = PcmConverter(STREAM_SAMPLE_RATE, 1)
+            writer = NativeClipWriter(file_path)
+            with self.client.request("POST", api_url, params={"output_format": STREAM_OUTPUT_FORMAT},
+                                     json=data, headers=self.headers, stream=True,
+                                     timeout=STREAM_TIMEOUT) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+                    pcm = converter.convert(chunk)
+                    writer.write(pcm)
+                    if stream:
+                        stream.write(pcm)
+            pcm = converter.flush()
+            writer.write(pcm)
+            if stream:
+                stream.write(pcm)
+
+            info = writer.close()
+            self.store.put(key, {".wav": saved_path, ".meta.json": sidecar_path(file_path)}, token)
+            stored = True
+            if stream:
+                stream.close()
+        except Exception as err:
+            # Whatever failed (request, conversion, disk), the player must not wait
+            # for a stream that never ends, nor find a half-written clip
+            print(f"{Fore.RED}Streaming Error: {err}{Style.RESET_ALL}")
+            if writer:
+                writer.abort()
+            if stream:
+                stream.close(error=err)
+            return None
+        finally:
+            if not stored:
+                self.store.abandon(key, token)
+        print(f"{Fore.GREEN}Streamed audio saved: {saved_path} ({info['duration']:.1f} s).{Style.RESET_ALL}")
+        return saved_path
+
+    @staticmethod
+    def _replay(wav_path, stream):
+        """Feeds an already stored clip into `stream`, as if it was being downloaded."""
+        try:
+            with wave.open(str(wav_path), 'rb') as f:
+                while True:
+                    frames = f.readframes(STREAM_CHUNK_BYTES)
+                    if not frames:
+                        break
+                    stream.write(frames)
+        except (OSError, wave.Error) as err:
+            stream.close(error=err)
+            return
+        stream.close()
 
 if __name__ == "__main__":
     # Example Usage for testing
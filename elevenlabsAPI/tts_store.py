@@ -0,0 +1,162 @@
+# tts_store.py
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from colorama import Fore, Style
+
+BASE_DIR = Path(__file__).parent.parent
+STORE_DIR = BASE_DIR / "tts_store"
+# Least recently used clips are dropped beyond this (game folders keep their hardlinked copies)
+DEFAULT_MAX_MB = int(os.getenv("TTS_STORE_MAX_MB", "512"))
+# A caller waiting longer than this for another request's clip produces it itself
+WAIT_TIMEOUT = float(os.getenv("TTS_STORE_WAIT_TIMEOUT", "120"))
+
+
+def _link(source: Path, destination: Path):
+    """Hardlinks `source` to `destination` (replacing it), copying if the filesystem can't link."""
+    if destination.exists() and os.path.samefile(source, destination):
+        return
+    tmp_path = destination.with_name(destination.name + ".link.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class TTSStore:
+    """
+    A content-addressed store of synthesized audio shared by every game: a clip is
+    keyed by a hash of what determines its sound (text, voice, model and output
+    format), so identical text is synthesized once and hardlinked into each game's
+    audio folder. Concurrent requests for the same key wait for the first one.
+    """
+
+    def __init__(self, store_dir=STORE_DIR, max_mb: float = DEFAULT_MAX_MB, wait_timeout: float = WAIT_TIMEOUT):
+        self.store_dir = Path(store_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.wait_timeout = wait_timeout
+        self.lock = threading.Lock()
+        self.producing = {}  # key -> threading.Event set once its producer stored or abandoned it
+        self.total_bytes = None  # running size of the store; None until the first prune() scanned it
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, output_format: str) -> str:
+        # Whitespace doesn't change the speech, so it doesn't change the key either
+        normalized = " ".join(text.split())
+        material = json.dumps([normalized, voice_id, model_id, output_format], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.store_dir / key[:2] / f"{key}{suffix}"
+
+    def _touch(self, path: Path):
+        # LRU order is kept in atime; mtime is shared with the hardlinked game files
+        # (the AudioTranscoder compares it), so it is left alone
+        stat = path.stat()
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def lookup(self, key: str, destinations: dict) -> tuple[bool, object]:
+        """
+        Links the stored files of `key` ({suffix: destination path}) into place.
+
+        Returns:
+            tuple: (hit, token). On a miss the caller now produces the clip and must
+            call put() or abandon() with the token; other callers asking for it wait
+            until then, or for at most wait_timeout seconds, after which they get a
+            miss too (with a token that doesn't release the stuck producer's waiters).
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            with self.lock:
+                pending = self.producing.get(key)
+                if pending is None:
+                    stored = [self._path(key, suffix) for suffix in destinations]
+                    if all(path.exists() for path in stored):
+                        for path, destination in zip(stored, destinations.values()):
+                            _link(path, Path(destination))
+                            self._touch(path)
+                        self.hits += 1
+                        return True, None
+                    token = self.producing[key] = threading.Event()
+                    self.misses += 1
+                    return False, token
+            if not pending.wait(max(0.0, deadline - time.monotonic())):
+                # The producer is stuck: don't hang with it, produce the clip here as well
+                print(f"{Fore.YELLOW}TTS store: gave up waiting for {key[:12]}...{Style.RESET_ALL}")
+                with self.lock:
+                    self.misses += 1
+                return False, threading.Event()
+
+    def put(self, key: str, sources: dict, token):
+        """Stores freshly produced files ({suffix: path}) under `key` (token: from lookup())."""
+        added = 0
+        try:
+            for suffix, source in sources.items():
+                path = self._path(key, suffix)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                replaced = path.stat().st_size if path.exists() else 0
+                _link(Path(source), path)
+                self._touch(path)
+                added += path.stat().st_size - replaced
+        finally:
+            self.abandon(key, token)
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes += added
+            over_cap = self.total_bytes is None or self.total_bytes > self.max_bytes
+        if over_cap:
+            self.prune()
+
+    def abandon(self, key: str, token):
+        """Releases callers waiting for a key that won't be produced (e.g. the request failed)."""
+        with self.lock:
+            # Only the producer that registered the key releases it
+            if self.producing.get(key) is token:
+                del self.producing[key]
+        token.set()
+
+    def prune(self):
+        """
+        Drops the least recently used clips until the store fits its size cap. Scans
+        the whole store, so put() only calls it once the running total is over the cap.
+        """
+        with self.lock:
+            entries = {}
+            for path in self.store_dir.glob("*/*"):
+                if path.name.endswith(".tmp"):
+                    continue
+                stat = path.stat()
+                key = path.name.split(".", 1)[0]
+                used, size = entries.get(key, (0, 0))
+                entries[key] = (max(used, stat.st_atime_ns), size + stat.st_size)
+            total = sum(size for _, size in entries.values())
+            for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+                if total <= self.max_bytes:
+                    break
+                if key in self.producing:
+                    continue
+                for path in self.store_dir.glob(f"{key[:2]}/{key}.*"):
+                    path.unlink(missing_ok=True)
+                total -= size
+                print(f"{Style.DIM}TTS store: dropped {key[:12]}...{Style.RESET_ALL}")
+            self.total_bytes = total
+
+    def report(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+if __name__ == "__main__":
+    store = TTSStore()
+    files = [path for path in store.store_dir.glob("*/*") if not path.name.endswith(".tmp")]
+    size = sum(path.stat().st_size for path in files)
+    print(f"{Fore.BLUE}TTS store {store.store_dir}: {len(files)} files, {size / (1024 * 1024):.1f} MB "
+          f"of {store.max_bytes / (1024 * 1024):.0f} MB.{Style.RESET_ALL}")
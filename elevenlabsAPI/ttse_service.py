@@ -1,7 +1,11 @@
 # ttse_service.py (Fully Updated)
 
 import os
+import re
+import json
 import colorama
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 # Note: We need to import load_dotenv, ElevenLabs, and requests if using them directly, 
 # but we will rely on elevenlabs_client to handle the setup/key/client object.
 from dotenv import load_dotenv # Needed for initialization if not handled in elevenlabs_client
@@ -15,7 +19,9 @@ colorama.init(autoreset=True)
 # --- IMPORTS FOR MODULARITY ---
 # Assuming these modules are accessible in your environment
 from elevenlabsAPI.elevenlabs_manager import ElevenLabsClient 
-from filename_service import FileNameService 
+from hardware.filename_service import FileNameService
+from hardware.api_client import get_client
+from elevenlabsAPI.tts_store import TTSStore
 # ------------------------------
 
 # Define base directories and load environment variables
@@ -24,8 +30,43 @@ from filename_service import FileNameService
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv() # Ensure .env is loaded
 
+# Override (e.g. with a local stand-in) to run without the real API
+ELEVEN_API_URL = os.getenv("ELEVEN_API_URL", "https://api.elevenlabs.io")
+DOWNLOAD_CHUNK_BYTES = 16384
+
+# Sound effects are shared by every game like TTS clips: one content-addressed library,
+# hardlinked into each game's sound_effects folder
+SFX_LIBRARY_DIR = Path(BASE_DIR) / "sfx_library"
+SFX_LIBRARY_MAX_MB = int(os.getenv("SFX_LIBRARY_MAX_MB", "256"))
+# Stands in for the voice/model part of the library key
+SFX_KEY_SOURCE = "sound-generation"
+SFX_OUTPUT_FORMAT = "mp3"
+
+def normalize_sfx_prompt(prompt: str) -> str:
+    """'  Creaking  Door. ' -> 'creaking door': spelling variants of one sound share a library entry."""
+    return " ".join(prompt.lower().split()).strip(" .!,;:")
+
+def cue_prompt(audio_cue: str) -> str:
+    """The sound effect prompt an audio_cue file name describes ('clock_chime.mp3' -> 'clock chime')."""
+    return normalize_sfx_prompt(re.sub(r"[_\-]+", " ", Path(audio_cue).stem))
+
+def collect_audio_cues(game_data: dict) -> dict:
+    """
+    Returns a game's audio cues as {file name: prompt}, once each. Cues that are
+    not plain file names (e.g. 'sfx/boom.mp3') are left out.
+    """
+    cues = {}
+    for path in game_data.get("paths", []):
+        audio_cue = (path.get("audio_cue") or "").strip()
+        if not audio_cue or Path(audio_cue).name != audio_cue:
+            continue
+        prompt = cue_prompt(audio_cue)
+        if prompt:
+            cues.setdefault(audio_cue, prompt)
+    return cues
+
 class TTSEService:
-    def __init__(self):
+    def __init__(self, base_dir: str = None, api_url: str = None, library: TTSStore = None):
         # 1. Initialize the shared API client
         self.eleven_client_wrapper = ElevenLabsClient()
         
@@ -33,7 +74,16 @@ class TTSEService:
         self.elevenlabs = self.eleven_client_wrapper.client 
         
         # 3. Initialize the shared file service
-        self.file_service = FileNameService(BASE_DIR) 
+        self.file_service = FileNameService(base_dir or BASE_DIR) 
+
+        # 4. Requests go through the process-wide ElevenLabs client (limits, timeouts, retries)
+        self.client = get_client("elevenlabs")
+        self.max_concurrent_requests = self.client.max_concurrent
+        self.api_url = (api_url or ELEVEN_API_URL).rstrip("/")
+        self.headers = {"xi-api-key": self.eleven_client_wrapper.api_key or ""}
+
+        # 5. The same sound (by normalized prompt) is only generated once, across all games
+        self.library = library if library else TTSStore(SFX_LIBRARY_DIR, SFX_LIBRARY_MAX_MB)
         
         # Check if the client is ready
         if not self.eleven_client_wrapper.is_ready():
@@ -46,6 +96,8 @@ class TTSEService:
     def generate_and_save_sound_effect(self, prompt, file_name, game_name):
         """
         Generates a sound effect from a text prompt and saves it with a specified filename.
+        The prompt is normalized first; a sound already in the library is linked
+        instead of generated again, and concurrent requests for it wait for the first.
         
         Args:
             prompt (str): The text description of the sound effect.
@@ -60,60 +112,97 @@ class TTSEService:
             return None
         
         # 2. Build the full file path using the centralized service
-        game_folder_path = self.file_service.get_game_folder_path(game_name)
-        sound_effects_dir = os.path.join(game_folder_path, 'sound_effects')
+        sound_effects_dir = self.file_service.get_sound_effects_folder_path(game_name)
         file_path = os.path.join(sound_effects_dir, file_name)
 
         # 3. Ensure sound effects directory exists
         if not os.path.exists(sound_effects_dir):
             print(f"{Fore.YELLOW}Creating sound effects directory: {sound_effects_dir}{Style.RESET_ALL}")
-            os.makedirs(sound_effects_dir)
+            os.makedirs(sound_effects_dir, exist_ok=True)  # concurrent cues of one game may race here
 
         # 4. Check if the file already exists (caching)
         if os.path.exists(file_path):
             print(f"{Fore.GREEN}Sound effect '{file_name}' already exists. Using cached file.{Style.RESET_ALL}")
             return file_path
 
+        # 5. Look the sound up in the shared library
+        prompt = normalize_sfx_prompt(prompt)
+        key = self.library.key(prompt, SFX_KEY_SOURCE, SFX_KEY_SOURCE, SFX_OUTPUT_FORMAT)
+        hit, token = self.library.lookup(key, {".mp3": file_path})
+        if hit:
+            print(f"{Fore.GREEN}Sound effect '{file_name}' reused from the library.{Style.RESET_ALL}")
+            return file_path
+        stored = False
+        try:
+            if not self._download(prompt, file_path):
+                return None
+            self.library.put(key, {".mp3": file_path}, token)
+            stored = True
+        finally:
+            if not stored:
+                self.library.abandon(key, token)
+        print(f"{Fore.GREEN}Sound effect saved successfully: {file_path}{Style.RESET_ALL}")
+        return file_path
+
+    def generate_game_sound_effects(self, game_name: str) -> dict:
+        """
+        Generates every audio cue of a saved game, concurrently (up to the client's
+        request limit). Cues in the library are only linked.
+
+        Returns:
+            dict: {cue file name: saved path, or None if it failed}
+        """
+        try:
+            with open(self.file_service.get_game_json_path(game_name), 'r', encoding='utf-8') as f:
+                cues = collect_audio_cues(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"{Fore.RED}Error reading game '{game_name}': {e}{Style.RESET_ALL}")
+            return {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            saved = executor.map(lambda cue: self.generate_and_save_sound_effect(cues[cue], cue, game_name), cues)
+            return dict(zip(cues, saved))
+
+    def _download(self, prompt, file_path) -> bool:
+        """Generates `prompt` into file_path (through a partial file); False if the request failed."""
         print(f"{Fore.CYAN}Connecting to ElevenLabs API for sound effect: '{prompt}'...{Style.RESET_ALL}")
         
+        # Save the streamed audio data; only a complete file replaces file_path
+        partial_path = file_path + ".part"
         try:
-            # Call the ElevenLabs API using the client instance
-            audio_stream = self.elevenlabs.text_to_sound_effects.convert(text=prompt)
-            print(f"{Fore.GREEN}Successfully received audio stream for sound effect.{Style.RESET_ALL}")
-            
-            # 5. Save the streamed audio data
-            with open(file_path, 'wb') as f:
-                # The returned object from convert is a generator/iterable stream
-                for chunk in audio_stream:
-                    if chunk:
+            with self.client.request("POST", f"{self.api_url}/v1/sound-generation", json={"text": prompt},
+                                     headers=self.headers, stream=True) as response:
+                response.raise_for_status()
+                with open(partial_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
                         f.write(chunk)
-                        
-            print(f"{Fore.GREEN}Sound effect saved successfully: {file_path}{Style.RESET_ALL}")
-            return file_path
+            os.replace(partial_path, file_path)
+            return True
             
-        # Catch specific requests exceptions if the library throws them, or just a general one
+        # Catch specific requests exceptions, or just a general one
         except requests.exceptions.HTTPError as err:
             print(f"{Fore.RED}HTTP Error: {err}{Style.RESET_ALL}")
-            return None
+            return False
         except Exception as e:
             print(f"{Fore.RED}An unexpected error occurred during API call or saving: {e}{Style.RESET_ALL}")
-            return None
+            return False
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
             
+# Generate the audio cues of saved games (default: the whole catalog), from the repository root:
+# python -m elevenlabsAPI.ttse_service [game-name ...]
 if __name__ == "__main__":
-    # Example Usage for testing
+    import sys
     service = TTSEService()
-    
-    print(f"{Fore.BLUE}--- Running TTSE Service Test ---{Style.RESET_ALL}")
-    
-    # Test a new sound effect
-    test_sentence = "A large iron key turning in an old lock."
-    test_game_name = "test-game"
-    test_file_name = "test_key_lock.mp3"
-
-    saved_path = service.generate_and_save_sound_effect(
-        prompt=test_sentence,
-        file_name=test_file_name,
-        game_name=test_game_name
-    )
-    if saved_path:
-        print(f"{Fore.GREEN}Audio file saved at: {saved_path}{Style.RESET_ALL}")
\ No newline at end of file
+    games_dir = service.file_service.get_game_folder_path("")
+    game_names = sys.argv[1:] or sorted(name for name in os.listdir(games_dir)
+                                        if os.path.exists(service.file_service.get_game_json_path(name)))
+
+    print(f"{Fore.BLUE}--- Generating audio cues for {len(game_names)} game(s) ---{Style.RESET_ALL}")
+    failed = 0
+    for game_name in game_names:
+        saved = service.generate_game_sound_effects(game_name)
+        failed += sum(1 for path in saved.values() if not path)
+        print(f"{game_name}: {len(saved)} cue(s)")
+    print(f"{Fore.GREEN if not failed else Fore.YELLOW}Sound effect library: {service.library.report()}, "
+          f"{failed} failed.{Style.RESET_ALL}")
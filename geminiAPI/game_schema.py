@@ -0,0 +1,247 @@
+# game_schema.py
+
+import os
+import re
+import sys
+import json
+
+# The engine's vocabulary lives in hardware/, whose modules import each other flat
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HARDWARE_DIR = os.path.join(BASE_DIR, 'hardware')
+if HARDWARE_DIR not in sys.path:
+    sys.path.append(HARDWARE_DIR)
+
+from device_configs import DEVICE_CONFIGS, get_input_vocabulary
+from game_config_compiler import GameConfigCompiler, ACTUATOR_REGISTRY, split_hint_clues
+
+THEMES = ["aliens", "medieval knights", "wild west", "underwater", "pirates", "haunted house"]
+PATH_COUNT = 3
+MIN_STEPS = 2
+MAX_STEPS = 4
+MAX_TIME_LIMIT = 300
+
+# "paths[1].solution_sequence[0]: ..." -> path 1; anything else belongs to the story frame
+PROBLEM_PATH_INDEX = re.compile(r"^paths\[(\d+)\]")
+
+
+def _enum(values) -> dict:
+    return {"type": "string", "format": "enum", "enum": sorted(values)}
+
+
+def path_schema(device_configs: list[dict] = DEVICE_CONFIGS) -> dict:
+    """
+    The response schema of one path. Sensors, values, modes and colors are
+    restricted to what this box can actually produce and display; which value
+    belongs to which sensor can't be expressed in the schema and is checked by
+    validate_game().
+    """
+    vocabulary = get_input_vocabulary(device_configs)
+    light = ACTUATOR_REGISTRY["light"]
+    vibration = ACTUATOR_REGISTRY["vibration"]
+    return {
+        "type": "object",
+        "properties": {
+            "path_name": {"type": "string"},
+            "description": {"type": "string"},
+            "hint": {"type": "string"},
+            "solution_sequence": {
+                "type": "array",
+                "min_items": MIN_STEPS,
+                "max_items": MAX_STEPS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "sensor": _enum(vocabulary),
+                        "value": _enum(set().union(*vocabulary.values())),
+                    },
+                    "required": ["sensor", "value"],
+                },
+            },
+            "audio_cue": {"type": "string"},
+            "effects": {
+                "type": "array",
+                "min_items": 2,
+                "max_items": 2,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "actuator": _enum(ACTUATOR_REGISTRY),
+                        "mode": _enum(set(light["modes"]) | set(vibration["modes"])),
+                        "duration": {"type": "integer"},
+                        "color": _enum(color for color in light["colors"] if color != "off"),
+                    },
+                    "required": ["actuator", "mode"],
+                },
+            },
+            "time_limit": {"type": "integer"},
+            "death_text": {"type": "string"},
+        },
+        "required": ["path_name", "description", "hint", "solution_sequence", "audio_cue",
+                     "effects", "time_limit", "death_text"],
+    }
+
+
+def frame_schema() -> dict:
+    """The response schema of the story frame alone (the paths are generated separately)."""
+    return {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "starting_description": {"type": "string"},
+            "themes": {"type": "array", "min_items": 1, "max_items": 1, "items": _enum(THEMES)},
+        },
+        "required": ["title", "starting_description", "themes"],
+    }
+
+
+def sensor_focus(path_count: int = PATH_COUNT, device_configs: list[dict] = DEVICE_CONFIGS) -> list[list[str]]:
+    """
+    Deals the box's sensors out to the paths (e.g. [['button', 'rotary_encoder_number'],
+    ['distance_sensor', 'rotary_encoder_picture'], ['gyro']]), so paths generated
+    independently still use every sensor and differ from each other.
+    """
+    sensors = sorted(get_input_vocabulary(device_configs))
+    return [sensors[index::path_count] for index in range(path_count)]
+
+
+def game_schema(device_configs: list[dict] = DEVICE_CONFIGS) -> dict:
+    """The response schema of a whole game (the fields the engine and the audio generator read)."""
+    return {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "starting_description": {"type": "string"},
+            "themes": {"type": "array", "min_items": 1, "max_items": 1, "items": _enum(THEMES)},
+            "paths": {
+                "type": "array",
+                "min_items": PATH_COUNT,
+                "max_items": PATH_COUNT,
+                "items": path_schema(device_configs),
+            },
+        },
+        "required": ["title", "starting_description", "themes", "paths"],
+    }
+
+
+def repair_schema(path_indexes: list[int], frame: bool, device_configs: list[dict] = DEVICE_CONFIGS) -> dict:
+    """The schema of a repair answer: only the broken story fields and paths, keyed by index."""
+    properties, required = {}, []
+    if frame:
+        properties["title"] = {"type": "string"}
+        properties["starting_description"] = {"type": "string"}
+        required += ["title", "starting_description"]
+    for index in path_indexes:
+        properties[f"path_{index}"] = path_schema(device_configs)
+        required.append(f"path_{index}")
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def cross_path_problems(paths: list, device_configs: list[dict] = DEVICE_CONFIGS) -> list[str]:
+    """
+    Checks the paths against each other: distinct names (they name the audio
+    files) and solutions, and every sensor of the box used somewhere. Each
+    problem is blamed on one path, the one to regenerate.
+    """
+    problems = []
+    names, solutions, used = {}, {}, {}
+    for index, path in enumerate(paths):
+        if not isinstance(path, dict):
+            continue
+        where = f"paths[{index}]"
+        name = str(path.get("path_name", "")).strip().lower()
+        if name in names:
+            problems.append(f"{where}.path_name: same name as paths[{names[name]}]")
+        names.setdefault(name, index)
+        steps = path.get("solution_sequence")
+        if not isinstance(steps, list):
+            continue
+        solution = tuple((step.get("sensor"), step.get("value")) for step in steps if isinstance(step, dict))
+        if not all(isinstance(field, str) for step in solution for field in step):
+            # Wrong types are reported by the compiler (validate_game); they can't be compared here
+            continue
+        if solution in solutions:
+            problems.append(f"{where}.solution_sequence: same solution as paths[{solutions[solution]}]")
+        solutions.setdefault(solution, index)
+        for sensor, _ in solution:
+            used.setdefault(sensor, []).append(index)
+
+    missing = [sensor for sensor in sorted(get_input_vocabulary(device_configs)) if sensor not in used]
+    if missing and used:
+        # The path with the most steps on sensors other paths use as well can spare one
+        def spare_steps(index):
+            return sum(1 for users in used.values() for user in users if user == index and len(set(users)) > 1)
+        index = max(range(len(paths)), key=lambda i: (spare_steps(i), i))
+        problems.append(f"paths[{index}].solution_sequence: no path uses {', '.join(missing)}; "
+                        f"use {'it' if len(missing) == 1 else 'them'} in this path")
+    return problems
+
+
+def validate_game(data, compiler: GameConfigCompiler = None) -> list[str]:
+    """
+    Checks a generated game against what the engine will accept (the
+    GameConfigCompiler's sensor/actuator vocabulary) plus the generation rules
+    the schema can't enforce: the path count, 2-4 steps per path, one hint
+    clue per step, and the paths' consistency with each other
+    (cross_path_problems).
+
+    Returns:
+        list[str]: Problems, each starting with the field it concerns; empty if the game is fine.
+    """
+    problems = (compiler or GameConfigCompiler()).validate(data)
+    if not isinstance(data, dict):
+        return problems
+
+    paths = data.get("paths")
+    if isinstance(paths, list):
+        if len(paths) != PATH_COUNT:
+            problems.append(f"paths: expected {PATH_COUNT} paths, got {len(paths)}")
+        for index, path in enumerate(paths):
+            if not isinstance(path, dict):
+                continue
+            where = f"paths[{index}]"
+            steps = path.get("solution_sequence")
+            if isinstance(steps, list) and steps and not MIN_STEPS <= len(steps) <= MAX_STEPS:
+                problems.append(f"{where}.solution_sequence: expected {MIN_STEPS}-{MAX_STEPS} steps, got {len(steps)}")
+            if isinstance(steps, list) and isinstance(path.get("hint"), str):
+                clues = split_hint_clues(path["hint"])
+                if len(clues) != len(steps):
+                    problems.append(f"{where}.hint: expected one clue per step ({len(steps)}) separated by ' // ', "
+                                    f"got {len(clues)}")
+            time_limit = path.get("time_limit")
+            if isinstance(time_limit, (int, float)) and not isinstance(time_limit, bool) and time_limit > MAX_TIME_LIMIT:
+                problems.append(f"{where}.time_limit: at most {MAX_TIME_LIMIT} seconds, got {time_limit}")
+        problems += cross_path_problems(paths)
+    return problems
+
+
+def group_problems(problems: list[str]) -> tuple[dict, list[str]]:
+    """
+    Splits problems into those of individual paths and those of the story frame.
+
+    Returns:
+        tuple[dict, list[str]]: ({path index: [problems]}, [frame problems])
+    """
+    by_path, frame = {}, []
+    for problem in problems:
+        match = PROBLEM_PATH_INDEX.match(problem)
+        if match:
+            by_path.setdefault(int(match.group(1)), []).append(problem)
+        else:
+            frame.append(problem)
+    return by_path, frame
+
+
+# Check the games in the catalog: python geminiAPI/game_schema.py
+if __name__ == "__main__":
+    from colorama import Fore, Style
+    games_dir = os.path.join(BASE_DIR, 'games')
+    for game_name in sorted(os.listdir(games_dir)):
+        config_path = os.path.join(games_dir, game_name, f"{game_name}.json")
+        if not os.path.exists(config_path):
+            continue
+        with open(config_path, 'r', encoding='utf-8') as f:
+            game_problems = validate_game(json.load(f))
+        color = Fore.GREEN if not game_problems else Fore.YELLOW
+        print(f"{color}{game_name}: {len(game_problems)} problem(s){Style.RESET_ALL}")
+        for problem in game_problems:
+            print(f"    - {problem}")
@@ -1,10 +1,17 @@
 import google.generativeai as genai
 import os
 import json
-import codecs
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from google.api_core import exceptions as google_exceptions
 from dotenv import load_dotenv
 from colorama import Fore, Style
 from hardware.filename_service import FileNameService 
+from hardware.api_client import get_client, PROVIDERS, StreamInterrupted
+from geminiAPI.json_stream import IncrementalJSONParser
+from geminiAPI.game_schema import (game_schema, frame_schema, path_schema, repair_schema, validate_game,
+                                   group_problems, sensor_focus, PATH_COUNT, DEVICE_CONFIGS, get_input_vocabulary)
 
 # colorama.init(autoreset=True)
 
@@ -14,13 +21,60 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # AVAILABLE_GAMES_FILE = os.path.join(GAMES_DIR, 'available_games.txt')
 file_service = FileNameService(BASE_DIR)
 
+MODEL_NAME = 'gemini-2.5-flash'
+# Override (e.g. with the local stand-in, see standin_server.py) to run without the real API
+GEMINI_API_URL = os.getenv("GEMINI_API_URL")
+# Whole-game requests when the answer isn't JSON at all
+MAX_GENERATION_REQUESTS = 2
+# Repair requests for games that parse but fail validation
+MAX_REPAIR_REQUESTS = 2
+# Write the story frame first, then the paths concurrently from it (see _generate_parallel):
+# about frame + slowest path instead of the whole game, and a bad path is regenerated alone.
+# None: only when the Gemini rate limit admits the frame and every path without waiting
+# (the free tier's 10 requests per minute with bursts of 3 does not)
+PARALLEL_PATHS = None
+# Throttling and server-side hiccups are retried by the client layer; bad requests are not
+RETRYABLE_ERRORS = (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted,
+                    google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError,
+                    google_exceptions.DeadlineExceeded, google_exceptions.BadGateway,
+                    google_exceptions.GatewayTimeout)
+
+_model = None
+_model_lock = threading.Lock()
+
+def set_api_url(api_url: str | None) -> None:
+    """Points later requests at another endpoint (e.g. a local stand-in); None restores the real API."""
+    global GEMINI_API_URL, _model
+    with _model_lock:
+        GEMINI_API_URL = api_url
+        _model = None
+
+def _get_model():
+    """Configures the SDK and creates the model once per process; None without an API key."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            load_dotenv()
+            gemini_api_key = os.getenv('GEMINI_API_KEY')
+            if not gemini_api_key:
+                print(f"{Fore.RED}Error: GEMINI_API_KEY not found in .env file.{Style.RESET_ALL}")
+                return None
+            if GEMINI_API_URL:
+                # Only the REST transport can talk to a plain HTTP endpoint
+                genai.configure(api_key=gemini_api_key, transport="rest",
+                                client_options={"api_endpoint": GEMINI_API_URL})
+            else:
+                genai.configure(api_key=gemini_api_key)
+            _model = genai.GenerativeModel(MODEL_NAME)
+        return _model
+
 def _sanitize_game_name(title: str) -> str:
     """Converts a title into a file-safe, lowercase, hyphenated name."""
     # Convert to lowercase and replace spaces/non-alphanumeric chars with hyphens
     return title.lower().strip().replace(' ', '-').replace("'", "").replace(":", "").replace("!", "")
 
-def _register_new_game(game_name: str) -> None:
-    games_dir = file_service.get_game_folder_path("") # Gets the 'games' directory
+def register_new_game(game_name: str, target: FileNameService = None) -> None:
+    games_dir = (target if target else file_service).get_game_folder_path("") # Gets the 'games' directory
     available_games_file = os.path.join(games_dir, 'available_games.txt')
     """Adds the new game name to the available_games.txt file."""
     try:
@@ -35,22 +89,240 @@ def _register_new_game(game_name: str) -> None:
         print(f"{Fore.RED}Error registering game: {e}{Style.RESET_ALL}")
 
 
+def _request_json(model, prompt: str, schema: dict) -> dict | None:
+    """Sends one structured-output request; returns the parsed JSON object or None."""
+    started = time.monotonic()
+    try:
+        response = get_client("gemini").call(
+            model.generate_content, prompt,
+            generation_config=genai.GenerationConfig(response_mime_type="application/json", response_schema=schema),
+            request_options={"timeout": PROVIDERS["gemini"]["timeout"]},
+            retryable=RETRYABLE_ERRORS)
+        data = json.loads(response.text)
+    except json.JSONDecodeError as e:
+        print(f"{Fore.RED}Error: Gemini returned invalid JSON. Details: {e}{Style.RESET_ALL}")
+        return None
+    except Exception as e:
+        print(f"{Fore.RED}Error calling Gemini API: {e}{Style.RESET_ALL}")
+        return None
+    print(f"{Style.DIM}Gemini answered in {time.monotonic() - started:.1f} s.{Style.RESET_ALL}")
+    return data if isinstance(data, dict) else None
+
+def _stream_json(model, prompt: str, on_field, schema: dict = None) -> dict | None:
+    """
+    Sends one JSON-mode request and reads the answer as it is generated, calling
+    on_field(path, value) for every value as soon as it is complete (see
+    IncrementalJSONParser). Returns the parsed JSON object or None.
+    """
+    started = time.monotonic()
+    first_field = []
+    def _on_value(path, value):
+        if not first_field:
+            first_field.append(time.monotonic() - started)
+        on_field(path, value)
+    parser = IncrementalJSONParser(on_value=_on_value)
+    try:
+        # A schema makes Gemini write the properties in alphabetical order, and this SDK can't send
+        # propertyOrdering: fine for a frame or a path, but a whole game puts 'paths' first
+        # The request slot is held until the stream is read (or abandoned on invalid JSON)
+        with get_client("gemini").call(
+                model.generate_content, prompt, stream=True,
+                generation_config=genai.GenerationConfig(response_mime_type="application/json", response_schema=schema),
+                request_options={"timeout": PROVIDERS["gemini"]["timeout"]},
+                retryable=RETRYABLE_ERRORS) as response:
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:  # e.g. a final chunk carrying only the finish reason
+                    continue
+                parser.feed(text)
+        data = parser.close()
+    except json.JSONDecodeError as e:
+        print(f"{Fore.RED}Error: Gemini returned invalid JSON. Details: {e}{Style.RESET_ALL}")
+        return None
+    except StreamInterrupted as e:
+        # Fields read so far were already reported; the caller's retry reports them again
+        print(f"{Fore.RED}Error: Gemini's answer broke off after {e.chunks} chunk(s): {e.error}{Style.RESET_ALL}")
+        return None
+    except Exception as e:
+        print(f"{Fore.RED}Error calling Gemini API: {e}{Style.RESET_ALL}")
+        return None
+    if first_field:
+        print(f"{Style.DIM}Gemini's first field after {first_field[0]:.1f} s, "
+              f"the whole answer after {time.monotonic() - started:.1f} s.{Style.RESET_ALL}")
+    return data if isinstance(data, dict) else None
+
+def _request(model, prompt: str, schema: dict, on_field=None, field_prefix: tuple = ()) -> dict | None:
+    """A structured-output request, streamed if on_field is given (fields reported under field_prefix)."""
+    if not on_field:
+        return _request_json(model, prompt, schema)
+    return _stream_json(model, prompt, lambda path, value: on_field(field_prefix + path, value), schema)
+
+def _frame_prompt(prompt: str) -> str:
+    return prompt + f"""
+    For now, write only the overall story: "title", "starting_description" and "themes".
+    The {PATH_COUNT} paths are written afterwards, each on its own, from your story.
+    """
+
+def _path_prompt(prompt: str, frame: dict, index: int, focus: list[list[str]], problems: list[str] = None) -> str:
+    """Asks for one path of a written story frame, steering it to its share of the sensors."""
+    others = [sensor for other, sensors in enumerate(focus) if other != index for sensor in sensors]
+    text = prompt + f"""
+    The overall story is already written:
+    {json.dumps(frame, indent=2)}
+
+    Write only path {index + 1} of {PATH_COUNT}, as a single path object. The other paths are written separately
+    and mainly use {", ".join(others)}; so that every sensor gets used and no two paths share a solution,
+    this path's solution sequence must use {" and ".join(focus[index])}.
+    """
+    if problems:
+        text += "A previous version of this path was rejected:\n" + "\n".join(f"- {problem}" for problem in problems)
+    return text
+
+def _generate_path(model, prompt: str, frame: dict, index: int, focus: list[list[str]],
+                   problems: list[str] = None, on_field=None) -> dict | None:
+    for _ in range(MAX_GENERATION_REQUESTS):
+        path = _request(model, _path_prompt(prompt, frame, index, focus, problems), path_schema(),
+                        on_field, ("paths", index))
+        if path is not None:
+            return path
+    return None
+
+def _parallel_fits() -> bool:
+    """True if the Gemini client can send the frame and all paths without waiting for the rate limit."""
+    client = get_client("gemini")
+    return client.bucket.capacity >= 1 + PATH_COUNT and client.max_concurrent >= PATH_COUNT
+
+def _generate_parallel(model, prompt: str, on_field=None) -> dict | None:
+    """
+    Generates the story frame (title, starting_description, themes), then every
+    path from it concurrently, and assembles them. Paths failing validation on
+    their own or against each other (validate_game) are regenerated alone with
+    their problems, up to MAX_REPAIR_REQUESTS times; _repair_game deals with
+    whatever is left.
+
+    Returns:
+        dict: The assembled game, or None if the frame could not be generated.
+    """
+    frame = None
+    for _ in range(MAX_GENERATION_REQUESTS):
+        frame = _request(model, _frame_prompt(prompt), frame_schema(), on_field)
+        if frame is not None:
+            break
+    if frame is None:
+        return None
+
+    focus = sensor_focus()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=PATH_COUNT) as executor:
+        paths = list(executor.map(
+            lambda index: _generate_path(model, prompt, frame, index, focus, on_field=on_field), range(PATH_COUNT)))
+        print(f"{Style.DIM}{PATH_COUNT} paths generated in {time.monotonic() - started:.1f} s.{Style.RESET_ALL}")
+        data = {**frame, "paths": [path or {} for path in paths]}
+
+        for _ in range(MAX_REPAIR_REQUESTS):
+            path_problems, _ = group_problems(validate_game(data))
+            if not path_problems:
+                break
+            print(f"{Fore.CYAN}Regenerating path(s) {', '.join(str(index) for index in sorted(path_problems))}..."
+                  f"{Style.RESET_ALL}")
+            indexes = sorted(path_problems)
+            regenerated = executor.map(
+                lambda index: _generate_path(model, prompt, frame, index, focus, path_problems[index], on_field),
+                indexes)
+            for index, path in zip(indexes, regenerated):
+                if path is not None:
+                    data["paths"][index] = path
+    return data
+
+def _repair_prompt(data: dict, path_problems: dict, frame_problems: list[str]) -> str:
+    """Asks only for the broken parts, with the problems found and the values each sensor accepts."""
+    vocabulary = {sensor: sorted(values) for sensor, values in get_input_vocabulary(DEVICE_CONFIGS).items()}
+    broken = []
+    if frame_problems:
+        broken.append(f"The story frame (title and starting_description) has these problems:\n"
+                      + "\n".join(f"- {problem}" for problem in frame_problems))
+    for index, problems in sorted(path_problems.items()):
+        broken.append(f"Path {index} (return it as \"path_{index}\"):\n{json.dumps(data['paths'][index], indent=2)}\n"
+                      f"Problems:\n" + "\n".join(f"- {problem}" for problem in problems))
+    return f"""
+    You designed the puzzle box game "{data.get('title', '')}":
+    {data.get('starting_description', '')}
+
+    Some of its parts are not playable on the box. Fix only these parts, keeping the story and whatever already works:
+
+    {chr(10).join(broken)}
+
+    Each solution step's "value" must be one the step's "sensor" can produce:
+    {json.dumps(vocabulary)}
+    Each path needs 2 to 4 solution steps and a "hint" with exactly one clue per step, separated by " // ".
+    """
+
+def _repair_game(model, data: dict) -> dict | None:
+    """
+    Validates a generated game and sends repair requests for the broken paths
+    (and story fields) only, up to MAX_REPAIR_REQUESTS times.
+
+    Returns:
+        dict: The playable game, or None if it could not be repaired.
+    """
+    # The schema fixes the path count; should a path still be missing, it is "repaired" into existence
+    paths = data.get("paths") if isinstance(data.get("paths"), list) else []
+    data["paths"] = (paths + [{} for _ in range(PATH_COUNT - len(paths))])[:PATH_COUNT]
+
+    for repair in range(MAX_REPAIR_REQUESTS + 1):
+        problems = validate_game(data)
+        if not problems:
+            return data
+        path_problems, frame_problems = group_problems(problems)
+        print(f"{Fore.YELLOW}Generated game has {len(problems)} problem(s):{Style.RESET_ALL}")
+        for problem in problems:
+            print(f"    - {problem}")
+        if repair == MAX_REPAIR_REQUESTS:
+            break
+
+        print(f"{Fore.CYAN}Requesting a repair of {len(path_problems)} path(s)"
+              f"{' and the story frame' if frame_problems else ''}...{Style.RESET_ALL}")
+        fixed = _request_json(model, _repair_prompt(data, path_problems, frame_problems),
+                              repair_schema(sorted(path_problems), bool(frame_problems)))
+        if fixed is None:
+            continue
+        for key in ("title", "starting_description"):
+            if frame_problems and key in fixed:
+                data[key] = fixed[key]
+        for index in path_problems:
+            if isinstance(fixed.get(f"path_{index}"), dict):
+                data["paths"][index] = fixed[f"path_{index}"]
+
+    print(f"{Fore.RED}Error: The generated game could not be repaired.{Style.RESET_ALL}")
+    return None
+
+
 """
 Generates a new room.json configuration by calling the Gemini API.
 
+Args:
+    target (FileNameService): Where to save the game (default: the catalog's games folder).
+    register (bool): Whether to add the game to available_games.txt.
+    on_field (callable): If given, the answer is streamed and on_field(path, value) is
+        called for every field as soon as Gemini has written it, e.g.
+        (("starting_description",), "You find yourself..."), so its audio can be
+        synthesized while the rest is being generated. Fields of a path that later
+        gets regenerated or repaired are reported again (regenerated) or only with
+        their original text (repaired).
+    parallel_paths (bool): Generate the story frame first, then the paths concurrently
+        (default: PARALLEL_PATHS; if that is None, only when the rate limit allows it).
+
 Returns:
     str: The name of the generated game or None if the generation failed.
 """
-def generate_room_configuration() -> str | None:
-    # Load environment variables
-    load_dotenv()
-    gemini_api_key = os.getenv('GEMINI_API_KEY')
-    
-    if not gemini_api_key:
-        print(f"{Fore.RED}Error: GEMINI_API_KEY not found in .env file.{Style.RESET_ALL}")
+def generate_room_configuration(target: FileNameService = None, register: bool = True,
+                                on_field=None, parallel_paths: bool = None) -> str | None:
+    service = target if target else file_service
+    # Configured once; every call reuses the same model
+    model = _get_model()
+    if model is None:
         return None
-        
-    genai.configure(api_key=gemini_api_key)
 
     # --- Existing file paths for templates (Using BASE_DIR for better flexibility) ---
     template_file_path = os.path.join(BASE_DIR, 'geminiAPI', 'rooms_template.json')
@@ -116,45 +388,47 @@ def generate_room_configuration() -> str | None:
     - "lightModes": Choose from the following options: "static", "blink", "pulse", "fade".
     - "vibrationModes": Choose from the following options: "vibrate", "rattle".
     - "effectsColors": Choose from the following options: "red", "green", "blue", "yellow", "white", "purple".
-    - "audio_cue": A sound effect to play.
+    - "audio_cue": A sound effect to play, named after the sound as a file name (e.g. "creaking_door.mp3"); the sound is generated from its name.
     - "effects": Two effects to display selected from the "actuators" list. One actuator must be "light" and the other "vibration".
         - "actuator": The type of actuator ("light" or "vibration").
         - "mode": The type of effect (choose from "lightModes" for light actuators or "vibrationModes" for vibration actuators).
         - "duration": Duration of the effect in seconds (integer between 1 and 10). This only applies to vibration effects.
         - "color": The color of the effect (choose from "effectsColors"). This only applies to light effects.
 
-    Please generate the complete JSON object. When generating the hints for the solution sequence, provide a logical explanation that connections each hint to the correct solution in the solution sequence. Put this explanation into a new variable called "Hint Logic" at the end of the JSON.
-    Remove the Hint Logic variable before returning the final JSON.
-    Provide only the final JSON in your response, with no additional text or explanation and do not put it in markdown.
-    **Final and Most Important Rule:** Your entire response must be **only** the raw JSON text, starting with the opening curly brace and ending with the final closing curly brace. Do not include the markdown specifier ` ```json `, any other text, explanations, or formatting. The response must be a valid JSON object and nothing else.
+    Before writing each hint, work out the logic that connects each of its clues to the corresponding step of the solution sequence.
+    Every field must be filled in, in the order of the JSON structure above (title and starting_description first).
 
     """
 
-    # 3. Configure and call the model
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    try:
-        response = model.generate_content(prompt)
-    except Exception as e:
-        print(f"{Fore.RED}Error calling Gemini API: {e}{Style.RESET_ALL}")
+    # 3. Call the model; the response schema limits it to the box's real vocabulary
+    #    (streamed too, so the paths arrive before the starting description)
+    started = time.monotonic()
+    data = None
+    requests_made = 0
+    if parallel_paths is None:
+        parallel_paths = _parallel_fits() if PARALLEL_PATHS is None else PARALLEL_PATHS
+    if parallel_paths:
+        data = _generate_parallel(model, prompt, on_field)
+    else:
+        while data is None and requests_made < MAX_GENERATION_REQUESTS:
+            requests_made += 1
+            data = _request(model, prompt, game_schema(), on_field)
+    if data is None:
         return None
 
-    # 4. Save and Post-process the file
+    # 4. Validate locally and repair only what is broken
+    data = _repair_game(model, data)
+    if data is None:
+        return None
+    print(f"{Fore.GREEN}Game generated in {time.monotonic() - started:.1f} s.{Style.RESET_ALL}")
+
+    # 5. Save the file
     try:
-        raw_content = response.text
-        
-        cleaned_content = raw_content.strip()
-        if cleaned_content.startswith('"') and cleaned_content.endswith('"'):
-            cleaned_content = cleaned_content[1:-1]
-        
-        cleaned_content = codecs.decode(cleaned_content, 'unicode_escape')
-        
-        data = json.loads(cleaned_content)
-        
         game_title = data.get("title", "untitled-game")
         game_name = _sanitize_game_name(game_title)
         
-        game_folder_path = file_service.get_game_folder_path(game_name) # <--- USE SERVICE
-        output_file_path = file_service.get_game_json_path(game_name)    # <--- USE SERVICE
+        game_folder_path = service.get_game_folder_path(game_name) # <--- USE SERVICE
+        output_file_path = service.get_game_json_path(game_name)    # <--- USE SERVICE
                 
         if not os.path.exists(game_folder_path):
             print(f"{Fore.YELLOW}Creating game directory: {game_folder_path}{Style.RESET_ALL}")
@@ -165,14 +439,12 @@ def generate_room_configuration() -> str | None:
         
         print(f"{Fore.GREEN}✅ Configuration saved to: {output_file_path}{Style.RESET_ALL}")
 
-        _register_new_game(game_name)
+        if register:
+            register_new_game(game_name)
         
         # Return the game name for use in main.py
         return game_name
 
-    except json.JSONDecodeError as e:
-        print(f"{Fore.RED}Error: Failed to parse valid JSON from Gemini output. Details: {e}{Style.RESET_ALL}")
-        return None
     except Exception as e:
         print(f"{Fore.RED}An unexpected error occurred during file processing: {e}{Style.RESET_ALL}")
         return None
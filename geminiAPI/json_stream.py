@@ -0,0 +1,193 @@
+# json_stream.py
+
+import re
+import json
+from json.decoder import scanstring
+
+NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+# What a number cut off by the end of the buffer may look like ("-", "1.", "2e-")
+NUMBER_PREFIX = re.compile(r"-?[\d.eE+-]*")
+LITERALS = {"true": True, "false": False, "null": None}
+WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Parses one JSON document fed in arbitrary pieces (e.g. a streamed model
+    answer) and reports every value as soon as it is complete:
+    on_value(path, value), where path holds the keys and indexes leading to it,
+    e.g. ("paths", 0, "hint"). Objects and arrays are reported once they close,
+    after their members.
+
+        parser = IncrementalJSONParser(on_value=print)
+        parser.feed('{"title": "The Sun')
+        parser.feed('ken Chest", "paths": [')   # -> ('title',) 'The Sunken Chest'
+        ...
+        data = parser.close()
+    """
+
+    def __init__(self, on_value=None):
+        self.on_value = on_value
+        self.buffer = ""
+        self.position = 0
+        # One frame per open container: {"container", "path", "key", "state"}
+        self.stack = []
+        self.root = None
+        self.complete = False
+        self.closing = False
+
+    def feed(self, text: str):
+        """
+        Parses as much of the document as `text` completes.
+
+        Raises:
+            json.JSONDecodeError: If the document can't be valid JSON whatever follows.
+        """
+        self.buffer += text
+        while self._step():
+            pass
+        # Keep only what is not parsed yet
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+
+    def close(self):
+        """
+        Ends the document.
+
+        Returns:
+            The parsed document.
+
+        Raises:
+            json.JSONDecodeError: If the document is incomplete or invalid.
+        """
+        self.closing = True
+        self.feed("")
+        if not self.complete:
+            raise json.JSONDecodeError("Unexpected end of JSON document", self.buffer, len(self.buffer))
+        return self.root
+
+    # -------- Parsing --------
+    def _error(self, message: str):
+        raise json.JSONDecodeError(message, self.buffer, self.position)
+
+    def _step(self) -> bool:
+        """Consumes one token; False when it needs more text."""
+        while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+            self.position += 1
+        if self.position >= len(self.buffer):
+            return False
+        char = self.buffer[self.position]
+        if self.complete:
+            self._error("Extra data after the JSON document")
+
+        frame = self.stack[-1] if self.stack else None
+        state = frame["state"] if frame else "value"
+
+        if state == "key":
+            if char == "}" and not frame["container"]:
+                return self._close_container("}")
+            if char != '"':
+                self._error("Expecting property name enclosed in double quotes")
+            key = self._scan_string()
+            if key is None:
+                return False
+            frame["key"] = key
+            frame["state"] = "colon"
+            return True
+
+        if state == "colon":
+            if char != ":":
+                self._error("Expecting ':' delimiter")
+            self.position += 1
+            frame["state"] = "value"
+            return True
+
+        if state == "comma":
+            if char == ",":
+                self.position += 1
+                frame["state"] = "key" if isinstance(frame["container"], dict) else "value"
+                return True
+            if char in "}]":
+                return self._close_container(char)
+            self._error("Expecting ',' delimiter")
+
+        # A value
+        if char == "]" and frame and isinstance(frame["container"], list) and not frame["container"]:
+            return self._close_container("]")
+        if char in "{[":
+            self.position += 1
+            path = self._child_path()
+            if char == "{":
+                self.stack.append({"container": {}, "path": path, "key": None, "state": "key"})
+            else:
+                self.stack.append({"container": [], "path": path, "key": None, "state": "value"})
+            return True
+        if char == '"':
+            value = self._scan_string()
+            if value is None:
+                return False
+            self._add(value)
+            return True
+        return self._scan_scalar()
+
+    def _scan_string(self):
+        """Returns the string starting at the current quote, or None if it isn't complete yet."""
+        try:
+            value, end = scanstring(self.buffer, self.position + 1)
+        except json.JSONDecodeError:
+            if self.closing:
+                raise
+            return None
+        self.position = end
+        return value
+
+    def _scan_scalar(self) -> bool:
+        rest = self.buffer[self.position:]
+        for literal, value in LITERALS.items():
+            if rest.startswith(literal):
+                self.position += len(literal)
+                self._add(value)
+                return True
+            if literal.startswith(rest) and not self.closing:
+                return False
+        # A number running up to the end of the buffer may still be growing
+        if NUMBER_PREFIX.fullmatch(rest) and not self.closing:
+            return False
+        match = NUMBER.match(rest)
+        if not match:
+            self._error("Expecting value")
+        self.position += match.end()
+        self._add(json.loads(match.group()))
+        return True
+
+    def _child_path(self) -> tuple:
+        if not self.stack:
+            return ()
+        frame = self.stack[-1]
+        container = frame["container"]
+        return frame["path"] + ((frame["key"],) if isinstance(container, dict) else (len(container),))
+
+    def _add(self, value):
+        """Places a completed value into its parent and reports it."""
+        path = self._child_path()
+        if self.stack:
+            frame = self.stack[-1]
+            if isinstance(frame["container"], dict):
+                frame["container"][frame["key"]] = value
+            else:
+                frame["container"].append(value)
+            frame["state"] = "comma"
+        else:
+            self.root = value
+            self.complete = True
+        if self.on_value:
+            self.on_value(path, value)
+
+    def _close_container(self, char: str) -> bool:
+        frame = self.stack[-1]
+        if (char == "}") != isinstance(frame["container"], dict):
+            self._error(f"Unexpected '{char}'")
+        self.position += 1
+        self.stack.pop()
+        self._add(frame["container"])
+        return True
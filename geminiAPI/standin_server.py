@@ -0,0 +1,178 @@
+# standin_server.py
+
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler
+from colorama import Fore, Style
+
+from elevenlabsAPI.standin_server import FaultInjector, StandInHTTPServer
+
+BASE_DIR = Path(__file__).parent.parent
+# The catalog's games are the recorded answers
+DEFAULT_GAMES = sorted(BASE_DIR.glob("games/*/*.json"))
+
+GENERATE_ROUTE = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+# A single-path request of the parallel mode names its path (see gemini_client._path_prompt)
+PATH_REQUEST = re.compile(r"Write only path (\d+) of")
+# Roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+
+class GeminiStandIn:
+    """
+    A local HTTP server that answers Gemini generateContent requests (as the SDK's
+    REST transport sends them) with recorded games, for testing and benchmarking
+    game generation offline.
+
+        POST /v1beta/models/<model>:generateContent         the whole answer after the simulated generation time
+        POST /v1beta/models/<model>:streamGenerateContent   the answer in chunks as it is "generated"
+
+    A request whose response schema asks for a whole game or a story frame gets
+    (the frame of) the next recorded game; a single-path request gets the path its
+    prompt names, and a repair request (schema properties 'path_<i>', see
+    game_schema.py) those paths, of the last game served. Like Gemini, a schema's
+    properties are answered in alphabetical order. The first token comes after
+    `first_token_latency` seconds, then `tokens_per_second`. `error_rate` and
+    `throttle_rate` make a share of the requests fail with 500 or 429.
+    """
+
+    def __init__(self, games=None, first_token_latency: float = 3.0, tokens_per_second: float = 150.0,
+                 chunk_chars: int = 400, host: str = "127.0.0.1", port: int = 0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 2.0, seed: int = 0):
+        self.games = []
+        for game_path in (games or DEFAULT_GAMES):
+            with open(game_path, 'r', encoding='utf-8') as f:
+                self.games.append(json.load(f))
+        if not self.games:
+            raise FileNotFoundError("Stand-in needs at least one recorded game.")
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.chunk_chars = chunk_chars
+        self.faults = FaultInjector(error_rate, throttle_rate, retry_after, seed)
+        self.served = 0
+        self.last_game = self.games[0]
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = StandInHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serves on a background thread; returns the endpoint to use instead of the API's."""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"{Style.DIM}Gemini stand-in on {self.url} ({len(self.games)} recorded games, "
+              f"{self.first_token_latency:g} s + {self.tokens_per_second:g} tokens/s){Style.RESET_ALL}")
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, request: dict) -> str:
+        """The recorded text answering a request, shaped by its response schema."""
+        schema = request.get("generationConfig", {}).get("responseSchema", {})
+        wanted = list(schema.get("properties", {}))
+        with self.lock:
+            if not wanted or "paths" in wanted or "themes" in wanted:
+                self.last_game = self.games[self.served % len(self.games)]
+                self.served += 1
+                game = self.last_game
+                return json.dumps({key: game[key] for key in (sorted(wanted) or game) if key in game}, indent=2)
+            game = self.last_game
+        if "path_name" in wanted:
+            prompt = " ".join(part.get("text", "") for content in request.get("contents", [])
+                              for part in content.get("parts", []))
+            match = PATH_REQUEST.search(prompt)
+            index = int(match.group(1)) - 1 if match else 0
+            return json.dumps(game["paths"][index % len(game["paths"])], indent=2)
+        repaired = {}
+        for key in wanted:
+            if key.startswith("path_"):
+                repaired[key] = game["paths"][int(key[len("path_"):]) % len(game["paths"])]
+            elif key in game:
+                repaired[key] = game[key]
+        return json.dumps(repaired, indent=2)
+
+    def _generation_seconds(self, text: str) -> float:
+        return len(text) / CHARS_PER_TOKEN / self.tokens_per_second
+
+    @staticmethod
+    def _response(text: str, finished: bool = True) -> dict:
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        return {"candidates": [candidate]}
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                match = GENERATE_ROUTE.match(self.path.split("?", 1)[0])
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not match:
+                    self.send_error(404)
+                    return
+                with standin.lock:
+                    standin.requests += 1
+                if standin.faults.maybe_fail(self):
+                    return
+                text = standin.answer(request)
+
+                if match.group("method") == "generateContent":
+                    time.sleep(standin.first_token_latency + standin._generation_seconds(text))
+                    body = json.dumps(standin._response(text)).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                # The REST transport streams one JSON array, an element per chunk of text
+                time.sleep(standin.first_token_latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    chunks = [text[i:i + standin.chunk_chars] for i in range(0, len(text), standin.chunk_chars)]
+                    for index, chunk in enumerate(chunks):
+                        time.sleep(standin._generation_seconds(chunk))
+                        element = json.dumps(standin._response(chunk, finished=index == len(chunks) - 1))
+                        self._write_chunk((("[" if index == 0 else ",\r\n") + element).encode())
+                    self._write_chunk(b"]")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+# Run from the repository root: python -m geminiAPI.standin_server
+if __name__ == "__main__":
+    server = GeminiStandIn()
+    server.start()
+    print(f"{Fore.GREEN}Set GEMINI_API_URL={server.url} to use it. Ctrl+C to stop.{Style.RESET_ALL}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -98,8 +98,8 @@
 
 
 from smbus2 import SMBus
-import time
 import threading
+from clock import SYSTEM_CLOCK
 
 SX1509_ADDRESS = 0x3E
 
@@ -116,12 +116,14 @@ REG_DATA_A          = 0x11
 DEBOUNCE_TIME = 0.1  # Debounce time in seconds
 
 class SX1509:
-    def __init__(self, bus=1, address=SX1509_ADDRESS, bus_lock=None):
+    def __init__(self, bus=1, address=SX1509_ADDRESS, bus_lock=None, clock=None):
         self.bus = SMBus(bus)
         self.address = address
         self.bus_lock = bus_lock if bus_lock else threading.Lock()
-        self.last_state = {}
-        self.last_time = {}
+        self.last_state = {}    # raw reading per pin
+        self.last_time = {}     # when the raw reading last changed
+        self.stable_state = {}  # debounced state per pin
+        self.clock = clock if clock else SYSTEM_CLOCK
 
     def write_register(self, reg, value):
         """Writes a value to a specific register, with error handling."""
@@ -182,21 +184,19 @@ class SX1509:
         Reads the pin state with debouncing to filter out spurious transitions.
         Returns: 0 if pressed (low), 1 if not pressed (high).
         """
-        current_time = time.time()
+        current_time = self.clock.now()
         current_state = self.read_pin(pin)
 
         if pin not in self.last_state:
             self.last_state[pin] = current_state
             self.last_time[pin] = current_time
+            self.stable_state[pin] = current_state
             return current_state
 
-        last_known_state = self.last_state[pin]
-        if current_state != last_known_state:
+        # A new reading only counts once it has held for the debounce time
+        if current_state != self.last_state[pin]:
             self.last_time[pin] = current_time
             self.last_state[pin] = current_state
-            return last_known_state
-        
-        if current_time - self.last_time[pin] > DEBOUNCE_TIME:
-            return current_state
-        else:
-            return last_known_state
\ No newline at end of file
+        elif current_time - self.last_time[pin] > DEBOUNCE_TIME:
+            self.stable_state[pin] = current_state
+        return self.stable_state[pin]
\ No newline at end of file
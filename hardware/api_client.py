@@ -0,0 +1,322 @@
+# api_client.py
+
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from colorama import Fore, Style
+
+# Per-provider limits; one ProviderClient per provider is shared by the whole process,
+# so the game pool, live generation and the SFX generator all draw from the same budget
+PROVIDERS = {
+    "gemini": {
+        # The free tier allows 10 requests per minute for gemini-2.5-flash
+        "requests_per_minute": float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "10")),
+        "max_concurrent": int(os.getenv("GEMINI_MAX_CONCURRENT_REQUESTS", "3")),  # also the burst; parallel paths need 4
+        "timeout": 120.0,
+    },
+    "elevenlabs": {
+        # ElevenLabs limits concurrent requests per plan (2-3 on the smaller tiers); more are rejected with 429
+        "requests_per_minute": float(os.getenv("ELEVEN_REQUESTS_PER_MINUTE", "120")),
+        "max_concurrent": int(os.getenv("ELEVEN_MAX_CONCURRENT_REQUESTS", "3")),
+        "timeout": (10, 60),  # (connect, between chunks) in seconds
+    },
+}
+
+# Worth retrying: throttled, or the provider is having a moment
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "4"))
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+
+
+class TokenBucket:
+    """
+    Allows `requests_per_minute` on average with bursts of up to `burst`. A 429
+    puts the whole bucket on hold, so every thread backs off, not just the one
+    that was rejected.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a request may be sent; returns the seconds waited."""
+        started = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.resume_at and self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started
+                wait = max(self.resume_at - now, (1 - self.tokens) / self.rate if self.rate else 0)
+            time.sleep(max(wait, 0.01))
+
+    def hold(self, seconds: float):
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+def retry_after_seconds(headers) -> float | None:
+    """Reads a Retry-After header (seconds or an HTTP date); None if there is none."""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Exponential backoff with full jitter; a provider's Retry-After wins if it is longer."""
+    delay = random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, BASE_DELAY))
+    return delay
+
+
+def _exception_status(error) -> int | None:
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "code", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def _exception_retry_after(error) -> float | None:
+    retry_after = retry_after_seconds(getattr(getattr(error, "response", None), "headers", None))
+    if retry_after is not None:
+        return retry_after
+    # Google API errors carry a RetryInfo detail instead of a header
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    return None
+
+
+class StreamInterrupted(Exception):
+    """A streamed call failed after it started delivering chunks (they can't be taken back, so it isn't retried)."""
+
+    def __init__(self, provider: str, chunks: int, error: Exception):
+        super().__init__(f"{provider}: stream broke off after {chunks} chunk(s): {error!r}")
+        self.provider = provider
+        self.chunks = chunks
+        self.error = error
+
+
+class StreamedResult:
+    """
+    Iterates the result of a streamed SDK call while holding the provider's request
+    slot, and releases the slot once the stream is exhausted, fails or is closed
+    (use it as a context manager, so breaking out of the loop closes it too). An
+    error while reading is raised as StreamInterrupted.
+    """
+
+    def __init__(self, client, result):
+        self.client = client
+        self.released = False
+        self.chunks = 0
+        self.iterator = iter(result)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.released:
+            raise StopIteration
+        try:
+            chunk = next(self.iterator)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            with self.client.lock:
+                self.client.failures += 1
+            raise StreamInterrupted(self.client.name, self.chunks, e) from e
+        self.chunks += 1
+        return chunk
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            self.client.slots.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class ProviderClient:
+    """
+    Everything between the services and one API provider: a long-lived HTTP
+    session, a cap on requests in flight, a token bucket for the provider's rate
+    limit, default timeouts, and retries with jittered exponential backoff that
+    honor Retry-After. `on_request(provider, status, seconds, attempt)` is called
+    after every attempt (status None for connection errors), for counting and
+    latency tracking.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, max_concurrent: int, timeout,
+                 max_retries: int = MAX_RETRIES):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(requests_per_minute, burst=max_concurrent)
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        # Keep-alive connections, one per request slot
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.on_request = None
+        self.lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.request_seconds = 0.0
+        self.waited_seconds = 0.0
+
+    def _record(self, status, seconds: float, attempt: int, waited: float):
+        with self.lock:
+            self.attempts += 1
+            self.retries += attempt > 0
+            self.throttled += status == 429
+            self.failures += status is None or status >= 400
+            self.request_seconds += seconds
+            self.waited_seconds += waited
+        if self.on_request:
+            self.on_request(self.name, status, seconds, attempt)
+
+    def _backoff(self, attempt: int, status, retry_after, reason: str):
+        delay = backoff_delay(attempt, retry_after)
+        if status == 429:
+            self.bucket.hold(delay)
+        print(f"{Fore.YELLOW}{self.name}: {reason}, retrying in {delay:.1f} s "
+              f"({attempt + 1}/{self.max_retries}).{Style.RESET_ALL}")
+        time.sleep(delay)
+
+    @contextmanager
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Sends an HTTP request with the provider's limits, timeouts and retries, and
+        yields the response. The request slot is held until the block exits, so a
+        streamed body counts as in flight while it is being read. After the last
+        retry the failing response is yielded as is (raise_for_status() still works).
+
+        Raises:
+            requests.exceptions.RequestException: If the connection failed on every attempt.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self.slots:
+            for attempt in range(self.max_retries + 1):
+                waited = self.bucket.acquire()
+                started = time.monotonic()
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    self._record(None, time.monotonic() - started, attempt, waited)
+                    if attempt == self.max_retries:
+                        raise
+                    self._backoff(attempt, None, None, type(e).__name__)
+                    continue
+                self._record(response.status_code, time.monotonic() - started, attempt, waited)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    break
+                retry_after = retry_after_seconds(response.headers)
+                response.close()
+                self._backoff(attempt, response.status_code, retry_after, f"HTTP {response.status_code}")
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def call(self, function, *args, retryable: tuple = (), **kwargs):
+        """
+        Calls an SDK function (e.g. GenerativeModel.generate_content) with the
+        provider's limits, retrying the exception types in `retryable`.
+
+        With stream=True the SDK returns as soon as the response starts, so the
+        result is wrapped in a StreamedResult that keeps the request slot until the
+        stream has been read or closed.
+        """
+        if not kwargs.get("stream"):
+            with self.slots:
+                return self._call(function, args, kwargs, retryable)
+        self.slots.acquire()
+        try:
+            result = self._call(function, args, kwargs, retryable)
+        except BaseException:
+            self.slots.release()
+            raise
+        return StreamedResult(self, result)
+
+    def _call(self, function, args, kwargs, retryable: tuple):
+        """The retry loop of call(); the caller holds a request slot."""
+        for attempt in range(self.max_retries + 1):
+            waited = self.bucket.acquire()
+            started = time.monotonic()
+            try:
+                result = function(*args, **kwargs)
+            except retryable as e:
+                status = _exception_status(e)
+                self._record(status, time.monotonic() - started, attempt, waited)
+                if attempt == self.max_retries:
+                    raise
+                self._backoff(attempt, status, _exception_retry_after(e), type(e).__name__)
+                continue
+            except Exception as e:
+                self._record(_exception_status(e), time.monotonic() - started, attempt, waited)
+                raise
+            self._record(200, time.monotonic() - started, attempt, waited)
+            return result
+
+    def report(self) -> str:
+        with self.lock:
+            average = self.request_seconds / self.attempts if self.attempts else 0.0
+            return (f"{self.name}: {self.attempts} requests ({self.retries} retries, {self.throttled} throttled, "
+                    f"{self.failures} failed), {average:.2f} s average, {self.waited_seconds:.1f} s waited for the rate limit")
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(provider: str) -> ProviderClient:
+    """Returns the process-wide client for a provider in PROVIDERS."""
+    with _clients_lock:
+        if provider not in _clients:
+            _clients[provider] = ProviderClient(provider, **PROVIDERS[provider])
+        return _clients[provider]
+
+
+def configure_client(provider: str, **settings) -> ProviderClient:
+    """Replaces a provider's process-wide client with one using other settings (e.g. max_concurrent)."""
+    with _clients_lock:
+        _clients[provider] = ProviderClient(provider, **{**PROVIDERS[provider], **settings})
+        return _clients[provider]
@@ -0,0 +1,116 @@
+# audio_cache.py
+
+import threading
+from collections import OrderedDict
+import pygame
+from colorama import Fore, Style
+
+# Decoded PCM is ~10x the MP3 size (44.1 kHz, 16-bit stereo = ~10 MB per minute)
+DEFAULT_BUDGET_MB = 64
+
+
+class AudioAssetCache:
+    """
+    Keeps decoded clips in memory as ready-to-play pygame Sounds, evicting the
+    least recently used ones once the memory budget is exceeded.
+
+    preload() decodes a game's clips on a background thread (e.g. while the
+    starting narration plays); get() returns instantly on a hit, waits for a
+    clip the preloader is already decoding, and decodes synchronously on a miss.
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.sounds = OrderedDict()  # path -> (Sound, size in bytes), oldest first
+        self.used_bytes = 0
+        self.loading = {}            # path -> threading.Event set once decoding finished
+        self.lock = threading.Lock()
+        self.preload_thread = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _decoded_size(sound: pygame.mixer.Sound) -> int:
+        """Bytes of PCM the mixer holds for a sound (without copying it like get_raw())."""
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * (abs(sample_format) // 8))
+
+    def _evict(self):
+        """Drops least recently used clips until the cache fits the budget (lock held)."""
+        while self.used_bytes > self.budget_bytes and len(self.sounds) > 1:
+            path, (_, size) = self.sounds.popitem(last=False)
+            self.used_bytes -= size
+            print(f"{Style.DIM}Audio cache: evicted {path}{Style.RESET_ALL}")
+
+    def _decode(self, path: str):
+        """Decodes `path` into the cache unless it is already cached or being decoded."""
+        with self.lock:
+            if path in self.sounds:
+                return
+            pending = self.loading.get(path)
+            if pending is None:
+                pending = self.loading[path] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            pending.wait()
+            return
+
+        try:
+            sound = pygame.mixer.Sound(path)
+            size = self._decoded_size(sound)
+            with self.lock:
+                self.sounds[path] = (sound, size)
+                self.used_bytes += size
+                self._evict()
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"{Fore.RED}Audio cache: could not decode {path}: {e}{Style.RESET_ALL}")
+        finally:
+            with self.lock:
+                self.loading.pop(path, None)
+            pending.set()
+
+    def get(self, path: str):
+        """Returns the decoded Sound for `path` (decoding it now on a miss), or None."""
+        path = str(path)
+        with self.lock:
+            entry = self.sounds.get(path)
+            if entry:
+                self.sounds.move_to_end(path)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        self._decode(path)
+        with self.lock:
+            entry = self.sounds.get(path)
+            return entry[0] if entry else None
+
+    def preload(self, paths: list[str]):
+        """Decodes `paths` in order on a background thread; returns immediately."""
+        paths = [str(path) for path in paths]
+
+        def _worker():
+            for path in paths:
+                self._decode(path)
+            print(f"{Style.DIM}Audio cache: {len(self.sounds)} clips ready "
+                  f"({self.used_bytes / (1024 * 1024):.1f} MB).{Style.RESET_ALL}")
+
+        self.preload_thread = threading.Thread(target=_worker, daemon=True)
+        self.preload_thread.start()
+
+    def release(self, paths: list[str]):
+        """Drops specific clips (e.g. narration that can no longer be reached)."""
+        with self.lock:
+            for path in paths:
+                entry = self.sounds.pop(str(path), None)
+                if entry:
+                    self.used_bytes -= entry[1]
+
+    def clear(self):
+        """Drops every cached clip (e.g. when switching games)."""
+        with self.lock:
+            self.sounds.clear()
+            self.used_bytes = 0
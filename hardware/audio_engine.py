@@ -0,0 +1,400 @@
+# audio_engine.py
+
+import queue
+import threading
+from concurrent.futures import Future
+import pygame
+from colorama import Fore, Style
+
+from clock import SYSTEM_CLOCK
+from audio_cache import AudioAssetCache
+from audio_stream import AudioStream
+
+# Named mixer channels (reserved, so Sound.play() elsewhere never steals them)
+CHANNELS = {
+    "narration": 0,  # descriptions, death texts (what the player is waiting for)
+    "hint": 1,       # hints and repeats, spoken over a ducked narration
+    "sfx": 2,        # correct / wrong / victory
+    "ambience": 3,   # audio cues and background loops
+}
+
+# Default priority of each channel's clips; a clip only replaces one of equal or lower priority
+PRIORITIES = {"ambience": 0, "narration": 1, "hint": 2, "sfx": 3}
+
+# While a clip plays on the key channel, the listed channels are turned down to that volume
+DUCKING = {
+    "hint": {"narration": 0.25, "ambience": 0.3},
+    "sfx": {"narration": 0.5, "ambience": 0.5},
+}
+
+
+class PlaylistEntry:
+    """One clip of a playlist. The engine records when it started and ended (clock time)."""
+    def __init__(self, path=None):
+        self.path = str(path) if path else None  # may be filled in later by whoever resolves the file
+        self.future = Future()  # True if the clip played to the end
+        self.started_at = None
+        self.ended_at = None
+
+    def __repr__(self):
+        return f"PlaylistEntry({str(self.path).rsplit('/', 1)[-1]!r}, {self.started_at}, {self.ended_at})"
+
+
+class Playback:
+    """One clip (or playlist) playing on a named channel. `future` resolves True if it played to the end."""
+    def __init__(self, channel_name: str, path: str, priority: int, loop: bool, future: Future):
+        self.channel_name = channel_name
+        self.path = path
+        self.priority = priority
+        self.loop = loop
+        self.future = future
+        self.expected_end = None
+        # Playlists only: [(Sound, PlaylistEntry or None for inserted silence), ...]
+        self.entries = []
+        self.gap = 0.0
+        self.items = []
+        self.index = 0
+        # Streams only: the AudioStream, when the audio handed to the channel ends,
+        # and when the channel's queue slot frees up (the current chunk ends)
+        self.stream = None
+        self.audio_end = None
+        self.slot_free_at = None
+
+
+class AudioEngine:
+    """
+    Owns the mixer on a dedicated thread. Callers enqueue play/stop commands and
+    get a Future back; decoding (via the AudioAssetCache), channel management,
+    ducking and end-of-clip detection all happen on the engine thread.
+
+    End-of-clip detection sleeps until shortly before a clip's known end time and
+    only then checks the channel every millisecond, so completion is reported
+    within a few ms without polling for the whole clip. (Channel.set_endevent
+    would need pygame's event queue, which needs a display the box doesn't have.)
+
+    Playlists keep the next clip queued on the channel (Channel.queue) while the
+    current one plays, so consecutive narration segments play back to back with
+    no decoder or scheduling gap (or with a fixed, sample-exact silence between).
+    Streams (audio still downloading) use the same queue slot: whatever arrived
+    while a chunk plays is queued as the next one.
+    """
+
+    # How long before a clip's computed end the engine starts checking the channel
+    END_GUARD = 0.005
+    FINE_POLL = 0.001
+    IDLE_WAIT = 0.5
+
+    def __init__(self, cache: AudioAssetCache = None, clock=None):
+        self.cache = cache if cache else AudioAssetCache()
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.commands = queue.Queue()
+        self.active = {}    # channel name -> Playback
+        self.channels = {}  # channel name -> pygame.mixer.Channel
+        self.running = False
+        self.lock = threading.Lock()
+        self.worker_thread = None
+        # Optional hook called on the engine thread right after Channel.play(): (channel name, path, clock time)
+        self.on_play = None
+
+    def start(self):
+        """Starts the engine thread (the mixer must already be initialised)."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        pygame.mixer.set_reserved(len(CHANNELS))
+        self.channels = {name: pygame.mixer.Channel(index) for name, index in CHANNELS.items()}
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self.worker_thread.start()
+
+    def stop(self):
+        """Stops every channel and the engine thread."""
+        if not self.running:
+            return
+        self.commands.put(("shutdown", None))
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=1)
+
+    # -------- Called from any thread --------
+    def play(self, channel_name: str, path, priority: int = None, loop: bool = False) -> Future:
+        """
+        Queues a clip on a named channel.
+
+        Returns:
+            Future: Resolves True when the clip finished on its own, False if it was
+            stopped, replaced, rejected by a higher-priority clip or failed to load.
+        """
+        if channel_name not in CHANNELS:
+            raise ValueError(f"Unknown audio channel '{channel_name}' (use one of {list(CHANNELS)}).")
+        self.start()
+        future = Future()
+        priority = PRIORITIES[channel_name] if priority is None else priority
+        self.commands.put(("play", Playback(channel_name, str(path), priority, loop, future)))
+        return future
+
+    def play_playlist(self, channel_name: str, entries: list[PlaylistEntry], gap: float = 0.0, priority: int = None) -> Future:
+        """
+        Queues clips to play back to back on a named channel, `gap` seconds of
+        silence apart. Each entry's future resolves as that clip ends and its
+        started_at / ended_at are filled in.
+
+        Returns:
+            Future: Resolves True when the whole playlist played to the end.
+        """
+        if channel_name not in CHANNELS:
+            raise ValueError(f"Unknown audio channel '{channel_name}' (use one of {list(CHANNELS)}).")
+        self.start()
+        future = Future()
+        priority = PRIORITIES[channel_name] if priority is None else priority
+        playback = Playback(channel_name, "playlist", priority, False, future)
+        playback.entries = list(entries)
+        playback.gap = gap
+        self.commands.put(("playlist", playback))
+        return future
+
+    def play_stream(self, channel_name: str, stream: AudioStream, priority: int = None) -> Future:
+        """
+        Plays an AudioStream on a named channel as its data arrives (after its
+        prebuffer). If the data runs out before the stream is closed, the channel
+        goes quiet and resumes with the next chunk.
+
+        Returns:
+            Future: Resolves True once the closed stream played to the end.
+        """
+        if channel_name not in CHANNELS:
+            raise ValueError(f"Unknown audio channel '{channel_name}' (use one of {list(CHANNELS)}).")
+        self.start()
+        future = Future()
+        priority = PRIORITIES[channel_name] if priority is None else priority
+        playback = Playback(channel_name, "stream", priority, False, future)
+        playback.stream = stream
+        stream.on_data = lambda: self.commands.put(("feed", None))
+        self.commands.put(("stream", playback))
+        return future
+
+    def skip(self, channel_name: str):
+        """Cuts the current clip short: a playlist moves on to its next clip, anything else stops."""
+        self.commands.put(("skip", channel_name))
+
+    def stop_channel(self, channel_name: str):
+        self.commands.put(("stop", channel_name))
+
+    def stop_all(self):
+        self.commands.put(("stop", None))
+
+    def is_busy(self, channel_name: str) -> bool:
+        return channel_name in self.active
+
+    # -------- Engine thread --------
+    def _worker(self):
+        while True:
+            try:
+                command, argument = self.commands.get(timeout=self._next_timeout())
+            except queue.Empty:
+                command, argument = None, None
+
+            if command == "shutdown":
+                self._stop(None)
+                self.running = False
+                return
+            if command == "play":
+                self._play(argument)
+            elif command == "playlist":
+                self._play_playlist(argument)
+            elif command == "stream":
+                self._play_stream(argument)
+            elif command == "skip":
+                self._skip(argument)
+            elif command == "stop":
+                self._stop(argument)
+            self._reap()
+
+    def _next_timeout(self) -> float:
+        """Sleeps until just before the earliest clip should end, then checks every ms."""
+        ends = [p.expected_end for p in self.active.values() if p.expected_end is not None]
+        if not ends:
+            return self.IDLE_WAIT
+        return max(self.FINE_POLL, min(ends) - self.END_GUARD - self.clock.now())
+
+    def _play(self, playback: Playback):
+        current = self.active.get(playback.channel_name)
+        if current and current.priority > playback.priority:
+            playback.future.set_result(False)
+            return
+
+        sound = self.cache.get(playback.path)
+        if sound is None:
+            playback.future.set_result(False)
+            return
+
+        if current:
+            self._finish(current, False)
+        self.channels[playback.channel_name].play(sound, loops=-1 if playback.loop else 0)
+        if self.on_play:
+            self.on_play(playback.channel_name, playback.path, self.clock.now())
+        if not playback.loop:
+            playback.expected_end = self.clock.now() + sound.get_length()
+        self.active[playback.channel_name] = playback
+        self._apply_ducking()
+        print(f"{Fore.GREEN}🔊 Playing ({playback.channel_name}): {playback.path.rsplit('/', 1)[-1]}{Style.RESET_ALL}")
+
+    def _play_playlist(self, playback: Playback):
+        current = self.active.get(playback.channel_name)
+        if current and current.priority > playback.priority:
+            for entry in playback.entries:
+                entry.future.set_result(False)
+            playback.future.set_result(False)
+            return
+
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        silence = None
+        if playback.gap > 0:
+            frames = int(playback.gap * frequency)
+            silence = pygame.mixer.Sound(buffer=bytes(frames * channels * (abs(sample_format) // 8)))
+
+        for entry in playback.entries:
+            sound = self.cache.get(entry.path)
+            if sound is None:
+                entry.future.set_result(False)
+                continue
+            if playback.items and silence:
+                playback.items.append((silence, None))
+            playback.items.append((sound, entry))
+        if not playback.items:
+            playback.future.set_result(False)
+            return
+
+        if current:
+            self._finish(current, False)
+        self.channels[playback.channel_name].play(playback.items[0][0])
+        self.active[playback.channel_name] = playback
+        self._start_item(playback, self.clock.now())
+        self._apply_ducking()
+
+    def _play_stream(self, playback: Playback):
+        current = self.active.get(playback.channel_name)
+        if current and current.priority > playback.priority:
+            playback.stream.on_data = None
+            playback.future.set_result(False)
+            return
+        if current:
+            self.channels[playback.channel_name].stop()
+            self._finish(current, False)
+        self.active[playback.channel_name] = playback
+        self._feed(playback)
+        self._apply_ducking()
+
+    def _feed(self, playback: Playback):
+        """Hands a stream's newly arrived audio to its channel while the queue slot is free."""
+        channel = self.channels[playback.channel_name]
+        stream = playback.stream
+        if channel.get_queue() is None and (playback.audio_end is not None or stream.ready()):
+            data = stream.take()
+            if data:
+                sound = pygame.mixer.Sound(buffer=data)
+                now = self.clock.now()
+                if channel.get_busy():
+                    channel.queue(sound)
+                    playback.slot_free_at = playback.audio_end
+                    playback.audio_end += sound.get_length()
+                else:
+                    channel.play(sound)
+                    playback.audio_end = now + sound.get_length()
+                    if stream.started_at is None:
+                        stream.started_at = now
+                        print(f"{Fore.GREEN}🔊 Playing ({playback.channel_name}): stream{Style.RESET_ALL}")
+                        if self.on_play:
+                            self.on_play(playback.channel_name, playback.path, now)
+
+        # Wake up when the queue slot frees, when the audio runs out, or (None) on new data
+        if channel.get_queue() is not None:
+            playback.expected_end = playback.slot_free_at
+        elif channel.get_busy():
+            playback.expected_end = playback.audio_end
+        else:
+            playback.expected_end = None
+
+    def _start_item(self, playback: Playback, started_at: float):
+        """Books the current playlist item in and queues the one after it on the channel."""
+        sound, entry = playback.items[playback.index]
+        playback.expected_end = started_at + sound.get_length()
+        if entry:
+            entry.started_at = started_at
+            print(f"{Fore.GREEN}🔊 Playing ({playback.channel_name}): {entry.path.rsplit('/', 1)[-1]}{Style.RESET_ALL}")
+        if playback.index + 1 < len(playback.items):
+            self.channels[playback.channel_name].queue(playback.items[playback.index + 1][0])
+
+    def _end_item(self, playback: Playback, ended_at: float, completed: bool):
+        entry = playback.items[playback.index][1]
+        if entry and not entry.future.done():
+            entry.ended_at = ended_at
+            entry.future.set_result(completed)
+
+    def _advance_playlists(self):
+        """Moves playlists past every item whose (sample-exact) end time has passed."""
+        now = self.clock.now()
+        for playback in self.active.values():
+            while playback.items and playback.index + 1 < len(playback.items) and now >= playback.expected_end:
+                boundary = playback.expected_end
+                self._end_item(playback, boundary, True)
+                playback.index += 1
+                self._start_item(playback, boundary)
+
+    def _skip(self, channel_name: str):
+        playback = self.active.get(channel_name)
+        if not playback:
+            return
+        next_index = next((i for i in range(playback.index + 1, len(playback.items)) if playback.items[i][1]), None)
+        if next_index is None:
+            self._stop(channel_name)
+            return
+        now = self.clock.now()
+        self._end_item(playback, now, False)
+        playback.index = next_index
+        self.channels[channel_name].play(playback.items[next_index][0])
+        self._start_item(playback, now)
+
+    def _stop(self, channel_name):
+        for name in list(self.active):
+            if channel_name is None or name == channel_name:
+                self.channels[name].stop()
+                self._finish(self.active[name], False)
+        self._apply_ducking()
+
+    def _reap(self):
+        """Resolves clips whose channel went quiet."""
+        self._advance_playlists()
+        for playback in list(self.active.values()):
+            if playback.stream:
+                self._feed(playback)
+        # A quiet stream channel is only finished once the stream is
+        finished = [p for name, p in self.active.items()
+                    if not self.channels[name].get_busy() and (not p.stream or p.stream.done)]
+        for playback in finished:
+            self._finish(playback, playback.stream is None or self._stream_completed(playback.stream))
+        if finished:
+            self._apply_ducking()
+
+    @staticmethod
+    def _stream_completed(stream: AudioStream) -> bool:
+        return stream.error is None and stream.started_at is not None
+
+    def _finish(self, playback: Playback, completed: bool):
+        if self.active.get(playback.channel_name) is playback:
+            del self.active[playback.channel_name]
+        if playback.stream:
+            playback.stream.on_data = None
+        if playback.items:
+            self._end_item(playback, self.clock.now(), completed)
+            for _, entry in playback.items[playback.index + 1:]:
+                if entry and not entry.future.done():
+                    entry.future.set_result(False)
+        if not playback.future.done():
+            playback.future.set_result(completed)
+
+    def _apply_ducking(self):
+        for name, channel in self.channels.items():
+            volume = 1.0
+            for ducking_channel in self.active:
+                volume = min(volume, DUCKING.get(ducking_channel, {}).get(name, 1.0))
+            channel.set_volume(volume)
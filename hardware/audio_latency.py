@@ -0,0 +1,253 @@
+# audio_latency.py
+
+import os
+import sys
+import json
+import time
+import queue
+import random
+import argparse
+import statistics
+import threading
+from pathlib import Path
+import pygame
+from colorama import Fore, Style
+
+from clock import SYSTEM_CLOCK
+from input_event import InputEvent
+from filename_service import FileNameService
+from sound_controller import SoundController
+from audio_transcoder import MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER
+
+BASE_DIR = Path(__file__).parent.parent
+# Written by `python audio_latency.py --write`, read by main.py before pre_init
+TUNING_FILE = BASE_DIR / "audio_tuning.json"
+
+# Mixer buffer sizes (frames) tried by the sweep, smallest first
+BUFFER_SIZES = (256, 512, 1024, 2048, 4096)
+# A channel the engine doesn't reserve, used for the mixer callback probe
+PROBE_CHANNEL = 7
+# Length of the tone used to detect underruns
+STRETCH_TONE_SECONDS = 2.0
+
+
+def load_mixer_settings() -> dict:
+    """Returns the measured mixer settings ({'buffer', 'devicename'}), or the defaults."""
+    settings = {"buffer": MIXER_BUFFER, "devicename": None}
+    try:
+        with open(TUNING_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        settings["buffer"] = int(data["buffer"])
+        settings["devicename"] = data.get("devicename")
+    except FileNotFoundError:
+        pass
+    except (KeyError, ValueError, TypeError, json.JSONDecodeError) as e:
+        print(f"{Fore.YELLOW}Ignoring invalid {TUNING_FILE.name}: {e}{Style.RESET_ALL}")
+    return settings
+
+
+class LatencyHarness:
+    """
+    Measures button-press-to-sound latency through the real audio path, stage by stage:
+
+        event     InputEvent timestamp (taken where InputManager detects the press)
+        dequeue   the game thread takes the event off the input queue
+        play      the AudioEngine thread has called Channel.play() (AudioEngine.on_play)
+        callback  the mixer callback picked the clip up
+
+    SDL's mixer callback isn't exposed to Python, so the last stage is probed on a
+    spare channel: a one-frame clip is played with a second one queued behind it,
+    and the queue empties inside the callback that mixes the first. After that the
+    samples still have to drain through one mixer buffer (and, on the box, the ALSA
+    dmix buffer, which isn't included), so a buffer period is added to the total.
+
+    Underruns are detected two ways: a probe that waited more than two periods means
+    a callback came late, and on a real device each underrun delays the stream, so
+    a tone takes measurably longer than its length to finish playing (the dummy
+    driver doesn't run in real time, so its stretch is reported but not judged).
+    `load` busy threads stand in for the sensor polling threads competing for the CPU.
+    """
+
+    def __init__(self, file_service: FileNameService, presses: int = 15, interval: float = 0.6,
+                 load: int = 0, devicename: str = None, clock=None):
+        self.file_service = file_service
+        self.presses = presses
+        self.interval = interval
+        self.load = load
+        self.devicename = devicename
+        self.clock = clock if clock else SYSTEM_CLOCK
+
+    def _init_mixer(self, buffer: int):
+        pygame.mixer.quit()
+        pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, buffer, devicename=self.devicename)
+        pygame.mixer.set_num_channels(max(8, PROBE_CHANNEL + 1))
+
+    def _probe_callback(self) -> float:
+        """Seconds from Channel.play() until the mixer callback consumed the clip."""
+        _, sample_format, channels = pygame.mixer.get_init()
+        blip = pygame.mixer.Sound(buffer=bytes(channels * (abs(sample_format) // 8)))
+        channel = pygame.mixer.Channel(PROBE_CHANNEL)
+        started = self.clock.now()
+        channel.play(blip)
+        channel.queue(blip)
+        while channel.get_queue() is not None:
+            time.sleep(0.0002)
+        return self.clock.now() - started
+
+    def _measure_stretch(self) -> float:
+        """Seconds a tone took beyond its length to play (the time lost to underruns)."""
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        frames = int(STRETCH_TONE_SECONDS * frequency)
+        # Quiet square wave, so underruns would also be audible on the box
+        period = max(2, frequency // 440)
+        frame = [b"\x00\x04" * channels, b"\x00\xfc" * channels]
+        data = b"".join(frame[(i // (period // 2)) % 2] for i in range(frames))
+        tone = pygame.mixer.Sound(buffer=data)
+        channel = pygame.mixer.Channel(PROBE_CHANNEL)
+        started = self.clock.now()
+        channel.play(tone)
+        while channel.get_busy():
+            time.sleep(0.001)
+        return self.clock.now() - started - tone.get_length()
+
+    def _busy_load(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            sum(range(1000))
+
+    def measure(self, buffer: int) -> dict:
+        """Runs `presses` button presses and the stretch test at one buffer size."""
+        self._init_mixer(buffer)
+        frequency = pygame.mixer.get_init()[0]
+        stop_load = threading.Event()
+        load_threads = [threading.Thread(target=self._busy_load, args=(stop_load,), daemon=True)
+                        for _ in range(self.load)]
+        for thread in load_threads:
+            thread.start()
+
+        controller = SoundController(self.file_service, clock=self.clock)
+        play_times = queue.Queue()
+        events = queue.Queue()
+
+        def _press():
+            # Stands in for InputManager: stamp the event where the hardware was read
+            for index in range(self.presses):
+                events.put(InputEvent("button", "red", {"press": index}, timestamp=self.clock.now()))
+                time.sleep(self.interval + random.uniform(0, 0.05))
+
+        stages = {"dequeue": [], "play": [], "callback": [], "total": []}
+        try:
+            # Decode first, so the sweep measures playback and not the SD card
+            controller.set_effect(sfx="correct").result(timeout=10)
+            controller.last_request = None
+            controller.engine.on_play = lambda channel_name, path, played_at: play_times.put(played_at)
+            presser = threading.Thread(target=_press, daemon=True)
+            presser.start()
+            for _ in range(self.presses):
+                event = events.get()
+                dequeued = self.clock.now()
+                controller.set_effect(sfx="correct")
+                try:
+                    played = play_times.get(timeout=2)
+                except queue.Empty:
+                    print(f"{Fore.YELLOW}Press {event.data['press']}: no playback.{Style.RESET_ALL}")
+                    continue
+                callback = self._probe_callback()
+                stages["dequeue"].append(dequeued - event.timestamp)
+                stages["play"].append(played - dequeued)
+                stages["callback"].append(callback)
+                stages["total"].append(played - event.timestamp + callback + buffer / frequency)
+            presser.join()
+            stretch = self._measure_stretch()
+        finally:
+            controller.stop()
+            stop_load.set()
+            for thread in load_threads:
+                thread.join()
+
+        period = buffer / frequency
+        # Allow 2 ms for the polling loops
+        late_callbacks = sum(1 for callback in stages["callback"] if callback > 2 * period + 0.002)
+        stretched = os.environ.get("SDL_AUDIODRIVER") != "dummy" and stretch > period + 0.002
+        return {
+            "buffer": buffer,
+            "period_ms": period * 1000,
+            "stages_ms": {name: self._summarize(values) for name, values in stages.items()},
+            "stretch_ms": stretch * 1000,
+            "late_callbacks": late_callbacks,
+            "underruns": bool(late_callbacks) or stretched,
+        }
+
+    @staticmethod
+    def _summarize(values: list) -> dict:
+        if not values:
+            return {"median": None, "p95": None, "max": None}
+        ordered = sorted(values)
+        return {
+            "median": statistics.median(ordered) * 1000,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+    def sweep(self, buffers=BUFFER_SIZES) -> dict:
+        """Measures every buffer size; suggests the smallest one without underruns."""
+        results = []
+        for buffer in buffers:
+            print(f"{Fore.CYAN}--- Buffer {buffer} frames ---{Style.RESET_ALL}")
+            results.append(self.measure(buffer))
+        stable = [result for result in results if not result["underruns"]]
+        suggested = stable[0]["buffer"] if stable else max(buffers)
+        return {
+            "driver": os.environ.get("SDL_AUDIODRIVER", "default"),
+            "devicename": self.devicename,
+            "frequency": MIXER_FREQUENCY,
+            "load_threads": self.load,
+            "results": results,
+            "buffer": suggested,
+        }
+
+
+def print_report(report: dict):
+    print(f"\n{Fore.BLUE}Input-to-sound latency ({report['driver']}, "
+          f"{report['load_threads']} load threads), median / p95 in ms:{Style.RESET_ALL}")
+    print(f"{'buffer':>7} {'period':>7} {'dequeue':>13} {'play()':>13} {'callback':>13} {'total':>13} {'stretch':>8}")
+    for result in report["results"]:
+        cells = []
+        for name in ("dequeue", "play", "callback", "total"):
+            stage = result["stages_ms"][name]
+            cells.append("n/a" if stage["median"] is None else f"{stage['median']:.1f}/{stage['p95']:.1f}")
+        color = Fore.RED if result["underruns"] else Fore.GREEN
+        print(f"{color}{result['buffer']:>7} {result['period_ms']:>7.1f} "
+              + " ".join(f"{cell:>13}" for cell in cells)
+              + f" {result['stretch_ms']:>8.1f}{Style.RESET_ALL}")
+    print(f"\nSuggested: pygame.mixer.pre_init({report['frequency']}, {MIXER_SIZE}, {MIXER_CHANNELS}, "
+          f"{report['buffer']}" + (f", devicename={report['devicename']!r}" if report["devicename"] else "") + ")")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure button-to-sound latency and tune the mixer buffer.")
+    parser.add_argument("--driver", default=None, help="SDL audio driver (default: alsa on the box, 'dummy' offline)")
+    parser.add_argument("--device", default=None, help="ALSA device name, e.g. plughw:8,0")
+    parser.add_argument("--buffers", type=int, nargs="+", default=list(BUFFER_SIZES))
+    parser.add_argument("--presses", type=int, default=15)
+    parser.add_argument("--interval", type=float, default=0.6)
+    parser.add_argument("--load", type=int, default=0, help="busy threads simulating sensor polling")
+    parser.add_argument("--write", action="store_true", help=f"save the suggestion to {TUNING_FILE.name}")
+    args = parser.parse_args()
+
+    if args.driver:
+        os.environ["SDL_AUDIODRIVER"] = args.driver
+    pygame.init()
+
+    harness = LatencyHarness(FileNameService(BASE_DIR), presses=args.presses, interval=args.interval,
+                             load=args.load, devicename=args.device)
+    try:
+        report = harness.sweep(sorted(args.buffers))
+    except pygame.error as e:
+        print(f"{Fore.RED}Could not open the audio device: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    print_report(report)
+
+    if args.write:
+        with open(TUNING_FILE, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"{Fore.GREEN}Saved to {TUNING_FILE}; main.py will use buffer {report['buffer']}.{Style.RESET_ALL}")
@@ -0,0 +1,73 @@
+# audio_prefetcher.py
+
+from pathlib import Path
+from colorama import Style
+
+from audio_cache import AudioAssetCache
+from audio_transcoder import playable_path
+
+# Narration clips every path has (see GameAudioGenerator); hint clue clips come on top
+PATH_CLIP_TYPES = ("description", "hint", "death_text")
+
+
+class NarrationPrefetcher:
+    """
+    Keeps only the narration that can still be played in memory. It knows the
+    path order: entering path i stages paths i..i+lookahead and releases every
+    clip of the paths before i, so the next description is already decoded when
+    the current path is solved and memory stays at about (1 + lookahead) paths.
+    """
+
+    def __init__(self, file_service, cache: AudioAssetCache, lookahead: int = 1):
+        self.file_service = file_service
+        self.cache = cache
+        self.lookahead = lookahead
+        self.intro = []       # starting description (reachable until the first path starts)
+        self.path_clips = []  # per path, in play order: [Path, ...] of existing clips
+        self.staged = set()   # path indices handed to the cache
+
+    def _existing(self, clips) -> list:
+        clips = [playable_path(clip) for clip in clips]
+        return [clip for clip in clips if clip.exists()]
+
+    def plan(self, game_name: str, config: dict):
+        """Resolves every clip of a game once (file lookups happen here, not during play)."""
+        audio_folder = Path(self.file_service.get_audio_folder_path(game_name))
+        cue_folder = Path(self.file_service.get_sound_effects_folder_path(game_name))
+
+        def clip(type_prefix: str, path_name: str) -> Path:
+            return audio_folder / self.file_service.get_audio_filename(type_prefix, path_name)
+
+        self.intro = self._existing([clip("starting_description", game_name)])
+        self.path_clips = []
+        for path_config in config.get("paths", []):
+            path_name = path_config.get("path_name", "")
+            clips = [clip(type_prefix, path_name) for type_prefix in PATH_CLIP_TYPES]
+            clips.extend(clip(self.file_service.get_hint_clue_type_prefix(clue_index), path_name)
+                         for clue_index in range(len(path_config.get("hint_clues", []))))
+            if path_config.get("audio_cue"):
+                clips.append(cue_folder / path_config["audio_cue"])
+            self.path_clips.append(self._existing(clips))
+        self.staged = set()
+
+    def start(self):
+        """Stages the starting description and the first path(s)."""
+        self.cache.preload(self.intro)
+        self.enter_path(0, release_intro=False)
+
+    def enter_path(self, path_index: int, release_intro: bool = True):
+        """Called when `path_index` starts: prefetch ahead, release what is behind."""
+        if release_intro:
+            self.cache.release(self.intro)
+        behind = [clip for index in range(path_index) for clip in self.path_clips[index]]
+        if behind:
+            self.cache.release(behind)
+
+        ahead = [index for index in range(path_index, min(path_index + 1 + self.lookahead, len(self.path_clips)))
+                 if index not in self.staged]
+        self.staged.update(ahead)
+        clips = [clip for index in ahead for clip in self.path_clips[index]]
+        if clips:
+            self.cache.preload(clips)
+        print(f"{Style.DIM}Prefetch: path {path_index + 1}/{len(self.path_clips)}, "
+              f"{len(clips)} clips staged, {len(behind)} released.{Style.RESET_ALL}")
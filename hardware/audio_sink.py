@@ -0,0 +1,178 @@
+# audio_sink.py
+
+from pathlib import Path
+from concurrent.futures import Future
+from colorama import Style
+
+from clock import SYSTEM_CLOCK
+from sound_controller import SoundController
+from audio_engine import PlaylistEntry
+from audio_stream import AudioStream
+from audio_transcoder import read_clip_info
+
+
+class PygameAudioSink:
+    """
+    The game thread's handle on the box's audio. Every call is a non-blocking
+    enqueue to the SoundController (the OutputManager's "sound" actuator), which
+    resolves files, decodes and plays on its own threads. The mixer is a
+    process-wide device, so there is one of these per physical box.
+    """
+
+    def __init__(self, file_service, game_name: str, clock=None, sound_controller: SoundController = None):
+        self.file_service = file_service
+        self.game_name = game_name
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.sound = sound_controller if sound_controller else SoundController(file_service, clock=self.clock)
+
+    def preload(self, config: dict):
+        """Decodes the sound effects, the starting description and the first path(s) in the background."""
+        self.sound.preload(self.game_name, config)
+
+    def enter_path(self, path_index: int):
+        """Lets the player prefetch the next path's narration and release earlier ones."""
+        self.sound.enter_path(path_index)
+
+    def play_sfx(self, name: str):
+        """Plays a sound effect ('correct', 'wrong' or 'victory') over ducked narration."""
+        self.sound.set_effect(sfx=name)
+
+    def play_cue(self, file_path: str):
+        """Plays an audio cue on the ambience channel (skipped if the file doesn't exist)."""
+        self.sound.set_effect(file=file_path)
+
+    def play(self, audio_type: str, path_identifier: str, text: str = "") -> Future:
+        """
+        Starts a clip without blocking. Hints get their own channel and duck the
+        narration instead of cutting it; everything else replaces the narration.
+
+        Returns:
+            Future: Resolves True when the clip played to the end, False if it was
+            missing, replaced or stopped.
+        """
+        return self.sound.set_effect(type_prefix=audio_type, path_name=path_identifier, game_name=self.game_name)
+
+    def play_hint_clue(self, path_identifier: str, clue_index: int, text: str = "") -> Future:
+        """Plays a single clue of a path's hint (the whole hint if the clue has no clip)."""
+        return self.sound.set_effect(type_prefix=self.file_service.get_hint_clue_type_prefix(clue_index),
+                                     path_name=path_identifier, game_name=self.game_name, fallback_prefix="hint")
+
+    def narrate(self, audio_type: str, path_identifier: str, text: str = "") -> Future:
+        """Starts a narration clip; the Future resolves when it ends or stop_narration() cuts it."""
+        return self.play(audio_type, path_identifier, text)
+
+    def narrate_sequence(self, clips: list[tuple], gap: float = 0.0) -> list[PlaylistEntry]:
+        """
+        Plays narration clips [(audio_type, path_identifier, text), ...] back to back
+        without gaps (or `gap` seconds of silence apart).
+
+        Returns:
+            list[PlaylistEntry]: Per clip, a future and its start/end timestamps.
+        """
+        return self.sound.play_playlist([(audio_type, path_identifier, self.game_name)
+                                         for audio_type, path_identifier, _ in clips], gap=gap)
+
+    def narrate_stream(self, stream: AudioStream) -> Future:
+        """Starts narration that is still being synthesized (see SoundController.play_stream)."""
+        return self.sound.play_stream(stream)
+
+    def play_and_wait(self, audio_type: str, path_identifier: str, text: str = ""):
+        """Plays a clip and blocks until the engine reports it finished."""
+        if self.narrate(audio_type, path_identifier, text).result():
+            print(f"{Style.DIM}  - Sound has FINISHED.{Style.RESET_ALL}")
+
+    def skip_narration(self):
+        """Cuts the current narration clip (the next clip of a sequence starts right away)."""
+        self.sound.skip_narration()
+
+    def stop_narration(self):
+        self.sound.stop_narration()
+
+    def stop(self):
+        self.sound.stop_all()
+
+
+class NullAudioSink:
+    """
+    Plays nothing. Blocking narration advances the session's clock by the clip's
+    length instead (from its transcoding sidecar when there is one, otherwise
+    estimated from the text), so simulated sessions keep realistic timing.
+    """
+
+    # Rough narration speed used when there is no audio to measure
+    WORDS_PER_SECOND = 2.5
+
+    def __init__(self, clock, file_service=None, game_name: str = None):
+        self.clock = clock
+        self.file_service = file_service
+        self.game_name = game_name
+        self.log = []  # (clock time, kind, detail)
+
+    @classmethod
+    def estimate_duration(cls, text: str) -> float:
+        return len(text.split()) / cls.WORDS_PER_SECOND
+
+    def clip_duration(self, audio_type: str, path_identifier: str, text: str) -> float:
+        if self.file_service:
+            file_name = self.file_service.get_audio_filename(audio_type, path_identifier)
+            info = read_clip_info(Path(self.file_service.get_audio_folder_path(self.game_name)) / file_name)
+            if info:
+                return info["duration"]
+        return self.estimate_duration(text)
+
+    def preload(self, config: dict):
+        pass
+
+    def enter_path(self, path_index: int):
+        pass
+
+    def play_sfx(self, name: str):
+        self.log.append((self.clock.now(), "sfx", name))
+
+    def play_cue(self, file_path: str):
+        self.log.append((self.clock.now(), "cue", file_path))
+
+    def play(self, audio_type: str, path_identifier: str, text: str = ""):
+        self.log.append((self.clock.now(), audio_type, path_identifier))
+
+    def play_hint_clue(self, path_identifier: str, clue_index: int, text: str = ""):
+        self.log.append((self.clock.now(), f"hint_clue{clue_index + 1}", path_identifier))
+
+    def narrate(self, audio_type: str, path_identifier: str, text: str = "") -> Future:
+        """The simulated player always listens to the end, so narration completes immediately."""
+        self.play_and_wait(audio_type, path_identifier, text)
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def narrate_sequence(self, clips: list[tuple], gap: float = 0.0) -> list[PlaylistEntry]:
+        entries = []
+        for audio_type, path_identifier, text in clips:
+            if entries:
+                self.clock.advance(gap)
+            entry = PlaylistEntry(path_identifier)
+            entry.started_at = self.clock.now()
+            self.play_and_wait(audio_type, path_identifier, text)
+            entry.ended_at = self.clock.now()
+            entry.future.set_result(True)
+            entries.append(entry)
+        return entries
+
+    def narrate_stream(self, stream: AudioStream) -> Future:
+        self.log.append((self.clock.now(), "stream", None))
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def play_and_wait(self, audio_type: str, path_identifier: str, text: str = ""):
+        self.play(audio_type, path_identifier, text)
+        self.clock.advance(self.clip_duration(audio_type, path_identifier, text))
+
+    def skip_narration(self):
+        pass
+
+    def stop_narration(self):
+        pass
+
+    def stop(self):
+        pass
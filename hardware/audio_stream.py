@@ -0,0 +1,152 @@
+# audio_stream.py
+
+import threading
+from colorama import Fore, Style
+
+from clock import SYSTEM_CLOCK
+from audio_transcoder import MIXER_FREQUENCY, MIXER_CHANNELS
+
+# Audio buffered before a stream starts playing, so a slow first chunk doesn't stutter
+DEFAULT_PREBUFFER = 0.25
+
+
+class AudioStream:
+    """
+    A clip that is still arriving (e.g. TTS audio while it downloads): the producer
+    write()s PCM in the mixer's format and close()s it; the AudioEngine takes()
+    whatever has arrived and keeps it queued on a channel, so playback starts with
+    the first chunk instead of after the whole download.
+    """
+
+    def __init__(self, prebuffer: float = DEFAULT_PREBUFFER, clock=None,
+                 frequency: int = MIXER_FREQUENCY, channels: int = MIXER_CHANNELS, sample_width: int = 2):
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.frame_bytes = channels * sample_width
+        self.bytes_per_second = frequency * self.frame_bytes
+        self.prebuffer_bytes = int(prebuffer * frequency) * self.frame_bytes
+        self.pending = bytearray()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.error = None
+        self.on_data = None  # set by the AudioEngine: wakes its thread when data arrives
+        # Timing (clock time), for measuring time-to-first-sound
+        self.created_at = self.clock.now()
+        self.first_data_at = None
+        self.started_at = None  # set by the AudioEngine when the first chunk plays
+        self.closed_at = None
+        self.total_bytes = 0
+
+    def write(self, pcm: bytes):
+        if not pcm:
+            return
+        with self.lock:
+            if self.first_data_at is None:
+                self.first_data_at = self.clock.now()
+            self.pending.extend(pcm)
+            self.total_bytes += len(pcm)
+        self._notify()
+
+    def close(self, error=None):
+        """Marks the end of the clip (`error` if the download failed part-way)."""
+        with self.lock:
+            self.closed = True
+            self.error = error
+            self.closed_at = self.clock.now()
+        self._notify()
+
+    def _notify(self):
+        callback = self.on_data
+        if callback:
+            callback()
+
+    def ready(self) -> bool:
+        """True once enough audio arrived to start playing (or nothing more will)."""
+        with self.lock:
+            return self.closed or len(self.pending) >= self.prebuffer_bytes
+
+    def take(self) -> bytes:
+        """Returns (and removes) every whole frame that has arrived so far."""
+        with self.lock:
+            usable = len(self.pending) - len(self.pending) % self.frame_bytes
+            data = bytes(self.pending[:usable])
+            del self.pending[:usable]
+            return data
+
+    @property
+    def done(self) -> bool:
+        """True once the stream is closed and everything was handed out."""
+        with self.lock:
+            return self.closed and len(self.pending) < self.frame_bytes
+
+    @property
+    def duration(self) -> float:
+        return self.total_bytes / self.bytes_per_second
+
+    def report(self) -> str:
+        def since_created(moment):
+            return f"{(moment - self.created_at) * 1000:.0f} ms" if moment is not None else "n/a"
+        return (f"first bytes {since_created(self.first_data_at)}, first sound {since_created(self.started_at)}, "
+                f"download done {since_created(self.closed_at)} ({self.duration:.1f} s of audio)")
+
+
+# Time-to-first-sound against the local ElevenLabs stand-in:
+#   python audio_stream.py [--driver dummy] [--speed 2.0] [--latency 0.3]
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import argparse
+    import tempfile
+    import pygame
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault("ELEVEN_API_KEY", "stand-in")
+    from elevenlabsAPI.standin_server import ElevenLabsStandIn
+    from elevenlabsAPI.tts_service import TTSService
+    from sound_controller import SoundController
+    from filename_service import FileNameService
+    from audio_transcoder import MIXER_SIZE, MIXER_BUFFER
+
+    parser = argparse.ArgumentParser(description="Compare buffered and streamed TTS playback.")
+    parser.add_argument("--driver", default=None, help="SDL audio driver (e.g. 'dummy' without a sound card)")
+    parser.add_argument("--speed", type=float, default=2.0, help="stand-in synthesis speed (x real time)")
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in time to first byte (s)")
+    args = parser.parse_args()
+
+    if args.driver:
+        os.environ["SDL_AUDIODRIVER"] = args.driver
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+    pygame.init()
+
+    # Clips are written to a scratch copy of the games folder, not the catalog
+    base_dir = tempfile.mkdtemp(prefix="stream-test-")
+    server = ElevenLabsStandIn(speed=args.speed, first_byte_latency=args.latency)
+    api_url = server.start()
+    tts = TTSService(base_dir, api_url=api_url)
+    controller = SoundController(FileNameService(base_dir))
+    text = "The stand-in ignores the text and speaks a recorded clip."
+    game_name = "stream-test"
+
+    try:
+        print(f"{Fore.BLUE}--- Buffered: download, save, then play ---{Style.RESET_ALL}")
+        started = time.monotonic()
+        saved = tts.generate_and_save_audio(text, "buffered_test.mp3", game_name)
+        buffered = controller.engine.play("narration", saved)
+        while not controller.engine.is_busy("narration") and not buffered.done():
+            time.sleep(0.001)
+        buffered_first_sound = time.monotonic() - started
+        buffered.result(timeout=120)
+
+        print(f"{Fore.BLUE}--- Streamed: play while downloading ---{Style.RESET_ALL}")
+        stream = AudioStream()
+        played = controller.play_stream(stream)
+        tts.stream_and_save_audio(text, "streamed_test.mp3", game_name, stream=stream)
+        played.result(timeout=120)
+
+        print(f"\n{Fore.GREEN}Buffered: first sound after {buffered_first_sound * 1000:.0f} ms.{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}Streamed: {stream.report()}, "
+              f"finished {(time.monotonic() - stream.started_at - stream.duration) * 1000:+.0f} ms "
+              f"after its length.{Style.RESET_ALL}")
+    finally:
+        controller.stop()
+        server.stop()
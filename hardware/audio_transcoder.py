@@ -0,0 +1,260 @@
+# audio_transcoder.py
+
+import os
+import sys
+import json
+import math
+import wave
+import array
+import operator
+from pathlib import Path
+from colorama import Fore, Style
+
+# The mixer's native format (main.py pre-initialises pygame.mixer with these)
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16  # signed 16-bit
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+NATIVE_SUFFIX = ".wav"
+SIDECAR_SUFFIX = ".meta.json"
+
+
+def native_path(path) -> Path:
+    """The transcoded, mixer-native sibling of a clip (e.g. hint_x.mp3 -> hint_x.wav)."""
+    return Path(path).with_suffix(NATIVE_SUFFIX)
+
+
+def sidecar_path(path) -> Path:
+    """The metadata sidecar of a clip (e.g. hint_x.mp3 -> hint_x.meta.json)."""
+    return Path(path).with_suffix(SIDECAR_SUFFIX)
+
+
+def playable_path(path) -> Path:
+    """Returns the transcoded clip if it exists, otherwise the original."""
+    native = native_path(path)
+    return native if native.exists() else Path(path)
+
+
+def read_clip_info(path):
+    """
+    Returns a clip's sidecar metadata ({"duration", "peak", "rms", ...}) without
+    opening the audio, or None if it was never transcoded.
+    """
+    try:
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _to_dbfs(level: float) -> float:
+    return round(20 * math.log10(level), 2) if level > 0 else float("-inf")
+
+
+class PcmConverter:
+    """
+    Converts 16-bit PCM arriving in chunks (e.g. a TTS stream) to the mixer's rate
+    and channel count. Only whole-number upsampling (linear interpolation) and
+    mono-to-stereo are supported, which covers 22050 Hz mono TTS output.
+    The last input sample is carried over, so chunk boundaries are seamless.
+    """
+
+    def __init__(self, source_rate: int, source_channels: int,
+                 target_rate: int = MIXER_FREQUENCY, target_channels: int = MIXER_CHANNELS):
+        if target_rate % source_rate or source_channels not in (1, target_channels):
+            raise ValueError(f"Can't convert {source_rate} Hz/{source_channels} ch to {target_rate} Hz/{target_channels} ch.")
+        if source_channels != 1 and target_rate != source_rate:
+            raise ValueError("Only mono PCM can be resampled.")
+        self.factor = target_rate // source_rate
+        self.duplicate = target_channels // source_channels
+        self.remainder = b""  # odd trailing byte of the previous chunk
+        self.previous = None  # last input sample (interpolation needs one sample of lookahead)
+
+    def _expand(self, samples: array.array) -> bytes:
+        if self.duplicate > 1:
+            stereo = array.array('h', bytes(len(samples) * 2 * self.duplicate))
+            for channel in range(self.duplicate):
+                stereo[channel::self.duplicate] = samples
+            samples = stereo
+        return samples.tobytes()
+
+    def convert(self, data: bytes) -> bytes:
+        data = self.remainder + data
+        usable = len(data) - len(data) % 2
+        self.remainder = data[usable:]
+        samples = array.array('h', data[:usable])
+        if not samples or self.factor == 1:
+            return self._expand(samples)
+
+        if self.previous is None:
+            self.previous = samples[0]
+        points = array.array('h', [self.previous]) + samples
+        self.previous = samples[-1]
+        out = array.array('h', bytes(len(samples) * 2 * self.factor))
+        out[0::self.factor] = points[:-1]
+        for step in range(1, self.factor):
+            out[step::self.factor] = array.array(
+                'h', [a + (b - a) * step // self.factor for a, b in zip(points, points[1:])])
+        return self._expand(out)
+
+    def flush(self) -> bytes:
+        """The output still owed for the last input sample."""
+        if self.previous is None or self.factor == 1:
+            return b""
+        tail, self.previous = array.array('h', [self.previous] * self.factor), None
+        return self._expand(tail)
+
+
+class NativeClipWriter:
+    """
+    Writes a mixer-native WAV and its sidecar next to a clip, as PCM arrives.
+    The WAV is written to a temporary file and only replaces the clip's native
+    file on close(), so a half-written clip is never played.
+    """
+
+    def __init__(self, source, frequency: int = MIXER_FREQUENCY, channels: int = MIXER_CHANNELS, sample_width: int = 2):
+        self.source = Path(source)
+        self.native = native_path(source)
+        self.tmp_path = self.native.with_name(self.native.name + ".tmp")
+        self.frequency = frequency
+        self.channels = channels
+        self.sample_width = sample_width
+        self.wav = wave.open(str(self.tmp_path), 'wb')
+        self.wav.setnchannels(channels)
+        self.wav.setsampwidth(sample_width)
+        self.wav.setframerate(frequency)
+        self.frames_bytes = 0
+        self.peak = 0
+        self.square_sum = 0
+        self.sample_count = 0
+
+    def write(self, pcm: bytes):
+        self.wav.writeframes(pcm)
+        self.frames_bytes += len(pcm)
+        samples = array.array('h', pcm) if self.sample_width == 2 else array.array('b', pcm)
+        self.peak = max(self.peak, max(map(abs, samples), default=0))
+        self.square_sum += sum(map(operator.mul, samples, samples))
+        self.sample_count += len(samples)
+
+    def abort(self):
+        """Discards a clip that couldn't be completed."""
+        self.wav.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def close(self) -> dict:
+        """Moves the WAV into place and writes the sidecar; returns the sidecar metadata."""
+        self.wav.close()
+        os.replace(self.tmp_path, self.native)
+
+        full_scale = float(2 ** (8 * self.sample_width - 1))
+        peak = self.peak / full_scale
+        rms = math.sqrt(self.square_sum / self.sample_count) / full_scale if self.sample_count else 0.0
+        info = {
+            "source": self.source.name,
+            "file": self.native.name,
+            "duration": round(self.frames_bytes / (self.frequency * self.channels * self.sample_width), 3),
+            "sample_rate": self.frequency,
+            "channels": self.channels,
+            "sample_width": self.sample_width,
+            "peak": round(peak, 4),
+            "rms": round(rms, 4),
+            "peak_dbfs": _to_dbfs(peak),
+            "rms_dbfs": _to_dbfs(rms),
+        }
+        with open(sidecar_path(self.source), 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2)
+        return info
+
+
+class AudioTranscoder:
+    """
+    Converts generated MP3s into PCM WAVs in the mixer's native format, so the Pi
+    copies samples at playback time instead of decoding (and resampling) MP3 while
+    the encoder threads are polling. Each clip also gets a JSON sidecar with its
+    duration, peak and RMS.
+    """
+
+    def __init__(self):
+        import pygame
+        self.pygame = pygame
+        if not pygame.mixer.get_init():
+            # Offline use (backfill): decode without needing a sound card
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+            pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+        self.frequency, size, self.channels = pygame.mixer.get_init()
+        self.sample_width = abs(size) // 8
+        if (self.frequency, size, self.channels) != (MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS):
+            print(f"{Fore.YELLOW}Warning: mixer runs at {self.frequency} Hz/{size} bit/{self.channels} ch, "
+                  f"not the native {MIXER_FREQUENCY} Hz/{MIXER_SIZE} bit/{MIXER_CHANNELS} ch.{Style.RESET_ALL}")
+
+    def is_up_to_date(self, source) -> bool:
+        """True if the clip was transcoded after its source was last written."""
+        native, sidecar = native_path(source), sidecar_path(source)
+        if not (native.exists() and sidecar.exists()):
+            return False
+        return native.stat().st_mtime_ns >= Path(source).stat().st_mtime_ns
+
+    def transcode(self, source, force: bool = False):
+        """
+        Transcodes one clip next to its source.
+
+        Returns:
+            dict: The sidecar metadata, or None if the clip could not be decoded.
+        """
+        source = Path(source)
+        if not force and self.is_up_to_date(source):
+            return read_clip_info(source)
+
+        try:
+            # pygame decodes and resamples to the mixer's format on load
+            pcm = self.pygame.mixer.Sound(str(source)).get_raw()
+        except (self.pygame.error, FileNotFoundError) as e:
+            print(f"{Fore.RED}Transcode Error: could not decode {source}: {e}{Style.RESET_ALL}")
+            return None
+
+        writer = NativeClipWriter(source, self.frequency, self.channels, self.sample_width)
+        writer.write(pcm)
+        return writer.close()
+
+    def transcode_folder(self, folder, force: bool = False) -> int:
+        """Transcodes every MP3 in a folder; returns how many clips failed."""
+        failed = 0
+        for source in sorted(Path(folder).glob("*.mp3")):
+            info = self.transcode(source, force=force)
+            if info is None:
+                failed += 1
+                continue
+            print(f"{Style.DIM}  {source.name} -> {info['file']} ({info['duration']:.1f} s, "
+                  f"peak {info['peak_dbfs']} dBFS, rms {info['rms_dbfs']} dBFS){Style.RESET_ALL}")
+        return failed
+
+    def transcode_game(self, file_service, game_name: str, force: bool = False) -> bool:
+        """Transcodes a game's narration and audio cues; True if every clip succeeded."""
+        print(f"{Fore.BLUE}--- Transcoding audio for {game_name} ---{Style.RESET_ALL}")
+        failed = 0
+        for folder in (file_service.get_audio_folder_path(game_name),
+                       file_service.get_sound_effects_folder_path(game_name)):
+            if os.path.isdir(folder):
+                failed += self.transcode_folder(folder, force=force)
+        return failed == 0
+
+
+# Backfill existing games: python audio_transcoder.py [--force] [game-name ...]
+if __name__ == "__main__":
+    from filename_service import FileNameService
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    file_service = FileNameService(base_dir)
+    args = sys.argv[1:]
+    force = "--force" in args
+    game_names = [arg for arg in args if arg != "--force"]
+    if not game_names:
+        with open(os.path.join(file_service.get_game_folder_path(""), 'available_games.txt'), 'r') as f:
+            game_names = [line.strip().lower() for line in f if line.strip()]
+
+    transcoder = AudioTranscoder()
+    transcoder.transcode_folder(os.path.join(base_dir, "sfx"), force=force)
+    results = [transcoder.transcode_game(file_service, game_name, force=force) for game_name in game_names]
+    print(f"{sum(results)}/{len(results)} games transcoded without errors.")
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,83 @@
+# clock.py
+
+import time
+import threading
+
+
+class MonotonicClock:
+    """
+    Real time. Uses the monotonic clock so NTP adjustments can't shorten timers
+    or debounce windows (time.time() can jump in both directions).
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, waitable, timeout: float = None) -> bool:
+        """
+        Waits on a threading.Event or a held threading.Condition for at most
+        `timeout` seconds of this clock's time. Returns what waitable.wait() returns.
+        """
+        return waitable.wait(timeout)
+
+
+class VirtualClock:
+    """
+    Manually advanced time for tests and simulations.
+
+    Nothing moves until advance() is called: sleep() and wait() on other threads
+    block until enough virtual time has passed, so a 90 s path timer, a 100 ms
+    debounce window or a 2 s rattle cost no real time. With auto_advance=True,
+    sleep() moves the clock itself, which suits single-threaded code.
+    """
+
+    # Real-time granularity used while waiting for another thread to advance the clock
+    REAL_POLL_INTERVAL = 0.001
+
+    def __init__(self, start: float = 0.0, auto_advance: bool = False):
+        self._now = start
+        self.auto_advance = auto_advance
+        self._condition = threading.Condition()
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        """Moves time forward and wakes every thread sleeping on this clock."""
+        if seconds > 0:
+            with self._condition:
+                self._now += seconds
+                self._condition.notify_all()
+
+    def advance_to(self, timestamp: float):
+        self.advance(timestamp - self._now)
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        if self.auto_advance:
+            self.advance(seconds)
+            return
+        with self._condition:
+            target = self._now + seconds
+            while self._now < target:
+                self._condition.wait()
+
+    def wait(self, waitable, timeout: float = None) -> bool:
+        """Like MonotonicClock.wait(), but the timeout elapses in virtual time."""
+        deadline = None if timeout is None else self._now + timeout
+        while True:
+            if waitable.wait(self.REAL_POLL_INTERVAL):
+                return True
+            if deadline is not None and self._now >= deadline:
+                return False
+            if deadline is not None and self.auto_advance:
+                self.advance(min(self.REAL_POLL_INTERVAL, deadline - self._now))
+
+
+# Shared default for every component that isn't handed a clock explicitly
+SYSTEM_CLOCK = MonotonicClock()
@@ -0,0 +1,198 @@
+# cue_timeline.py
+
+import time
+import heapq
+import threading
+import itertools
+from colorama import Fore, Style
+from clock import SYSTEM_CLOCK, MonotonicClock
+
+# Anchors a timeline action can be attached to. "start" is released when the path
+# starts, "narration_end" when GameSequence reports that the description finished.
+ANCHOR_START = "start"
+ANCHOR_NARRATION_END = "narration_end"
+
+# Where each kind of path effect lands by default
+EFFECT_ANCHORS = {
+    "light": (ANCHOR_START, 0.0),              # set the mood while the description is read
+    "vibration": (ANCHOR_NARRATION_END, 0.0),  # rattle the box the moment the player takes over
+}
+CUE_DEVICE = "cue"
+
+
+class TimelineAction:
+    """A single output action, `offset` seconds after its anchor is released."""
+    def __init__(self, anchor: str, offset: float, device_type: str, params: dict):
+        self.anchor = anchor
+        self.offset = offset
+        self.device_type = device_type
+        self.params = params
+
+    def __repr__(self):
+        return f"TimelineAction({self.anchor!r}+{self.offset:.3f}s, {self.device_type!r}, {self.params!r})"
+
+
+def compile_path_timeline(path_config: dict, cue_path: str = None) -> list[TimelineAction]:
+    """
+    Turns a path's 'effects' and 'audio_cue' into time-ordered actions.
+
+    Args:
+        path_config (dict): A compiled path (see GameConfigCompiler).
+        cue_path (str): The resolved file for the path's audio_cue, or None if it
+            doesn't exist on disk (the cue is then skipped).
+
+    Returns:
+        list[TimelineAction]: Sorted by anchor, then offset.
+    """
+    actions = []
+    if cue_path:
+        actions.append(TimelineAction(ANCHOR_START, 0.0, CUE_DEVICE, {"file": cue_path}))
+
+    for effect in path_config.get("effects", []):
+        params = {k: v for k, v in effect.items() if k not in ("actuator", "anchor", "offset")}
+        device_type = effect["actuator"]
+        anchor, offset = EFFECT_ANCHORS.get(device_type, (ANCHOR_START, 0.0))
+        # Effects may pin themselves explicitly, e.g. {"anchor": "start", "offset": 1.5}
+        anchor = effect.get("anchor", anchor)
+        offset = float(effect.get("offset", offset))
+        actions.append(TimelineAction(anchor, offset, device_type, params))
+
+    anchor_order = {ANCHOR_START: 0, ANCHOR_NARRATION_END: 1}
+    actions.sort(key=lambda a: (anchor_order.get(a.anchor, 2), a.offset))
+    return actions
+
+
+class CueTimeline:
+    """
+    Owns one timing thread that fires light, vibration and cue-sound actions at
+    their scheduled times. The game thread only hands over actions and anchor
+    marks and never blocks on an effect.
+    """
+
+    # Below this, stop waiting on the condition and spin for the last bit for ms alignment
+    SPIN_THRESHOLD = 0.002
+
+    def __init__(self, output_manager, cue_player=None, clock=None, verbose: bool = False):
+        self.output_manager = output_manager
+        # Reports each action's lateness; off by default, console I/O would cost the timing thread
+        self.verbose = verbose
+        self.cue_player = cue_player
+        self.clock = clock if clock else SYSTEM_CLOCK
+        # Spinning only makes sense against real time; a virtual clock jumps
+        self.spin_threshold = self.SPIN_THRESHOLD if isinstance(self.clock, MonotonicClock) else 0.0
+        self.condition = threading.Condition()
+        self.heap = []              # (due_time, seq, generation, action)
+        self.waiting = {}           # anchor -> [actions] not yet released
+        self.generation = 0         # bumped by cancel() so stale heap entries are dropped
+        self.sequence = itertools.count()
+        self.running = False
+        self.worker_thread = None
+
+    def start(self):
+        """Starts the timing thread."""
+        if not self.running:
+            self.running = True
+            self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+            self.worker_thread.start()
+
+    def stop(self):
+        """Stops the timing thread and drops everything that hasn't fired yet."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=1)
+
+    def play(self, actions: list[TimelineAction]):
+        """Replaces the current timeline and releases its 'start' anchor now."""
+        self.cancel()
+        with self.condition:
+            for action in actions:
+                self.waiting.setdefault(action.anchor, []).append(action)
+        self.mark(ANCHOR_START)
+
+    def mark(self, anchor: str):
+        """Releases every action waiting on `anchor`; their offsets count from now."""
+        now = self.clock.now()
+        with self.condition:
+            for action in self.waiting.pop(anchor, []):
+                heapq.heappush(self.heap, (now + action.offset, next(self.sequence), self.generation, action))
+            self.condition.notify()
+
+    def cancel(self):
+        """Drops all pending and waiting actions (e.g. the path ended)."""
+        with self.condition:
+            self.generation += 1
+            self.heap.clear()
+            self.waiting.clear()
+            self.condition.notify()
+
+    def _next_due(self):
+        """Blocks until the next action is due; returns (action, lateness) or None when stopping."""
+        with self.condition:
+            while self.running:
+                if not self.heap:
+                    self.clock.wait(self.condition)
+                    continue
+                due_time, _, generation, action = self.heap[0]
+                remaining = due_time - self.clock.now()
+                if remaining > self.spin_threshold:
+                    self.clock.wait(self.condition, remaining - self.spin_threshold)
+                    continue
+                if remaining > 0:
+                    # Release the lock while spinning so mark()/cancel() aren't blocked.
+                    self.condition.release()
+                    try:
+                        while self.clock.now() < due_time:
+                            pass
+                    finally:
+                        self.condition.acquire()
+                    continue
+                heapq.heappop(self.heap)
+                if generation != self.generation:
+                    continue
+                return action, -remaining
+        return None
+
+    def _worker(self):
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            action, lateness = due
+            try:
+                self._dispatch(action)
+                if self.verbose:
+                    print(f"{Style.DIM}⏱ {action.device_type} {action.params} (late {lateness * 1000:.1f} ms){Style.RESET_ALL}")
+            except Exception as e:
+                print(f"{Fore.RED}Timeline error for {action}: {e}{Style.RESET_ALL}")
+
+    def _dispatch(self, action: TimelineAction):
+        if action.device_type == CUE_DEVICE:
+            if self.cue_player:
+                self.cue_player(action.params["file"])
+            return
+        self.output_manager.dispatch(action.device_type, action.params)
+
+
+# Test without hardware: python cue_timeline.py
+if __name__ == "__main__":
+    class PrintingOutputManager:
+        def dispatch(self, device_type, params):
+            print(f"{time.monotonic() - t0:7.3f}s  {device_type}: {params}")
+
+    path = {
+        "effects": [
+            {"actuator": "vibration", "mode": "rattle", "duration": 2},
+            {"actuator": "light", "mode": "pulse", "color": "green"},
+            {"actuator": "light", "mode": "static", "color": "red", "anchor": "narration_end", "offset": 0.5},
+        ]
+    }
+    timeline = CueTimeline(PrintingOutputManager(), cue_player=lambda f: print(f"cue {f}"), verbose=True)
+    timeline.start()
+    t0 = time.monotonic()
+    timeline.play(compile_path_timeline(path, cue_path="clock_chime.mp3"))
+    time.sleep(1.0)  # "narration"
+    timeline.mark(ANCHOR_NARRATION_END)
+    time.sleep(1.0)
+    timeline.stop()
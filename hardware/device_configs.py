@@ -0,0 +1,63 @@
+# device_configs.py
+
+# Hardware-free description of the box's input devices. Kept separate from
+# input_manager.py so the game config compiler (and anything else that only needs
+# to know *what* the box can produce) can import it without RPi.GPIO / smbus.
+
+IMAGE_OPTIONS = ["dynamite", "knife", "candle", "key", "rope", "book", "dice", "potion", "stick", "compass"] # 10 images
+NUMBER_OPTIONS = [str(i) for i in range(0, 10)] # 10 numbers
+DISTANCE_STATES = ["covered", "hovered", "clear"] # see DistanceController._get_state
+GYRO_STATES = ["shaking"]
+
+# Define device configurations (Hint and Repeat are crucial here)
+DEVICE_CONFIGS = [
+    {"type": "sx1509_button", "value": "red", "pin": 1},
+    {"type": "sx1509_button", "value": "yellow", "pin": 2},
+    {"type": "sx1509_button", "value": "blue", "pin": 3},
+    {"type": "sx1509_button", "value": "green", "pin": 4},
+    {"type": "sx1509_button", "value": "hint", "pin": 13}, # MENU START GAME/HINT
+    {"type": "sx1509_button", "value": "repeat", "pin": 14},# MENU SWITCH GAME/REPEAT
+    {"type": "gyro", "value": "shaking"},
+    {"type": "rotary_encoder", "name": "rotary_encoder_picture", "clk_pin": 20, "dt_pin": 21, "button_pin": 16},
+    {"type": "rotary_encoder", "name": "rotary_encoder_number", "clk_pin": 13, "dt_pin": 19, "button_pin": 26},
+    {"type": "distance_sensor", "trigger_pin": 23, "echo_pin": 24},
+]
+
+# Button values the game engine reserves for its own commands (never puzzle input)
+RESERVED_BUTTON_VALUES = {"hint", "repeat"}
+
+
+def get_encoder_options(name: str) -> list[str]:
+    """Returns the option list a rotary encoder with the given name cycles through."""
+    if name == "rotary_encoder_picture":
+        return IMAGE_OPTIONS
+    elif name == "rotary_encoder_number":
+        return NUMBER_OPTIONS
+    return []
+
+
+def get_input_vocabulary(device_configs: list[dict]) -> dict[str, set[str]]:
+    """
+    Maps every sensor type (as used in a game's 'solution_sequence') to the set of
+    values the configured devices can actually emit.
+
+    Args:
+        device_configs (list[dict]): The same list that is handed to the InputManager.
+
+    Returns:
+        dict[str, set[str]]: e.g. {"button": {"red", ...}, "rotary_encoder_picture": {...}}
+    """
+    vocabulary: dict[str, set[str]] = {}
+    for config in device_configs:
+        device_type = config.get("type")
+        if device_type == "sx1509_button":
+            if config["value"] not in RESERVED_BUTTON_VALUES:
+                vocabulary.setdefault("button", set()).add(config["value"])
+        elif device_type == "gyro":
+            vocabulary.setdefault("gyro", set()).update(GYRO_STATES)
+        elif device_type == "rotary_encoder":
+            name = config["name"]
+            vocabulary.setdefault(name, set()).update(get_encoder_options(name))
+        elif device_type == "distance_sensor":
+            vocabulary.setdefault("distance_sensor", set()).update(DISTANCE_STATES)
+    return vocabulary
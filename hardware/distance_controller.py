@@ -4,10 +4,12 @@ import threading
 import queue
 from input_event import InputEvent
 from colorama import Fore, Style
+from clock import SYSTEM_CLOCK
 
 class DistanceController:
-    def __init__(self, name, event_queue, trigger_pin, echo_pin):
+    def __init__(self, name, event_queue, trigger_pin, echo_pin, clock=None):
         self.name = name
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.event_queue = event_queue
         self.trigger_pin = trigger_pin
         self.echo_pin = echo_pin
@@ -26,13 +28,14 @@ class DistanceController:
         time.sleep(0.00001)
         GPIO.output(self.trigger_pin, False)
 
-        start_time = time.time()
-        stop_time = time.time()
+        # The echo pulse is real hardware timing, never virtual: use a monotonic high-res counter
+        start_time = time.perf_counter()
+        stop_time = time.perf_counter()
 
         while GPIO.input(self.echo_pin) == 0:
-            start_time = time.time()
+            start_time = time.perf_counter()
         while GPIO.input(self.echo_pin) == 1:
-            stop_time = time.time()
+            stop_time = time.perf_counter()
 
         time_elapsed = stop_time - start_time
         distance = (time_elapsed * 34300) / 2
@@ -53,13 +56,13 @@ class DistanceController:
         while self.running:
             current_state = self._get_state()
             if current_state != self.last_state:
-                event = InputEvent("distance_sensor", current_state)
+                event = InputEvent("distance_sensor", current_state, timestamp=self.clock.now())
                 if self.last_state is not None:
                     self.event_queue.put(event)
                     print(f"{Style.DIM}[{self.name}] State change: {self.last_state} -> {current_state}{Style.RESET_ALL}")
                 self.last_state = current_state
             
-            time.sleep(2) # Poll every 2 seconds
+            self.clock.sleep(2) # Poll every 2 seconds
 
     def start(self):
         """Starts the sensor polling thread."""
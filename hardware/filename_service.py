@@ -15,16 +15,24 @@ class FileNameService:
         """Returns the full path to the game's audio folder."""
         return os.path.join(self.get_game_folder_path(game_name), 'audio')
 
+    def get_sound_effects_folder_path(self, game_name: str) -> str:
+        """Returns the full path to the game's sound effects folder (audio cues)."""
+        return os.path.join(self.get_game_folder_path(game_name), 'sound_effects')
+
     def get_game_json_path(self, game_name: str) -> str:
         """Returns the full path to the main game JSON configuration file."""
         return os.path.join(self.get_game_folder_path(game_name), f"{game_name}.json")
 
+    def get_hint_clue_type_prefix(self, clue_index: int) -> str:
+        """Returns the audio type prefix of a single hint clue (e.g. 'hint_clue2' for index 1)."""
+        return f"hint_clue{clue_index + 1}"
+
     def get_audio_filename(self, type_prefix: str, path_name: str) -> str:
         """
         Creates a consistent audio filename (e.g., 'hint_the_sheriffs_safe.mp3').
         
         Args:
-            type_prefix (str): 'starting_description', 'hint', 'description', or 'death_text'.
+            type_prefix (str): 'starting_description', 'hint', 'hint_clue<n>', 'description', or 'death_text'.
             path_name (str): The value from the JSON's 'path_name' key.
             
         Returns:
@@ -3,18 +3,143 @@
 import os
 import json
 import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style
 from elevenlabsAPI.tts_service import TTSService
+from elevenlabsAPI.ttse_service import TTSEService, collect_audio_cues
 from filename_service import FileNameService
+from audio_transcoder import AudioTranscoder
+from audio_stream import AudioStream
+from game_config_compiler import split_hint_clues
 
 # colorama.init(autoreset=True)
 
+# TTS requests are independent, so several clips are synthesized at once
+# (TTSService additionally caps how many of them are in flight at the provider)
+TTS_WORKERS = 4
+# Job type of a path's audio cue: a sound effect saved under the cue's own file name
+AUDIO_CUE = "audio_cue"
+
+class AudioGenerationJob:
+    """
+    One game's clips being generated in the background, in play order. Playback
+    asks it whether a clip is still coming and gets called back once it is there
+    (generated or failed), so a game can start before all of its audio exists.
+    """
+
+    def __init__(self, game_name: str, file_names: list[str]):
+        self.game_name = game_name
+        self.total = len(file_names)
+        self.pending = set(file_names)
+        self.results = []
+        self.callbacks = []  # [(set of file names, callback), ...]
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.started = time.monotonic()
+        self.success = None
+
+    @staticmethod
+    def _name(path) -> str:
+        # Clips are generated under their MP3 name but may be played as the transcoded WAV
+        return Path(path).with_suffix(".mp3").name
+
+    def is_pending(self, path) -> bool:
+        with self.lock:
+            return self._name(path) in self.pending
+
+    def when_ready(self, paths, callback) -> bool:
+        """
+        Calls `callback` (on a generator thread) once none of `paths` is pending.
+
+        Returns:
+            bool: True if it has to wait; False if the clips are ready now (callback not called).
+        """
+        names = {self._name(path) for path in paths}
+        with self.lock:
+            if not names & self.pending:
+                return False
+            self.callbacks.append((names, callback))
+            return True
+
+    def wait_for(self, paths, timeout: float = None) -> bool:
+        """Blocks until none of `paths` is pending; False on timeout."""
+        ready = threading.Event()
+        if not self.when_ready(paths, ready.set):
+            return True
+        return ready.wait(timeout)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until every clip is done; True if none failed."""
+        self.done.wait(timeout)
+        return bool(self.success)
+
+    def _finished(self, result: dict):
+        with self.lock:
+            self.pending.discard(result["file_name"])
+            self.results.append(result)
+            ready = [callback for names, callback in self.callbacks if not names & self.pending]
+            self.callbacks = [(names, callback) for names, callback in self.callbacks if names & self.pending]
+            complete = len(self.results) == self.total
+        for callback in ready:
+            callback()
+        if complete:
+            print(f"{Fore.BLUE}--- Audio Generation Complete ---{Style.RESET_ALL}")
+            GameAudioGenerator._print_summary(self.results, time.monotonic() - self.started)
+            # A missing audio cue is only skipped during play; missing narration fails the game
+            self.success = all(result["status"] != "failed" or result.get("optional") for result in self.results)
+            self.done.set()
+
+
+class EarlyVoicing:
+    """
+    Voices a game's text while Gemini is still writing it. Field events from the
+    streamed answer (see gemini_client.generate_room_configuration's on_field)
+    are synthesized into the TTS store in arrival order, so by the time the game
+    JSON is saved and start_generation() runs, its first clips are store hits or
+    already in flight.
+    """
+
+    VOICED_FIELDS = {"starting_description", "description", "hint", "death_text"}
+
+    def __init__(self, audio_service: TTSService, fields: set = None):
+        self.audio_service = audio_service
+        self.fields = fields if fields is not None else self.VOICED_FIELDS
+        workers = min(TTS_WORKERS, getattr(audio_service, "max_concurrent_requests", TTS_WORKERS))
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.queued = set()
+
+    def on_field(self, path: tuple, value):
+        if not path or path[-1] not in self.fields or not isinstance(value, str) or not value.strip():
+            return
+        texts = [value]
+        if path[-1] == "hint":
+            clues = split_hint_clues(value)
+            if len(clues) > 1:
+                texts += clues
+        for text in texts:
+            if text not in self.queued:
+                self.queued.add(text)
+                self.executor.submit(self.audio_service.prefetch_audio, text)
+
+    def close(self):
+        """Stops taking fields; queued clips still finish in the background."""
+        self.executor.shutdown(wait=False)
+
+
 class GameAudioGenerator:
     """Generates and saves all required audio files for a new game configuration."""
 
-    def __init__(self, base_dir: str, audio_service: TTSService):
+    def __init__(self, base_dir: str, audio_service: TTSService, transcoder: AudioTranscoder = None,
+                 effects_service: TTSEService = None):
         self.file_service = FileNameService(base_dir)
         self.audio_service = audio_service
+        # Audio cues come from the shared sound effect library (same API endpoint as the narration)
+        self.effects_service = effects_service if effects_service else TTSEService(
+            base_dir, api_url=getattr(audio_service, "api_url", None))
+        # Optional post-processing: converts each saved MP3 to the mixer's native format
+        self.transcoder = transcoder
 
     def generate_all_game_audio(self, game_name: str) -> bool:
         """
@@ -26,6 +151,23 @@ class GameAudioGenerator:
         Returns:
             bool: True if audio generation completed without critical errors.
         """
+        job = self.start_generation(game_name)
+        return job.wait() if job else False
+
+    def start_generation(self, game_name: str, intro_stream: AudioStream = None):
+        """
+        Starts generating a game's audio in the background, in play order (starting
+        description, then path by path), and returns immediately.
+
+        With an `intro_stream` (an AudioStream the SoundController plays) the starting
+        description is streamed into it while it is synthesized, so a new game
+        starts talking after the first chunk instead of after the whole clip. The
+        stream is closed in any case, with an error if the clip failed.
+
+        Returns:
+            AudioGenerationJob: To wait for single clips or the whole game; None if
+            the game JSON could not be read.
+        """
         game_json_path = self.file_service.get_game_json_path(game_name)
         audio_folder_path = self.file_service.get_audio_folder_path(game_name)
         
@@ -37,59 +179,100 @@ class GameAudioGenerator:
                 game_data = json.load(f)
         except FileNotFoundError:
             print(f"{Fore.RED}Error: Game JSON not found at {game_json_path}.{Style.RESET_ALL}")
-            return False
+            return None
         except json.JSONDecodeError:
             print(f"{Fore.RED}Error: Failed to decode Game JSON.{Style.RESET_ALL}")
-            return False
+            return None
 
         # 2. Ensure the audio directory exists
         if not os.path.exists(audio_folder_path):
             os.makedirs(audio_folder_path)
 
-        # 3. Generate Audio for the Starting Description
-        self._process_text_field(
-            text=game_data.get("starting_description"),
-            type_prefix="starting_description",
-            path_name=game_name,
-            game_name=game_name
-        )
-
-        # 4. Generate Audio for all Paths
+        # 3. Collect every clip: the starting description, then per path the
+        #    description, its audio cue (once per game), full hint, one clip per
+        #    hint clue and the death text
+        cues = collect_audio_cues(game_data)
+        jobs = [(game_data.get("starting_description"), "starting_description", game_name)]
         for path in game_data.get("paths", []):
             path_name = path.get("path_name", "unknown_path")
-            
-            self._process_text_field(
-                text=path.get("description"),
-                type_prefix="description",
-                path_name=path_name,
-                game_name=game_name
-            )
-            
-            self._process_text_field(
-                text=path.get("hint"),
-                type_prefix="hint",
-                path_name=path_name,
-                game_name=game_name
-            )
-            
-            self._process_text_field(
-                text=path.get("death_text"),
-                type_prefix="death_text",
-                path_name=path_name,
-                game_name=game_name
-            )
-
-        print(f"{Fore.BLUE}--- Audio Generation Complete ---{Style.RESET_ALL}")
-        return True
-
-    def _process_text_field(self, text: str, type_prefix: str, path_name: str, game_name: str):
-        """Helper method to generate audio for a single text field."""
+            hint = path.get("hint") or ""
+            jobs.append((path.get("description"), "description", path_name))
+            audio_cue = path.get("audio_cue")
+            if audio_cue in cues:
+                jobs.append((cues.pop(audio_cue), AUDIO_CUE, audio_cue))
+            jobs.append((hint, "hint", path_name))
+            # Single clues let a hint press replay only the clue for the current step
+            clues = split_hint_clues(hint)
+            if len(clues) > 1:
+                for clue_index, clue in enumerate(clues):
+                    jobs.append((clue, self.file_service.get_hint_clue_type_prefix(clue_index), path_name))
+            jobs.append((path.get("death_text"), "death_text", path_name))
+
+        # 4. Synthesize them in parallel; the pool works through them in order,
+        #    so the first clips to be played are also the first to be ready
+        job = AudioGenerationJob(game_name, [self._file_name(type_prefix, path_name)
+                                             for _, type_prefix, path_name in jobs])
+        workers = min(TTS_WORKERS, getattr(self.audio_service, "max_concurrent_requests", TTS_WORKERS))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        for text, type_prefix, path_name in jobs:
+            executor.submit(self._run_job, job, text, type_prefix, path_name, game_name,
+                            intro_stream if type_prefix == "starting_description" else None)
+        executor.shutdown(wait=False)
+        return job
+
+    def _file_name(self, type_prefix: str, path_name: str) -> str:
+        return path_name if type_prefix == AUDIO_CUE else self.file_service.get_audio_filename(type_prefix, path_name)
+
+    def _run_job(self, job: AudioGenerationJob, text: str, type_prefix: str, path_name: str, game_name: str,
+                 stream: AudioStream = None):
+        try:
+            if type_prefix == AUDIO_CUE:
+                result = self._process_audio_cue(text, path_name, game_name)
+            else:
+                result = self._process_text_field(text, type_prefix, path_name, game_name, stream)
+        except Exception as e:
+            print(f"{Fore.RED}Audio generation error ({type_prefix}, {path_name}): {e}{Style.RESET_ALL}")
+            if stream:
+                stream.close(error=e)
+            result = {"file_name": self._file_name(type_prefix, path_name), "status": "failed", "seconds": 0.0,
+                      "optional": type_prefix == AUDIO_CUE}
+        job._finished(result)
+
+    @staticmethod
+    def _print_summary(results: list[dict], elapsed: float):
+        """Prints one line per clip, then the wall-clock time against the sequential time."""
+        colors = {"ok": Fore.GREEN, "skipped": Fore.YELLOW, "failed": Fore.RED}
+        for result in results:
+            print(f"{colors[result['status']]}  {result['status']:<8}{Style.RESET_ALL}"
+                  f"{result['seconds']:>6.1f} s  {result['file_name']}")
+        sequential = sum(result["seconds"] for result in results)
+        failed = sum(1 for result in results if result["status"] == "failed")
+        print(f"{Style.BRIGHT}{len(results) - failed}/{len(results)} clips in {elapsed:.1f} s "
+              f"(sequentially ~{sequential:.1f} s).{Style.RESET_ALL}")
+
+    def _process_text_field(self, text: str, type_prefix: str, path_name: str, game_name: str,
+                            stream: AudioStream = None) -> dict:
+        """
+        Helper method to generate audio for a single text field (streamed into
+        `stream` as it is synthesized, if given).
+
+        Returns:
+            dict: {"file_name", "status" ('ok', 'skipped' or 'failed'), "seconds"}
+        """
+        file_name = self.file_service.get_audio_filename(type_prefix, path_name)
         if not text:
             print(f"{Fore.YELLOW}Warning: Skipping empty text for {type_prefix} in {path_name}.{Style.RESET_ALL}")
-            return
+            if stream:
+                stream.close()
+            return {"file_name": file_name, "status": "skipped", "seconds": 0.0}
+
+        started = time.monotonic()
+        if stream:
+            # Saved as the native WAV right away, so there is nothing to transcode
+            saved_path = self.audio_service.stream_and_save_audio(text, file_name, game_name, stream=stream)
+            return {"file_name": file_name, "status": "ok" if saved_path else "failed",
+                    "seconds": time.monotonic() - started}
 
-        file_name = self.file_service.get_audio_filename(type_prefix, path_name)
-        
         # The AudioService is assumed to handle the API call and file saving.
         saved_path = self.audio_service.generate_and_save_audio(
             text=text,
@@ -98,6 +281,19 @@ class GameAudioGenerator:
         )
         if not saved_path:
             print(f"{Fore.RED}Failed to generate audio for: {file_name}{Style.RESET_ALL}")
+        elif self.transcoder:
+            self.transcoder.transcode(saved_path)
+
+        return {"file_name": file_name, "status": "ok" if saved_path else "failed",
+                "seconds": time.monotonic() - started}
 
-        # print(f"{Style.DIM}Pausing for 2 seconds before next request...{Style.RESET_ALL}")
-        # time.sleep(2)
\ No newline at end of file
+    def _process_audio_cue(self, prompt: str, audio_cue: str, game_name: str) -> dict:
+        """Links or generates a path's audio cue from the sound effect library (see TTSEService)."""
+        started = time.monotonic()
+        saved_path = self.effects_service.generate_and_save_sound_effect(prompt, audio_cue, game_name)
+        if not saved_path:
+            print(f"{Fore.YELLOW}No sound effect for audio cue: {audio_cue}{Style.RESET_ALL}")
+        elif self.transcoder:
+            self.transcoder.transcode(saved_path)
+        return {"file_name": audio_cue, "status": "ok" if saved_path else "failed",
+                "seconds": time.monotonic() - started, "optional": True}
\ No newline at end of file
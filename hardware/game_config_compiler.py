@@ -0,0 +1,406 @@
+# game_config_compiler.py
+
+import os
+import json
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from colorama import Fore, Style
+
+from device_configs import DEVICE_CONFIGS, get_input_vocabulary
+from cue_timeline import ANCHOR_START, ANCHOR_NARRATION_END
+
+# Bump whenever the compiled representation changes so stale caches are rebuilt.
+COMPILER_VERSION = 4
+
+#  ---- Registry --------
+SENSOR_REGISTRY = {
+    "button": {
+        "required": ["value"],
+        "aliases": {"count": "times", "presses": "times", "num": "times"},
+    },
+    "joystick": {
+        "required": ["value"],
+        "aliases": {},
+    },
+    "distance_sensor": {
+        "required": ["value"], # The states (covered, hovered, clear)
+        "aliases": {},
+    },
+    "gyro": {
+        "required": ["value"],
+        "aliases": {},
+    },
+    "rotary_encoder_number": {
+        "required": ["value"], # This is a dictionary of 10 values
+        "aliases": {},
+    },
+    "rotary_encoder_picture": {
+        "required": ["value"], # This is a dictionary of 10 values
+        "aliases": {},
+    }
+}
+
+# What the output controllers understand (see LEDController / VibrationController)
+ACTUATOR_REGISTRY = {
+    "light": {
+        "modes": ["static", "blink", "pulse", "fade"],
+        "colors": ["red", "green", "blue", "yellow", "white", "purple", "orange-red", "off"],
+    },
+    "vibration": {
+        "modes": ["vibrate", "rattle"],
+        "required": ["duration"],
+    },
+}
+
+# The only path fields the engine reads; everything else in the JSON is prompt vocabulary.
+PATH_DEFAULTS = {
+    "path_name": "Unknown Path",
+    "description": "",
+    "hint": "",
+    "solution_sequence": [],
+    "time_limit": 90,
+    "death_text": "You have failed.",
+    "effects": [],
+    "audio_cue": "",
+}
+
+
+# Separator between the clues of a hint (one clue per solution step, see gemini_client.py)
+HINT_CLUE_SEPARATOR = "//"
+
+
+# -------- Utilities --------
+def split_hint_clues(hint: str) -> list[str]:
+    """Splits a hint into its clues ('A // B // C' -> ['A', 'B', 'C'])."""
+    return [clue.strip() for clue in hint.split(HINT_CLUE_SEPARATOR) if clue.strip()]
+
+
+def _is_number(value) -> bool:
+    # JSON true/false arrive as bool, which is an int subclass
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def normalize_and_validate_step(step: dict) -> tuple[str, dict]:
+    """
+    Returns (component_type, params) after:
+      - verifying component exists
+      - applying alias mappings
+      - checking required fields
+    """
+    if "sensor" in step:
+        component_type_key = "sensor"
+        registry = SENSOR_REGISTRY
+    elif "actuator" in step:
+        component_type_key = "actuator"
+        # For actuators, we don't need a registry to validate parameters
+        # because the OutputManager now handles this.
+        registry = {}
+    else:
+        raise ValueError("Step is missing 'sensor' or 'actuator'.")
+
+    component_type = step[component_type_key]
+    # Checked before any registry lookup: a list or dict here would be unhashable
+    if not isinstance(component_type, str):
+        raise ValueError(f"'{component_type_key}' must be a string, got {type(component_type).__name__}.")
+
+    # Validation logic specific to sensors
+    if component_type_key == "sensor":
+        if component_type not in registry:
+            raise ValueError(f"Unknown sensor component '{component_type}'.")
+
+        spec = registry[component_type]
+        aliases = spec.get("aliases", {})
+        required = spec.get("required", [])
+
+        params_raw = { (aliases.get(k, k)): v for k, v in step.items() if k != component_type_key }
+
+        missing = [k for k in required if k not in params_raw]
+        if missing:
+            raise ValueError(f"Step for '{component_type}' missing required field(s): {', '.join(missing)}")
+
+        params = params_raw
+    else: # Actuator
+        params = {k: v for k, v in step.items() if k != component_type_key}
+
+    return component_type, params
+
+
+class GameConfigError(ValueError):
+    """Raised when a game JSON cannot be played on this box."""
+
+    def __init__(self, source: str, errors: list[str]):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"Invalid game config '{source}': " + "; ".join(errors))
+
+
+# -------- Compiler --------
+class GameConfigCompiler:
+    """
+    Validates a game JSON once against the sensor registry and the real device
+    configuration, strips everything the engine never reads and caches the result
+    as a pickle next to the JSON. The cache is keyed by the JSON's mtime/size and,
+    if those changed, its content hash.
+    """
+
+    def __init__(self, device_configs: list[dict] = DEVICE_CONFIGS, sensor_registry: dict = SENSOR_REGISTRY):
+        self.sensor_registry = sensor_registry
+        self.vocabulary = get_input_vocabulary(device_configs)
+        self.fingerprint = self._build_fingerprint()
+        # config_path -> (mtime_ns, size, compiled); spares repeat loads the unpickling
+        self.loaded = {}
+        self.lock = threading.Lock()
+
+    def _build_fingerprint(self) -> str:
+        """Hash of everything a compiled config depends on besides the JSON itself."""
+        payload = json.dumps(
+            [COMPILER_VERSION, self.sensor_registry, ACTUATOR_REGISTRY,
+             {k: sorted(v) for k, v in self.vocabulary.items()}],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_cache_path(config_path) -> Path:
+        """Returns the path of the compiled cache, e.g. 'games/x/.x.compiled.pickle'."""
+        config_path = Path(config_path)
+        return config_path.with_name(f".{config_path.stem}.compiled.pickle")
+
+    # ---- Validation ----
+    def _validate_sensor_step(self, step, where: str, errors: list[str]):
+        if not isinstance(step, dict):
+            errors.append(f"{where}: step must be an object, got {type(step).__name__}")
+            return None
+        if "sensor" not in step:
+            errors.append(f"{where}: step is missing 'sensor'")
+            return None
+        try:
+            sensor_type, params = normalize_and_validate_step(step)
+        except ValueError as e:
+            errors.append(f"{where}: {e}")
+            return None
+
+        produced = self.vocabulary.get(sensor_type)
+        if not produced:
+            errors.append(f"{where}: no configured device produces '{sensor_type}' input")
+            return None
+        if not isinstance(params["value"], str):
+            errors.append(f"{where}: 'value' must be a string, got {type(params['value']).__name__}")
+            return None
+        if params["value"] not in produced:
+            errors.append(f"{where}: '{sensor_type}' cannot produce value {params['value']!r} "
+                          f"(possible: {', '.join(sorted(produced))})")
+            return None
+        return {"sensor": sensor_type, **params}
+
+    def _validate_effect(self, effect, where: str, errors: list[str]):
+        if not isinstance(effect, dict) or "actuator" not in effect:
+            errors.append(f"{where}: effect is missing 'actuator'")
+            return None
+        try:
+            actuator_type, params = normalize_and_validate_step(effect)
+        except ValueError as e:
+            errors.append(f"{where}: {e}")
+            return None
+        spec = ACTUATOR_REGISTRY.get(actuator_type)
+        if spec is None:
+            errors.append(f"{where}: unknown actuator '{actuator_type}'")
+            return None
+        if params.get("mode") not in spec["modes"]:
+            errors.append(f"{where}: '{actuator_type}' has no mode {params.get('mode')!r}")
+            return None
+        missing = [k for k in spec.get("required", []) if k not in params]
+        if missing:
+            errors.append(f"{where}: '{actuator_type}' effect missing required field(s): {', '.join(missing)}")
+            return None
+        if "colors" in spec and params.get("color", "white") not in spec["colors"]:
+            errors.append(f"{where}: '{actuator_type}' has no color {params.get('color')!r}")
+            return None
+        if "duration" in params and not (_is_number(params["duration"]) and params["duration"] >= 0):
+            errors.append(f"{where}: 'duration' must be a non-negative number")
+            return None
+        # Optional timeline pinning (see cue_timeline.compile_path_timeline)
+        if "anchor" in params and params["anchor"] not in (ANCHOR_START, ANCHOR_NARRATION_END):
+            errors.append(f"{where}: 'anchor' must be '{ANCHOR_START}' or '{ANCHOR_NARRATION_END}', "
+                          f"got {params['anchor']!r}")
+            return None
+        if "offset" in params and not (_is_number(params["offset"]) and params["offset"] >= 0):
+            errors.append(f"{where}: 'offset' must be a non-negative number")
+            return None
+        return {"actuator": actuator_type, **params}
+
+    def _compile_path(self, path, index: int, errors: list[str]) -> dict:
+        where = f"paths[{index}]"
+        if not isinstance(path, dict):
+            errors.append(f"{where}: path must be an object")
+            return {}
+
+        compiled = {key: path.get(key, default) for key, default in PATH_DEFAULTS.items()}
+
+        if not isinstance(compiled["path_name"], str) or not compiled["path_name"].strip():
+            errors.append(f"{where}: 'path_name' must be a non-empty string")
+        for key in ("description", "hint", "death_text", "audio_cue"):
+            if not isinstance(compiled[key], str):
+                errors.append(f"{where}: '{key}' must be a string")
+        if not _is_number(compiled["time_limit"]) or compiled["time_limit"] <= 0:
+            errors.append(f"{where}: 'time_limit' must be a positive number")
+
+        sequence = compiled["solution_sequence"]
+        if not isinstance(sequence, list) or not sequence:
+            errors.append(f"{where}: 'solution_sequence' must be a non-empty list")
+            sequence = []
+        compiled["solution_sequence"] = [
+            self._validate_sensor_step(step, f"{where}.solution_sequence[{i}]", errors)
+            for i, step in enumerate(sequence)
+        ]
+
+        # Per-step clues, so a hint press only replays the clue for the current step
+        compiled["hint_clues"] = split_hint_clues(compiled["hint"]) if isinstance(compiled["hint"], str) else []
+
+        effects = compiled["effects"] if isinstance(compiled["effects"], list) else []
+        if not isinstance(compiled["effects"], list):
+            errors.append(f"{where}: 'effects' must be a list")
+        compiled["effects"] = [
+            self._validate_effect(effect, f"{where}.effects[{i}]", errors)
+            for i, effect in enumerate(effects)
+        ]
+        return compiled
+
+    def validate(self, data) -> list[str]:
+        """Returns a list of human-readable problems; empty if the game is playable."""
+        errors: list[str] = []
+        self._compile(data, errors)
+        return errors
+
+    def _compile(self, data, errors: list[str]) -> dict:
+        if not isinstance(data, dict):
+            errors.append("game config must be a JSON object")
+            return {}
+
+        title = data.get("title", "Untitled Room")
+        starting_description = data.get("starting_description", "")
+        if not isinstance(title, str) or not title.strip():
+            errors.append("'title' must be a non-empty string")
+        if not isinstance(starting_description, str):
+            errors.append("'starting_description' must be a string")
+
+        paths = data.get("paths")
+        if not isinstance(paths, list) or not paths:
+            errors.append("'paths' must be a non-empty list")
+            paths = []
+
+        return {
+            "title": title,
+            "starting_description": starting_description,
+            "paths": [self._compile_path(path, i, errors) for i, path in enumerate(paths)],
+        }
+
+    def compile(self, data, source: str = "<memory>") -> dict:
+        """
+        Validates and strips a parsed game config.
+
+        Raises:
+            GameConfigError: If the game references inputs the box cannot produce,
+                unknown sensors/actuators or is structurally broken.
+        """
+        errors: list[str] = []
+        compiled = self._compile(data, errors)
+        if errors:
+            raise GameConfigError(source, errors)
+        return compiled
+
+    # ---- Cache ----
+    def _read_cache(self, cache_path: Path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("fingerprint") != self.fingerprint:
+            return None
+        return cached
+
+    def _write_cache(self, cache_path: Path, entry: dict):
+        # Unique per writer: several sessions may compile the same game concurrently
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            # A read-only SD card must not prevent playing; we just lose the cache.
+            print(f"{Fore.YELLOW}Warning: Could not write compiled game cache {cache_path}: {e}{Style.RESET_ALL}")
+
+    def load(self, config_path) -> dict:
+        """
+        Returns the compiled config for a game JSON, using the cache when it is fresh.
+
+        Raises:
+            GameConfigError: If the JSON is invalid (the failure is not cached).
+            FileNotFoundError: If the JSON does not exist.
+        """
+        config_path = Path(config_path)
+        cache_path = self.get_cache_path(config_path)
+        stat = config_path.stat()
+
+        with self.lock:
+            loaded = self.loaded.get(str(config_path))
+        if loaded and loaded[0] == stat.st_mtime_ns and loaded[1] == stat.st_size:
+            return loaded[2]
+
+        cached = self._read_cache(cache_path)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            self._remember(config_path, stat, cached["config"])
+            return cached["config"]
+
+        raw = config_path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached["sha256"] == digest:
+            # Touched but unchanged (e.g. copied or re-saved): refresh the stat key only.
+            compiled = cached["config"]
+        else:
+            try:
+                data = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise GameConfigError(str(config_path), [f"not valid JSON: {e}"]) from e
+            compiled = self.compile(data, source=str(config_path))
+            print(f"{Style.DIM}Compiled game config: {config_path.name}{Style.RESET_ALL}")
+
+        self._write_cache(cache_path, {
+            "fingerprint": self.fingerprint,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "config": compiled,
+        })
+        self._remember(config_path, stat, compiled)
+        return compiled
+
+    def _remember(self, config_path: Path, stat, compiled: dict):
+        with self.lock:
+            self.loaded[str(config_path)] = (stat.st_mtime_ns, stat.st_size, compiled)
+
+
+# Compile (and validate) every registered game: python game_config_compiler.py
+if __name__ == "__main__":
+    from filename_service import FileNameService
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    file_service = FileNameService(base_dir)
+    compiler = GameConfigCompiler()
+
+    available_games_file = os.path.join(file_service.get_game_folder_path(""), 'available_games.txt')
+    with open(available_games_file, 'r') as f:
+        game_names = [line.strip().lower() for line in f if line.strip()]
+
+    failed = 0
+    for game_name in game_names:
+        try:
+            compiled = compiler.load(file_service.get_game_json_path(game_name))
+            print(f"{Fore.GREEN}✅ {game_name}: {len(compiled['paths'])} paths{Style.RESET_ALL}")
+        except (GameConfigError, FileNotFoundError) as e:
+            failed += 1
+            print(f"{Fore.RED}✖ {game_name}: {e}{Style.RESET_ALL}")
+    print(f"{len(game_names) - failed}/{len(game_names)} games playable.")
@@ -0,0 +1,210 @@
+# game_pool.py
+
+import os
+import json
+import time
+import shutil
+import threading
+from pathlib import Path
+from colorama import Fore, Style
+
+from filename_service import FileNameService
+from game_simulator import GameSolver
+from game_audio_generator import GameAudioGenerator
+from audio_transcoder import AudioTranscoder
+
+# Complete games kept ready for "Generate New Game"
+POOL_SIZE = int(os.getenv("QUESTBOX_POOL_SIZE", "2"))
+# At most this many generation attempts (Gemini call + voicing) per 24 hours
+POOL_DAILY_BUDGET = int(os.getenv("QUESTBOX_POOL_DAILY_BUDGET", "10"))
+# Wait after a failed attempt before trying again, doubling per failure in a row up to MAX_RETRY_DELAY
+RETRY_DELAY = 60.0
+MAX_RETRY_DELAY = 30 * 60.0
+IDLE_CHECK = 5.0
+
+STAGING_DIRNAME = "staging"
+READY_MARKER = ".ready"
+STATE_FILE = "pool_state.json"
+
+
+class GamePool:
+    """
+    Keeps POOL_SIZE complete games ready while the box idles at the menu. A
+    background worker generates a game into a staging area (outside the catalog),
+    checks it with the GameSolver, voices it, and only then marks it ready.
+    take() promotes a ready game into the catalog instantly and the worker refills
+    the pool. Staged games survive restarts; half-finished ones are discarded.
+    """
+
+    def __init__(self, base_dir, size: int = POOL_SIZE, daily_budget: int = POOL_DAILY_BUDGET):
+        self.base_dir = Path(base_dir)
+        self.size = size
+        self.daily_budget = daily_budget
+        self.catalog = FileNameService(str(self.base_dir))
+        self.staging_dir = self.base_dir / STAGING_DIRNAME
+        self.staging = FileNameService(str(self.staging_dir))
+        self.state_path = self.staging_dir / STATE_FILE
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.paused = threading.Event()
+        self.stop_event = threading.Event()
+        self.worker_thread = None
+        self.audio_generator = None  # created on the worker thread (needs the TTS client)
+
+    # -------- Staging area --------
+    def _staged_folder(self, game_name: str) -> Path:
+        return Path(self.staging.get_game_folder_path(game_name))
+
+    def ready_games(self) -> list[str]:
+        """Staged games that are complete, oldest first."""
+        games_dir = Path(self.staging.get_game_folder_path(""))
+        markers = sorted(games_dir.glob(f"*/{READY_MARKER}"), key=lambda marker: marker.stat().st_mtime)
+        return [marker.parent.name for marker in markers]
+
+    def _discard(self, game_name: str):
+        shutil.rmtree(self._staged_folder(game_name), ignore_errors=True)
+
+    def _discard_unfinished(self):
+        games_dir = Path(self.staging.get_game_folder_path(""))
+        for folder in games_dir.glob("*/"):
+            if not (folder / READY_MARKER).exists():
+                print(f"{Style.DIM}Game pool: discarding unfinished {folder.name}{Style.RESET_ALL}")
+                shutil.rmtree(folder, ignore_errors=True)
+
+    # -------- Budget --------
+    def _attempts_today(self) -> list[float]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                attempts = json.load(f).get("attempts", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            attempts = []
+        return [attempt for attempt in attempts if attempt > time.time() - 24 * 3600]
+
+    def _record_attempt(self):
+        attempts = self._attempts_today() + [time.time()]
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({"attempts": attempts}, f)
+
+    def _within_budget(self) -> bool:
+        return len(self._attempts_today()) < self.daily_budget
+
+    # -------- Worker --------
+    def start(self):
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+        self._discard_unfinished()
+        self.stop_event.clear()
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self.worker_thread.start()
+        print(f"{Fore.CYAN}Game pool: {len(self.ready_games())}/{self.size} games ready.{Style.RESET_ALL}")
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+
+    def pause(self):
+        """Stops starting new generations (e.g. while a game is played); one in progress finishes."""
+        self.paused.set()
+
+    def resume(self):
+        self.paused.clear()
+        self.wake.set()
+
+    def _worker(self):
+        failures = 0
+        while not self.stop_event.is_set():
+            if self.paused.is_set() or len(self.ready_games()) >= self.size or not self._within_budget():
+                self.wake.wait(IDLE_CHECK)
+                self.wake.clear()
+                continue
+            try:
+                staged = self._stage_one()
+            except Exception as e:
+                # A crash here would silently end background generation for the whole session
+                print(f"{Fore.RED}Game pool: staging a game failed: {e!r}{Style.RESET_ALL}")
+                self._discard_unfinished()
+                staged = False
+            if staged:
+                failures = 0
+                continue
+            delay = min(RETRY_DELAY * 2 ** failures, MAX_RETRY_DELAY)
+            failures += 1
+            self.stop_event.wait(delay)
+
+    def _stage_one(self) -> bool:
+        """Generates, validates and voices one game in the staging area; True if it is ready."""
+        # Imported here: the Gemini/ElevenLabs clients are only needed once the pool works
+        from geminiAPI.gemini_client import generate_room_configuration
+        from elevenlabsAPI.tts_service import TTSService
+
+        self._record_attempt()
+        print(f"{Fore.CYAN}Game pool: generating a game in the background...{Style.RESET_ALL}")
+        game_name = generate_room_configuration(target=self.staging, register=False)
+        if not game_name:
+            return False
+        if os.path.exists(self.catalog.get_game_folder_path(game_name)):
+            print(f"{Fore.YELLOW}Game pool: '{game_name}' already exists in the catalog, discarded.{Style.RESET_ALL}")
+            self._discard(game_name)
+            return False
+
+        report = GameSolver(self.staging).check_game(game_name)
+        if not report["solvable"]:
+            print(f"{Fore.YELLOW}Game pool: '{game_name}' discarded:{Style.RESET_ALL}")
+            for problem in report["problems"]:
+                print(f"    - {problem}")
+            self._discard(game_name)
+            return False
+
+        if not self.audio_generator:
+            self.audio_generator = GameAudioGenerator(str(self.staging_dir), TTSService(str(self.staging_dir)),
+                                                      transcoder=AudioTranscoder())
+        if not self.audio_generator.generate_all_game_audio(game_name):
+            print(f"{Fore.YELLOW}Game pool: voicing '{game_name}' failed, discarded.{Style.RESET_ALL}")
+            self._discard(game_name)
+            return False
+
+        (self._staged_folder(game_name) / READY_MARKER).touch()
+        print(f"{Fore.GREEN}Game pool: '{game_name}' is ready ({len(self.ready_games())}/{self.size}).{Style.RESET_ALL}")
+        return True
+
+    # -------- Called from the menu --------
+    def take(self):
+        """
+        Promotes the oldest ready game into the catalog and wakes the worker to refill.
+
+        Returns:
+            str: The promoted game's name, or None if no game is ready.
+        """
+        from geminiAPI.gemini_client import register_new_game
+
+        with self.lock:
+            for game_name in self.ready_games():
+                destination = Path(self.catalog.get_game_folder_path(game_name))
+                if destination.exists():
+                    self._discard(game_name)
+                    continue
+                staged = self._staged_folder(game_name)
+                (staged / READY_MARKER).unlink()
+                shutil.move(str(staged), str(destination))
+                register_new_game(game_name, target=self.catalog)
+                self.wake.set()
+                print(f"{Fore.GREEN}Game pool: promoted '{game_name}'.{Style.RESET_ALL}")
+                return game_name
+        return None
+
+
+# Fill the pool without starting the game: python game_pool.py
+if __name__ == "__main__":
+    import sys
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(base_dir)
+    pool = GamePool(base_dir)
+    pool.start()
+    try:
+        while len(pool.ready_games()) < pool.size and pool._within_budget():
+            time.sleep(IDLE_CHECK)
+    except KeyboardInterrupt:
+        pass
+    pool.stop()
+    print(f"{Fore.BLUE}Game pool: {pool.ready_games()}{Style.RESET_ALL}")
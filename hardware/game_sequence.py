@@ -1,428 +1,370 @@
-import json
-import time
 import threading
 import queue
 import copy
-import os
 import pygame
 from pathlib import Path
-from input_manager import InputEvent
+from collections import deque
+from input_event import InputEvent
 from output_manager import OutputManager
+from clock import SYSTEM_CLOCK
+from audio_sink import PygameAudioSink
+from audio_stream import AudioStream
+from game_config_compiler import GameConfigCompiler
+from cue_timeline import CueTimeline, compile_path_timeline, ANCHOR_NARRATION_END
 # from filename_service import FileNameService
 from colorama import Fore, Style
 
-#  ---- Registry --------
-SENSOR_REGISTRY = {
-    "button": {
-        "required": ["value"],
-        "aliases": {"count": "times", "presses": "times", "num": "times"},
-    },
-    "joystick": {
-        "required": ["value"],
-        "aliases": {},
-    },
-    "distance_sensor": {
-        "required": ["value"], # The states (covered, hovered, clear)
-        "aliases": {},
-    },
-    "gyro": {
-        "required": ["value"],
-        "aliases": {},
-    },
-    "rotary_encoder_number": {
-        "required": ["value"], # This is a dictionary of 10 values
-        "aliases": {},
-    },
-    "rotary_encoder_picture": {
-        "required": ["value"], # This is a dictionary of 10 values
-        "aliases": {},
-    }
-}
-
 # -------- Error handlers --------
-def handle_game_over():
-    print("💥 Game Over!")
+def handle_game_over(log=print):
+    log("💥 Game Over!")
     
-def handle_timeout():
-    print("⏰ Time's up!")
-    handle_game_over()
+def handle_timeout(log=print):
+    log("⏰ Time's up!")
+    handle_game_over(log)
     
 ERROR_HANDLERS = {
     "game_over": handle_game_over,
 }
 
-# -------- Utilities --------
-def _normalize_and_validate_step(step: dict) -> tuple[str, dict]:
+# -------- Narration barge-in --------
+# Input that cuts the current narration short (repeat has nothing to repeat yet)
+SKIP_INPUT = ("button", "repeat")
+# What happens to puzzle input that arrives while narration plays:
+#   "discard" - dropped, as is anything stamped before the narration ended
+#   "live"    - checked against the solution right away
+NARRATION_INPUT_MODES = ("discard", "live")
+# How often the game thread looks at the narration while waiting for input (s)
+NARRATION_POLL = 0.02
+# Silence between the starting description and the first path's description (s)
+NARRATION_GAP = 0.4
+
+# -------- Matching --------
+def event_matches_step(event: InputEvent, step: dict) -> tuple[bool, str]:
     """
-    Returns (component_type, params) after:
-      - verifying component exists
-      - applying alias mappings
-      - checking required fields
+    Checks if an event satisfies a (compiled) sensor step.
+
+    Returns:
+        tuple[bool, str]: (matches, reason why not).
     """
-    if "sensor" in step:
-        component_type_key = "sensor"
-        registry = SENSOR_REGISTRY
-    elif "actuator" in step:
-        component_type_key = "actuator"
-        # For actuators, we don't need a registry to validate parameters
-        # because the OutputManager now handles this.
-        registry = {}
-    else:
-        raise ValueError("Step is missing 'sensor' or 'actuator'.")
-    
-    component_type = step[component_type_key]
-    
-    # Validation logic specific to sensors
-    if component_type_key == "sensor":
-        if component_type not in registry:
-            raise ValueError(f"Unknown sensor component '{component_type}'.")
-        
-        spec = registry[component_type]
-        aliases = spec.get("aliases", {})
-        required = spec.get("required", [])
+    sensor_type = step.get("sensor")
 
-        params_raw = { (aliases.get(k, k)): v for k, v in step.items() if k != component_type_key }
+    if event.device_type != sensor_type:
+        return False, f"expected sensor type '{sensor_type}', but got '{event.device_type}'"
 
-        missing = [k for k in required if k not in params_raw]
-        if missing:
-            raise ValueError(f"Step for '{component_type}' missing required field(s): {', '.join(missing)}")
-        
-        params = params_raw
-    else: # Actuator
-        params = {k: v for k, v in step.items() if k != component_type_key}
+    expected_params = copy.deepcopy(step)
+    expected_params.pop("sensor", None)
+
+    for key, expected_value in expected_params.items():
+        actual_value = event.meta.get(key, None)
 
-    return component_type, params
+        if key in ["value"]:
+            actual_value = event.value
+
+        if actual_value != expected_value:
+            return False, f"{sensor_type} requires {key} to be {expected_value}, but got {actual_value}"
+
+    return True, ""
 
 # -------- Engine --------
+def _silent(*args, **kwargs):
+    pass
+
+
 class GameSequence:
-    def __init__(self, config_path: Path, input_queue: queue.Queue, output_manager: OutputManager, game_name: str, file_service):
+    def __init__(self, config_path: Path, input_queue: queue.Queue, output_manager: OutputManager, game_name: str, file_service, compiler: GameConfigCompiler = None, clock=None, audio_sink=None,
+                 skip_input: tuple = SKIP_INPUT, narration_input: str = "discard", quiet: bool = False,
+                 intro_stream: AudioStream = None):
+        """
+        Everything a session touches is injected, so several sessions can run side by
+        side in one process: its own input queue, audio sink (PygameAudioSink for the
+        box, NullAudioSink for simulations), clock and output manager.
+
+        Narration can be cut short with `skip_input` ((device_type, value), or None to
+        disable skipping); `narration_input` is one of NARRATION_INPUT_MODES.
+
+        A `quiet` session prints nothing (simulations run many sessions at once, and
+        silencing sys.stdout would silence every other thread as well).
+
+        A freshly generated game passes its starting description as an `intro_stream`
+        (see GameAudioGenerator.start_generation), played while it is synthesized.
+        """
+        if narration_input not in NARRATION_INPUT_MODES:
+            raise ValueError(f"Unknown narration_input '{narration_input}' (use one of {NARRATION_INPUT_MODES}).")
+        self.log = _silent if quiet else print
         self.config_path = config_path
         self.input_queue = input_queue
         self.output_manager = output_manager
         self.game_name = game_name
+        self.compiler = compiler if compiler else GameConfigCompiler()
         self.config = self._load_config()
-        self.stop_timer_flag = threading.Event()
-        self.start_time_global = 0
+        # Path timers read this clock; a VirtualClock makes them free in simulations
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.sensor_state = {}
         self.file_service = file_service
+        if not audio_sink:
+            # Play through the OutputManager's "sound" actuator when one is registered
+            audio_sink = PygameAudioSink(file_service, game_name, self.clock, output_manager.controllers.get("sound"))
+        self.audio = audio_sink
         # Stores the text of the last spoken/printed description or hint
         self.last_spoken_text = ""
         self.last_audio_filename = ""
+        self.skip_input = skip_input
+        self.narration_input = narration_input
+        # Clock time the last narration ended; discard mode drops input stamped earlier
+        self.narration_cutoff = float("-inf")
+        # Input read while narration played that "live" mode still has to process
+        self.pending_events = deque()
+        self.intro_stream = intro_stream
+        # Light, vibration and audio cues run on the timeline's own timing thread
+        self.timeline = CueTimeline(output_manager, cue_player=self.audio.play_cue, clock=self.clock)
 
     def _load_config(self):
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+        """Returns the validated, compiled config (raises GameConfigError for unplayable games)."""
+        return self.compiler.load(self.config_path)
 
     def _check_event(self, event: InputEvent, step: dict) -> bool:
         """
         Generic function to check if an event matches a sensor step.
         """
-        sensor_type = step.get("sensor")
-        
-        if event.device_type != sensor_type:
-            print(f"{Fore.LIGHTBLACK_EX}Ignoring event: expected sensor type '{sensor_type}', but got '{event.device_type}'.{Fore.RESET}")
-            return False
-
-        expected_params = copy.deepcopy(step)
-        expected_params.pop("sensor", None)
-
-        for key, expected_value in expected_params.items():
-            actual_value = event.meta.get(key, None)
-            
-            if key in ["value"]:
-                actual_value = event.value
-            
-            if actual_value != expected_value:
-                print(f"{Fore.LIGHTBLACK_EX}Ignoring event: {sensor_type} requires {key} to be {expected_value}, but got {actual_value}.{Fore.RESET}")
-                return False
-
-        return True
+        matches, reason = event_matches_step(event, step)
+        if not matches:
+            self.log(f"{Fore.LIGHTBLACK_EX}Ignoring event: {reason}.{Fore.RESET}")
+        return matches
 
     def _route_error(self, error_path: str):
         handler = ERROR_HANDLERS.get(error_path)
         if handler:
-            handler()
+            handler(self.log)
         else:
-            print(f"{Fore.RED}💥 Game Over!{Fore.RESET}")
+            self.log(f"{Fore.RED}💥 Game Over!{Fore.RESET}")
 
-    def timer_thread_func(self, time_limit: int):
-        self.start_time_global = time.time()
-        
-        while not self.stop_timer_flag.is_set():
-            remaining = time_limit - (time.time() - self.start_time_global)
-            
-            if remaining <= 0:
-                print(f"{Fore.RED}\n⏰ Time's up!{Fore.RESET}")
-                self.stop_timer_flag.set()
-                self._route_error("game_over")
-                break
-            
-            time.sleep(1)
+    def _time_is_up(self, deadline: float) -> bool:
+        """Returns True (and reports it) once the path deadline has passed."""
+        if self.clock.now() < deadline:
+            return False
+        self.log(f"{Fore.RED}\n⏰ Time's up!{Fore.RESET}")
+        self._route_error("game_over")
+        return True
 
     ###############################################################################
-    # AUDIO PLAYBACK METHODS - DIRECTLY USING PYGAME (NO OUTPUT MANAGER)
+    # AUDIO PLAYBACK METHODS - DELEGATED TO THE SESSION'S AUDIO SINK
     ###############################################################################
-    def _play_sfx(self, sound_object):
-        """Plays a pre-loaded sound effect object."""
-        if sound_object:
-            sound_object.play()
+    def _play_sfx(self, name: str):
+        """Plays a sound effect ('correct', 'wrong' or 'victory')."""
+        self.audio.play_sfx(name)
 
-    def _play_sound_test(filename: str, loop: bool = False):
+    def _resolve_cue_path(self, audio_cue: str):
         """
-        Plays a sound file from the 'audio' folder at the same level as the 'hardware' directory.
-        
-        Args:
-            filename (str): Name of the mp3 file.
-            loop (bool): If True, loops until stopped.
+        Returns where a path's audio_cue file lives, or None if it has none. Whether
+        it was ever generated is checked by the player, off the game thread.
         """
-        # pygame.mixer.init(frequency=44100)  # standard audio frequency
-        file_path = os.path.join(os.path.dirname(__file__), "..", "audio", filename)
-        file_path = os.path.abspath(file_path)
+        if not audio_cue:
+            return None
+        return str(Path(self.file_service.get_sound_effects_folder_path(self.game_name)) / audio_cue)
 
-        print(f"Playing sound from path: {file_path}")
+    def _is_skip_input(self, event: InputEvent) -> bool:
+        return self.skip_input is not None and (event.device_type, event.value) == tuple(self.skip_input)
 
-        file_path = "/home/philipp/quest-box/games/the-curse-of-the-krakens-chest/audio/description_the_siren's_song.mp3"
+    def _is_stale(self, event: InputEvent) -> bool:
+        """In discard mode, input the device produced before the last narration ended."""
+        return (self.narration_input == "discard" and event.timestamp is not None
+                and event.timestamp < self.narration_cutoff)
 
-        if not os.path.isfile(file_path):
-            raise FileNotFoundError(f"Sound file not found: {file_path}")
-        
-        # pygame.mixer.init(frequency=44100, devicename="plughw:8,0")
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play(-1 if loop else 0)
+    def _skip_narration(self):
+        self.audio.skip_narration()
+        self.log(f"{Fore.CYAN}⏭ Narration skipped.{Fore.RESET}")
 
+    def _end_narration(self):
+        self.narration_cutoff = self.clock.now()
+
+    def _next_event(self, timeout: float) -> InputEvent:
+        """Input held back during narration first, then the input queue."""
+        if self.pending_events:
+            return self.pending_events.popleft()
+        return self.input_queue.get(timeout=timeout)
 
     def _play_audio_and_wait(self, text: str, audio_type: str, path_identifier: str):
         """
-        Directly finds and plays an audio file, blocking until it's finished.
+        Plays the audio for a text, blocking until it's finished or the player
+        presses the skip input. Other input is held back for "live" mode or dropped.
         """
-        print(text)
-        # print('🖐️🖐️playing sound hopefully from test function (and waiting 5 seconds)')
-        # self._play_sound_test("dessert-1.mp3", loop=False)
-        # time.sleep(5)
-        # print('🖐️🖐️wait over, should have played sound')
-
-        try:
-            # 1. Build the file path directly
-            file_name = self.file_service.get_audio_filename(audio_type, path_identifier)
-            folder = self.file_service.get_audio_folder_path(self.game_name)
-            path = Path(folder) / file_name
-
-            if not path.exists():
-                print(f"{Fore.RED}Audio Error: File not found: {path}{Style.RESET_ALL}")
-                return
-            
-            # 2. Play the sound using Pygame directly
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(str(path))
-            pygame.mixer.music.play()
-            print(f"{Fore.GREEN}🔊 Playing: {path.name}{Style.RESET_ALL}")
+        self.log(text)
+        self._wait_for_narration(self.audio.narrate(audio_type, path_identifier, text=text))
 
-            # 3. Wait for it to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            print(f"{Style.DIM}  - Sound has FINISHED.{Style.RESET_ALL}")
-
-        except Exception as e:
-            print(f"{Fore.RED}Direct Playback Error: {e}{Style.RESET_ALL}")
+    def _wait_for_narration(self, narration):
+        """Blocks until a narration Future resolves or the player skips it."""
+        while not narration.done():
+            try:
+                event = self.input_queue.get(timeout=NARRATION_POLL)
+            except queue.Empty:
+                continue
+            if self._is_skip_input(event):
+                self._skip_narration()
+                break
+            if self.narration_input == "live":
+                self.pending_events.append(event)
+        self._end_narration()
 
     def _play_audio_non_blocking(self, text: str, audio_type: str, path_identifier: str, repeat: bool = False):
         """
-        Directly finds and plays an audio file without blocking.
+        Plays the audio for a text without blocking.
         """
         if repeat:
-            print(f"{Fore.CYAN}🔁 (Repeat) Playing: {audio_type} for {path_identifier}{Fore.RESET}")
+            self.log(f"{Fore.CYAN}🔁 (Repeat) Playing: {audio_type} for {path_identifier}{Fore.RESET}")
         else:
-            print(text)
-            
-        try:
-            # 1. Build the file path directly
-            file_name = self.file_service.get_audio_filename(audio_type, path_identifier)
-            folder = self.file_service.get_audio_folder_path(self.game_name)
-            path = Path(folder) / file_name
+            self.log(text)
+        self.audio.play(audio_type, path_identifier, text=text)
 
-            if not path.exists():
-                print(f"{Fore.RED}Audio Error: File not found: {path}{Style.RESET_ALL}")
-                return
-
-            # 2. Play the sound using Pygame directly
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(str(path))
-            pygame.mixer.music.play()
-            print(f"{Fore.GREEN}🔊 Playing: {path.name}{Style.RESET_ALL}")
-
-        except Exception as e:
-            print(f"{Fore.RED}Direct Playback Error: {e}{Style.RESET_ALL}")
+    def _play_hint(self, hint: str, hint_clues: list[str], step_index: int, path_name: str):
+        """
+        Plays only the clue for the step the player is on when the hint has one clue
+        per step; otherwise (or if that clue has no clip) the whole hint.
+        """
+        if len(hint_clues) > 1 and step_index < len(hint_clues):
+            clue = hint_clues[step_index]
+            self.log(f"{Fore.CYAN}💡 Clue {step_index + 1}/{len(hint_clues)}:{Fore.RESET} {clue}")
+            self.audio.play_hint_clue(path_name, step_index, text=clue)
+        else:
+            self._play_audio_non_blocking(hint, "hint", path_name)
 
     ###############################################################################
 
-
-    # old audio functions, use sound controller in output manager instead
-    # def _play_audio_and_wait(self, text: str, audio_type: str, path_identifier: str):
-    #     """
-    #     Sends a command to play audio and BLOCKS until the audio has finished playing.
-    #     """
-    #     print(text)
-        
-    #     self.output_manager.command_queue.put(
-    #         ("sound", {
-    #             "type_prefix": audio_type, 
-    #             "path_name": path_identifier,
-    #             "game_name": self.game_name,
-    #             "loop": False
-    #         })
-    #     )
-    #     print(f"{Style.DIM}--- GameSequence: Audio command for '{audio_type}' sent. Waiting... ---{Style.RESET_ALL}")
-
-    #     # Wait for the audio to START playing
-    #     started = False
-    #     print(f"{Style.DIM}  - Waiting for sound to START...{Style.RESET_ALL}")
-    #     for i in range(30):
-    #         if pygame.mixer.music.get_busy():
-    #             print(f"{Style.DIM}  - Sound has STARTED. (after {i * 0.1:.1f}s){Style.RESET_ALL}")
-    #             started = True
-    #             break
-    #         time.sleep(0.1)
-
-    #     if not started:
-    #         print(f"{Fore.YELLOW}Warning: Sound did not start playing within the time limit.{Style.RESET_ALL}")
-    #         return
-
-    #     # Wait for the audio to FINISH playing
-    #     print(f"{Style.DIM}  - Waiting for sound to FINISH...{Style.RESET_ALL}")
-    #     while pygame.mixer.music.get_busy():
-    #         time.sleep(0.1)
-    #     print(f"{Style.DIM}  - Sound has FINISHED.{Style.RESET_ALL}")
-
-    # def _play_audio_non_blocking(self, text: str, audio_type: str, path_identifier: str, repeat: bool = False):
-    #     """
-    #     Sends a command to play audio but does NOT block. Used for hints, repeats, etc.
-    #     """
-    #     if repeat:
-    #         print(f"{Fore.CYAN}🔁 (Repeat) Playing: {audio_type} for {path_identifier}{Fore.RESET}")
-    #     else:
-    #         print(text)
-        
-    #     # Send the command and return immediately
-    #     self.output_manager.command_queue.put(
-    #         ("sound", {
-    #             "type_prefix": audio_type, 
-    #             "path_name": path_identifier,
-    #             "game_name": self.game_name,
-    #             "loop": False
-    #         })
-    #     )
-
-
     def run_sequence(self):
         """The main entry point to start the entire game quest."""
         title = self.config.get("title", "Untitled Room")
         starting_description = self.config.get("starting_description", "")
         paths = self.config.get("paths", [])
 
-        print(f"{Fore.MAGENTA}=== {title} ==={Fore.RESET}")
-        self._play_audio_and_wait(starting_description, "starting_description", self.game_name)
-
-        # --- NEW: Pre-load the sound effect for better performance ---
-        try:
-            # Assumes your 'sfx' folder is at the root of the 'quest-box' project
-            sfx_path_correct = os.path.join(os.path.dirname(__file__), "..", "sfx", "rightanswer.mp3")
-            sfx_path_wrong = os.path.join(os.path.dirname(__file__), "..", "sfx", "wronganswer.mp3")
-            sfx_path_victory = os.path.join(os.path.dirname(__file__), "..", "sfx", "victory.mp3")
-            self.correct_sfx = pygame.mixer.Sound(sfx_path_correct)
-            self.wrong_sfx = pygame.mixer.Sound(sfx_path_wrong)
-            self.victory_sfx = pygame.mixer.Sound(sfx_path_victory)
-            print(f"{Style.DIM}Sound effects loaded.{Style.RESET_ALL}")
-        except pygame.error as e:
-            print(f"{Fore.RED}Could not load sound effect: {e}{Style.RESET_ALL}")
-            self.correct_sfx = None
-        # --- END NEW ---
-
-        for path in paths:
-            path_succeeded = self._run_single_path(path)
+        self.log(f"{Fore.MAGENTA}=== {title} ==={Fore.RESET}")
+        self.timeline.start()
+        # Decode the first path(s) in the background while the starting narration plays
+        self.audio.preload(self.config)
+
+        if self.intro_stream:
+            # Still being synthesized, so nothing can be queued behind it: the first
+            # path narrates its description itself
+            self.log(starting_description)
+            self._wait_for_narration(self.audio.narrate_stream(self.intro_stream))
+            first_description = None
+        else:
+            # The first description is queued right behind the starting description, so
+            # it follows after a fixed pause instead of a load-and-play gap
+            clips = [("starting_description", self.game_name, starting_description)]
+            if paths:
+                clips.append(("description", paths[0].get("path_name", "Unknown Path"), paths[0].get("description", "")))
+            narrations = self.audio.narrate_sequence(clips, gap=NARRATION_GAP)
+            self.log(starting_description)
+            self._wait_for_narration(narrations[0].future)
+            first_description = narrations[1].future if len(narrations) > 1 else None
+
+        for path_index, path in enumerate(paths):
+            self.audio.enter_path(path_index)
+            path_succeeded = self._run_single_path(path, narration=first_description if path_index == 0 else None)
             if not path_succeeded:
                 # The death text and error are handled inside _run_single_path
+                self.timeline.stop()
                 return False # End the game
 
-        print(f"{Fore.GREEN}\n🎉 Congratulations! All paths completed!{Style.RESET_ALL}")
-        self._play_sfx(self.victory_sfx)
+        self.log(f"{Fore.GREEN}\n🎉 Congratulations! All paths completed!{Style.RESET_ALL}")
+        self._play_sfx("victory")
+        self.timeline.stop()
         return True
 
-    def _run_single_path(self, path_config):
+    def _run_single_path(self, path_config, narration=None):
         """
         Runs the logic for a single, timed path with infinite attempts and
-        persistent hint/repeat commands.
+        persistent hint/repeat commands. `narration` is the description's Future
+        when it was already queued (see run_sequence); otherwise it is started here.
         """
         # --- 1. SETUP THE PATH ---
         path_name = path_config.get("path_name", "Unknown Path")
         description = path_config.get("description", "")
         hint = path_config.get("hint", "")
+        hint_clues = path_config.get("hint_clues", [])
         solution_sequence = path_config.get("solution_sequence", [])
         time_limit = path_config.get("time_limit", 90)
         death_text = path_config.get("death_text", "You have failed.")
-        effects = path_config.get("effects", [])
 
         # Used to track progress through the solution_sequence
         current_step_index = 0
 
         # --- 2. START THE PATH ---
-        print(f"\n{Fore.MAGENTA}--- Starting Path: {path_name} ---{Fore.RESET}")
-        
-        # Play initial effects
-        # for effect in effects:
-        #     try:
-        #         actuator_type, params = _normalize_and_validate_step(effect)
-        #         self.output_manager.command_queue.put((actuator_type, params))
-        #     except Exception as e:
-        #         print(f"✖ Invalid initial effect: {e}")
+        self.log(f"\n{Fore.MAGENTA}--- Starting Path: {path_name} ---{Fore.RESET}")
         
-        # Play the path description and start the timer
-        self._play_audio_and_wait(description, "description", path_name)
-        self.stop_timer_flag.clear()
-        timer_thread = threading.Thread(target=self.timer_thread_func, args=(time_limit,))
-        timer_thread.daemon = True
-        timer_thread.start()
-        print(f"{Fore.CYAN}Timer started! You have {time_limit} seconds.{Style.RESET_ALL}")
+        # Schedule the path's effects and audio cue, then start the description.
+        # The game loop runs while it plays, so the player can skip it (or, in "live"
+        # mode, already solve steps); the timer starts once it has ended.
+        self.timeline.play(compile_path_timeline(path_config, self._resolve_cue_path(path_config.get("audio_cue", ""))))
+        self.log(description)
+        if narration is None:
+            narration = self.audio.narrate("description", path_name, text=description)
+        deadline = None
 
         # --- 3. THE MAIN GAME LOOP ---
         while current_step_index < len(solution_sequence):
+            if deadline is None and narration.done():
+                self._end_narration()
+                self.timeline.mark(ANCHOR_NARRATION_END)
+                deadline = self.clock.now() + time_limit
+                self.log(f"{Fore.CYAN}Timer started! You have {time_limit} seconds.{Style.RESET_ALL}")
+
             # Check for timeout first on every loop iteration
-            if self.stop_timer_flag.is_set():
+            if deadline is not None and self._time_is_up(deadline):
+                self.timeline.cancel()
                 self._play_audio_and_wait(death_text, "death_text", path_name)
                 self._route_error(death_text)
                 return False
 
             try:
-                # Use a short timeout to remain responsive to the timer flag
-                event = self.input_queue.get(timeout=0.1)
+                # Wake up no later than the deadline to remain responsive to the timer
+                if deadline is None:
+                    timeout = NARRATION_POLL
+                else:
+                    timeout = min(0.1, max(deadline - self.clock.now(), 0.001))
+                event = self._next_event(timeout)
+
+                if self._is_stale(event):
+                    continue
+
+                # --- SKIP THE DESCRIPTION ---
+                if deadline is None and self._is_skip_input(event):
+                    self._skip_narration()
+                    continue
 
                 # --- PROCESS SPECIAL COMMANDS (HINT/REPEAT) ---
                 if event.device_type == "button" and event.value == "repeat":
-                    self._play_audio_non_blocking(hint, "hint", path_name)
+                    self._play_hint(hint, hint_clues, current_step_index, path_name)
                     continue # Go back to waiting for the next event
 
                 if event.device_type == "button" and event.value == "hint":
-                    self._play_audio_non_blocking(hint, "hint", path_name)
+                    self._play_hint(hint, hint_clues, current_step_index, path_name)
                     continue # Go back to waiting for the next event
 
                 # --- PROCESS PUZZLE INPUT ---
+                if deadline is None and self.narration_input == "discard":
+                    continue
+
                 expected_step = solution_sequence[current_step_index]
                 if self._check_event(event, expected_step):
-                    self._play_sfx(self.correct_sfx)
+                    self._play_sfx("correct")
                     current_step_index += 1
-                    print(f"{Fore.GREEN}✅ Step {current_step_index} correct!{Style.RESET_ALL}")
+                    self.log(f"{Fore.GREEN}✅ Step {current_step_index} correct!{Style.RESET_ALL}")
                 else:
                     # Incorrect input, do nothing and wait for the correct one
-                    print(f"{Fore.YELLOW}✖ Incorrect input. Try again.{Style.RESET_ALL}")
-                    self._play_sfx(self.wrong_sfx)
+                    self.log(f"{Fore.YELLOW}✖ Incorrect input. Try again.{Style.RESET_ALL}")
+                    self._play_sfx("wrong")
             
             except queue.Empty:
                 # This is normal, it just means no input was received. Loop again.
                 continue
 
         # --- 4. PATH SUCCESS ---
-        self.stop_timer_flag.set() # Stop the timer
-        timer_thread.join()
-        print(f"{Fore.GREEN}\n✅ Success! Path '{path_name}' completed.{Style.RESET_ALL}")
+        if deadline is None:
+            # Solved live before the description finished
+            self.audio.stop_narration()
+            self._end_narration()
+        self.timeline.cancel()
+        self.log(f"{Fore.GREEN}\n✅ Success! Path '{path_name}' completed.{Style.RESET_ALL}")
         return True
     
 
@@ -0,0 +1,257 @@
+# game_simulator.py
+
+import os
+import sys
+import time
+import queue
+import random
+from pathlib import Path
+from colorama import Fore, Style
+
+from clock import VirtualClock
+from audio_sink import NullAudioSink
+from input_event import InputEvent
+from filename_service import FileNameService
+from device_configs import DEVICE_CONFIGS, get_encoder_options, DISTANCE_STATES, GYRO_STATES
+from game_config_compiler import GameConfigCompiler, GameConfigError
+from game_sequence import GameSequence, event_matches_step
+
+# How long the simulated player "thinks" before each action (seconds)
+DEFAULT_THINK_TIME = 3.0
+
+
+# -------- In-memory replacements --------
+class ScriptedInputQueue:
+    """
+    Stands in for the InputManager's queue. Each scripted event carries the delay
+    (virtual seconds) after which the player triggers it; get() advances the
+    virtual clock instead of waiting, so a whole game runs at CPU speed.
+    """
+
+    def __init__(self, clock: VirtualClock, script=None):
+        self.clock = clock
+        self.script = list(script or [])  # [(delay, InputEvent), ...]
+        self.delivered = 0
+
+    def put(self, event: InputEvent, delay: float = 0.0):
+        self.script.append((delay, event))
+
+    def get(self, timeout: float = None):
+        if not self.script:
+            self.clock.advance(timeout or 0)
+            raise queue.Empty
+        delay, event = self.script[0]
+        if timeout is not None and delay > timeout:
+            self.clock.advance(timeout)
+            self.script[0] = (delay - timeout, event)
+            raise queue.Empty
+        self.script.pop(0)
+        self.clock.advance(delay)
+        self.delivered += 1
+        return event
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def empty(self) -> bool:
+        return not self.script
+
+
+class NullOutputManager:
+    """Records every output command instead of driving hardware."""
+
+    def __init__(self):
+        self.command_queue = queue.Queue()
+        self.controllers = {}
+        self.dispatched = []
+
+    def dispatch(self, device_type, params):
+        self.dispatched.append((device_type, params))
+
+
+class NullTimeline:
+    """Records timeline calls; effects are irrelevant to whether a game is solvable."""
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def play(self, actions):
+        self.calls.append(("play", actions))
+
+    def mark(self, anchor):
+        self.calls.append(("mark", anchor))
+
+    def cancel(self):
+        self.calls.append(("cancel", None))
+
+
+class SimulatedGameSequence(GameSequence):
+    """
+    GameSequence with a virtual clock, null audio and in-memory queues. Narration
+    "plays" by advancing the clock by its estimated duration (see NullAudioSink).
+    """
+
+    def __init__(self, config_path, game_name: str, file_service: FileNameService, script=None,
+                 compiler: GameConfigCompiler = None, clock: VirtualClock = None, quiet: bool = False):
+        clock = clock if clock else VirtualClock()
+        super().__init__(
+            config_path=config_path,
+            input_queue=ScriptedInputQueue(clock, script),
+            output_manager=NullOutputManager(),
+            game_name=game_name,
+            file_service=file_service,
+            compiler=compiler,
+            clock=clock,
+            audio_sink=NullAudioSink(clock, file_service, game_name),
+            quiet=quiet,
+        )
+        self.timeline = NullTimeline()
+
+
+# -------- Input space and players --------
+def device_event_space(device_configs: list[dict] = DEVICE_CONFIGS) -> list[InputEvent]:
+    """Every puzzle InputEvent the configured devices can emit (mirrors the controllers)."""
+    events = []
+    for config in device_configs:
+        device_type = config.get("type")
+        if device_type == "sx1509_button":
+            events.append(InputEvent("button", config["value"]))
+        elif device_type == "gyro":
+            events.extend(InputEvent("gyro", state, {"details": {"shaking": True, "face_up": 0}}) for state in GYRO_STATES)
+        elif device_type == "rotary_encoder":
+            name = config["name"]
+            events.extend(InputEvent(name, option, {"name": name}) for option in get_encoder_options(name))
+        elif device_type == "distance_sensor":
+            events.extend(InputEvent("distance_sensor", state) for state in DISTANCE_STATES)
+    return events
+
+
+def find_event_for_step(step: dict, event_space: list[InputEvent]):
+    """Returns an event the hardware can produce that solves the step, or None."""
+    for event in event_space:
+        if event_matches_step(event, step)[0]:
+            return event
+    return None
+
+
+def solution_script(config: dict, event_space: list[InputEvent], think_time: float = DEFAULT_THINK_TIME):
+    """
+    Builds a perfect player's input script for a compiled game.
+
+    Returns:
+        tuple[list, list[str]]: (script, problems). Problems name every step no
+        producible event can satisfy.
+    """
+    script, problems = [], []
+    for path_index, path in enumerate(config["paths"]):
+        for step_index, step in enumerate(path["solution_sequence"]):
+            event = find_event_for_step(step, event_space)
+            if event is None:
+                problems.append(f"paths[{path_index}] '{path['path_name']}' step {step_index + 1}: "
+                                f"no device can produce {step}")
+                continue
+            script.append((think_time, event))
+    return script, problems
+
+
+def noisy_script(script, event_space: list[InputEvent], rng: random.Random, noise: float = 0.3):
+    """Interleaves hint/repeat presses and random wrong inputs into a perfect script."""
+    noisy = []
+    specials = [InputEvent("button", "hint"), InputEvent("button", "repeat")]
+    for delay, event in script:
+        if rng.random() < noise:
+            noisy.append((rng.uniform(0.5, 2.0), rng.choice(specials + event_space)))
+        noisy.append((delay, event))
+    return noisy
+
+
+# -------- Solver --------
+class GameSolver:
+    """Checks that games are completable with the inputs the box actually provides."""
+
+    def __init__(self, file_service: FileNameService, device_configs: list[dict] = DEVICE_CONFIGS):
+        self.file_service = file_service
+        self.compiler = GameConfigCompiler(device_configs)
+        self.event_space = device_event_space(device_configs)
+
+    def _simulate(self, game_name: str, script) -> tuple[bool, SimulatedGameSequence]:
+        game = SimulatedGameSequence(
+            config_path=self.file_service.get_game_json_path(game_name),
+            game_name=game_name,
+            file_service=self.file_service,
+            script=script,
+            compiler=self.compiler,
+            quiet=True,
+        )
+        return game.run_sequence(), game
+
+    def check_game(self, game_name: str, seed: int = 0) -> dict:
+        """
+        Validates and plays a game with a perfect, a noisy and an idle player.
+
+        Returns:
+            dict: {"game", "solvable", "problems", "virtual_seconds", "wall_ms"}
+        """
+        wall_start = time.perf_counter()
+        report = {"game": game_name, "solvable": False, "problems": [], "virtual_seconds": 0.0}
+        try:
+            config = self.compiler.load(self.file_service.get_game_json_path(game_name))
+        except (GameConfigError, FileNotFoundError) as e:
+            report["problems"] = list(getattr(e, "errors", [str(e)]))
+            report["wall_ms"] = (time.perf_counter() - wall_start) * 1000
+            return report
+
+        script, problems = solution_script(config, self.event_space)
+        report["problems"].extend(problems)
+        if not problems:
+            won, game = self._simulate(game_name, script)
+            report["virtual_seconds"] = game.clock.now()
+            if not won:
+                report["problems"].append("perfect player did not finish within the time limits")
+
+            won_noisy, _ = self._simulate(game_name, noisy_script(script, self.event_space, random.Random(seed)))
+            if not won_noisy:
+                report["problems"].append("player with hint presses and wrong inputs did not finish")
+
+            won_idle, _ = self._simulate(game_name, [])
+            if won_idle:
+                report["problems"].append("game was won without any input")
+
+        report["solvable"] = not report["problems"]
+        report["wall_ms"] = (time.perf_counter() - wall_start) * 1000
+        return report
+
+
+# Validate the whole catalog: python game_simulator.py [game-name ...]
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    file_service = FileNameService(base_dir)
+    solver = GameSolver(file_service)
+
+    game_names = sys.argv[1:]
+    if not game_names:
+        available_games_file = os.path.join(file_service.get_game_folder_path(""), 'available_games.txt')
+        with open(available_games_file, 'r') as f:
+            game_names = [line.strip().lower() for line in f if line.strip()]
+
+    total_start = time.perf_counter()
+    failed = 0
+    for game_name in game_names:
+        report = solver.check_game(game_name)
+        if report["solvable"]:
+            print(f"{Fore.GREEN}✅ {game_name}: solvable "
+                  f"({report['virtual_seconds']:.0f} s of play in {report['wall_ms']:.1f} ms){Style.RESET_ALL}")
+        else:
+            failed += 1
+            print(f"{Fore.RED}✖ {game_name}:{Style.RESET_ALL}")
+            for problem in report["problems"]:
+                print(f"    - {problem}")
+    print(f"{len(game_names) - failed}/{len(game_names)} games solvable "
+          f"in {(time.perf_counter() - total_start) * 1000:.1f} ms.")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,176 @@
+# generation_benchmark.py
+
+import io
+import os
+import sys
+import time
+import argparse
+import threading
+import tempfile
+import contextlib
+from pathlib import Path
+from colorama import Fore, Style
+
+# Append parent directory to sys.path to resolve the API packages
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from geminiAPI import gemini_client
+from geminiAPI.standin_server import GeminiStandIn
+from elevenlabsAPI.standin_server import ElevenLabsStandIn
+from elevenlabsAPI.tts_service import TTSService
+from elevenlabsAPI.ttse_service import TTSEService
+from elevenlabsAPI.tts_store import TTSStore
+from hardware.api_client import configure_client, PROVIDERS
+from filename_service import FileNameService
+from game_audio_generator import GameAudioGenerator, EarlyVoicing
+from audio_stream import AudioStream
+
+CONCURRENCY_LEVELS = [1, 2, 3, 4]
+
+
+class GenerationBenchmark:
+    """
+    Runs the whole new-game path (generate_room_configuration, then
+    GameAudioGenerator/TTSService) against local stand-ins for Gemini and
+    ElevenLabs, in a throwaway catalog with empty TTS and sound effect stores, and
+    times each stage: the Gemini answer, the first clip (when the game could start:
+    the first streamed chunk of the starting description in streamed runs) and all
+    clips.
+    """
+
+    def __init__(self, gemini: GeminiStandIn, eleven: ElevenLabsStandIn, verbose: bool = False):
+        self.gemini = gemini
+        self.eleven = eleven
+        self.verbose = verbose
+
+    def start(self):
+        # The stand-ins ignore the keys, but the services refuse to run without one
+        os.environ.setdefault("GEMINI_API_KEY", "standin")
+        os.environ.setdefault("ELEVEN_API_KEY", "standin")
+        gemini_client.set_api_url(self.gemini.start())
+        self.eleven.start()
+
+    def stop(self):
+        gemini_client.set_api_url(None)
+        self.gemini.stop()
+        self.eleven.stop()
+
+    def run(self, concurrency: int, throttle_rate: float = 0.0, error_rate: float = 0.0,
+            streamed: bool = False, parallel: bool = False) -> dict:
+        """
+        Generates and voices one game; returns its timings and the clients' retry
+        counts. `streamed` streams Gemini's answer and voices fields as they arrive
+        (EarlyVoicing), as main.py does; `parallel` generates the story frame, then
+        the paths concurrently.
+        """
+        for standin in (self.gemini, self.eleven):
+            standin.faults.throttle_rate = throttle_rate
+            standin.faults.error_rate = error_rate
+        # Fresh clients: empty counters and full token buckets for every run
+        gemini = configure_client("gemini")
+        eleven = configure_client("elevenlabs", max_concurrent=concurrency)
+
+        result = {"concurrency": concurrency, "faults": throttle_rate + error_rate, "streamed": streamed,
+                  "parallel": parallel, "ok": False, "gemini": None, "first_clip": None, "total": None}
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        with tempfile.TemporaryDirectory() as base_dir, output:
+            catalog = FileNameService(base_dir)
+            tts = TTSService(base_dir, api_url=self.eleven.url, store=TTSStore(Path(base_dir) / "tts_store"))
+            sfx = TTSEService(base_dir, api_url=self.eleven.url, library=TTSStore(Path(base_dir) / "sfx_library"))
+            started = time.monotonic()
+            if streamed:
+                # As main.py: the starting description is streamed, not voiced early
+                early_voicing = EarlyVoicing(tts, fields=EarlyVoicing.VOICED_FIELDS - {"starting_description"})
+                game_name = gemini_client.generate_room_configuration(target=catalog, register=False,
+                                                                      on_field=early_voicing.on_field,
+                                                                      parallel_paths=parallel)
+                early_voicing.close()
+            else:
+                game_name = gemini_client.generate_room_configuration(target=catalog, register=False,
+                                                                      parallel_paths=parallel)
+            result["gemini"] = time.monotonic() - started
+            if game_name:
+                intro = AudioStream() if streamed else None
+                first_data = threading.Event()
+                if intro:
+                    intro.on_data = first_data.set
+                job = GameAudioGenerator(base_dir, tts, effects_service=sfx).start_generation(game_name, intro_stream=intro)
+                if job:
+                    if intro:
+                        first_data.wait()
+                    else:
+                        job.wait_for([catalog.get_audio_filename("starting_description", game_name)])
+                    result["first_clip"] = time.monotonic() - started
+                    result["ok"] = job.wait()
+                    result["total"] = time.monotonic() - started
+                    result["clips"] = job.total
+        for name, client in (("gemini", gemini), ("eleven", eleven)):
+            result[f"{name}_requests"] = client.attempts
+            result[f"{name}_retries"] = client.retries
+        return result
+
+
+def print_report(results: list[dict]):
+    def seconds(value):
+        return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+    print(f"\n{Style.BRIGHT}{'conc':>4} {'faults':>7} {'stream':>6} {'paths':>8} {'gemini':>8} {'1st clip':>8} {'total':>8} "
+          f"{'requests (retries)':>24}{Style.RESET_ALL}")
+    for result in results:
+        color = Fore.GREEN if result["ok"] else Fore.RED
+        requests_made = (f"G {result['gemini_requests']} ({result['gemini_retries']}), "
+                         f"E {result['eleven_requests']} ({result['eleven_retries']})")
+        print(f"{color}{result['concurrency']:>4} {result['faults']:>7.0%} {'yes' if result['streamed'] else 'no':>6} "
+              f"{'parallel' if result['parallel'] else 'one call':>8} "
+              f"{seconds(result['gemini'])} "
+              f"{seconds(result['first_clip'])} {seconds(result['total'])} {requests_made:>24}{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark game generation end to end against local API stand-ins.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS,
+                        help="ElevenLabs requests in flight to compare")
+    parser.add_argument("--speed", type=float, default=8.0, help="stand-in synthesis speed (x real time)")
+    parser.add_argument("--first-token", type=float, default=3.0, help="Gemini seconds to the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.2, help="share of requests answered 429 in the fault run")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of requests answered 500 in the fault run")
+    parser.add_argument("--game", nargs="+", default=None, help="recorded game JSON(s) Gemini answers with")
+    parser.add_argument("--no-streamed", action="store_true", help="skip the streamed-answer run")
+    parser.add_argument("--no-parallel", action="store_true", help="skip the parallel-paths runs")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    benchmark = GenerationBenchmark(
+        GeminiStandIn(games=args.game, first_token_latency=args.first_token, tokens_per_second=args.tokens_per_second),
+        ElevenLabsStandIn(speed=args.speed, first_byte_latency=0.3),
+        verbose=args.verbose)
+    benchmark.start()
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            print(f"{Fore.CYAN}Concurrency {concurrency}...{Style.RESET_ALL}")
+            results.append(benchmark.run(concurrency))
+        if args.throttle_rate or args.error_rate:
+            concurrency = PROVIDERS["elevenlabs"]["max_concurrent"]
+            print(f"{Fore.CYAN}Concurrency {concurrency} with {args.throttle_rate:.0%} 429s "
+                  f"and {args.error_rate:.0%} 500s...{Style.RESET_ALL}")
+            results.append(benchmark.run(concurrency, args.throttle_rate, args.error_rate))
+        if not args.no_streamed:
+            concurrency = PROVIDERS["elevenlabs"]["max_concurrent"]
+            print(f"{Fore.CYAN}Concurrency {concurrency}, streamed Gemini answer...{Style.RESET_ALL}")
+            results.append(benchmark.run(concurrency, streamed=True))
+        if not args.no_parallel:
+            concurrency = PROVIDERS["elevenlabs"]["max_concurrent"]
+            print(f"{Fore.CYAN}Concurrency {concurrency}, paths generated in parallel...{Style.RESET_ALL}")
+            results.append(benchmark.run(concurrency, parallel=True))
+            if not args.no_streamed:
+                print(f"{Fore.CYAN}Concurrency {concurrency}, paths generated in parallel and streamed..."
+                      f"{Style.RESET_ALL}")
+                results.append(benchmark.run(concurrency, streamed=True, parallel=True))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        benchmark.stop()
+    print_report(results)
@@ -82,8 +82,8 @@
 #         print("Exiting...")
 
 import smbus2
-import time
 import threading
+from clock import SYSTEM_CLOCK
 
 # MPU-6050 Registers
 MPU_ADDR = 0x69  # I2C address
@@ -97,11 +97,12 @@ SHAKE_THRESHOLD = 1.4  # Threshold for shake magnitude (adjust as needed)
 SHAKE_TIME_THRESHOLD = 0.5  # Minimum time between shakes (in seconds)
 
 class Gyro:
-    def __init__(self, bus_id=1, address=MPU_ADDR, bus_lock=None):
+    def __init__(self, bus_id=1, address=MPU_ADDR, bus_lock=None, clock=None):
         self.bus = smbus2.SMBus(bus_id)
         self.address = address
         self.bus_lock = bus_lock if bus_lock else threading.Lock()
-        self.last_shake_time = time.time()
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.last_shake_time = self.clock.now()
 
         # Wake up the sensor, now with error handling
         try:
@@ -134,7 +135,7 @@ class Gyro:
     def detect_shake(self, ax, ay, az):
         """Detect shake based on acceleration magnitude."""
         shake_magnitude = (ax**2 + ay**2 + az**2)**0.5
-        current_time = time.time()
+        current_time = self.clock.now()
         
         if shake_magnitude > SHAKE_THRESHOLD and (current_time - self.last_shake_time) > SHAKE_TIME_THRESHOLD:
             self.last_shake_time = current_time
@@ -163,6 +164,6 @@ if __name__ == "__main__":
             state = gyro_sensor.check_state()
             if state["shaking"]:
                 print("Shake detected! 💥")
-            time.sleep(0.1)
+            gyro_sensor.clock.sleep(0.1)
     except KeyboardInterrupt:
         print("Exiting...")
\ No newline at end of file
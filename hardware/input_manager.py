@@ -3,6 +3,7 @@ import time
 from threading import Thread, Lock
 import RPi.GPIO as GPIO
 from colorama import Fore, Style
+from clock import SYSTEM_CLOCK
 
 # Helper Class
 from input_event import InputEvent 
@@ -13,20 +14,20 @@ from gyro_controller import Gyro
 from rotary_encoder_controller import RotaryEncoderController 
 from distance_controller import DistanceController
 
-IMAGE_OPTIONS = ["dynamite", "knife", "candle", "key", "rope", "book", "dice", "potion", "stick", "compass"] # 10 images
-NUMBER_OPTIONS = [str(i) for i in range(0, 10)] # 10 numbers
+from device_configs import get_encoder_options
 
 class InputManager:
-    def __init__(self, event_queue, bus_lock, device_configs):
+    def __init__(self, event_queue, bus_lock, device_configs, clock=None):
         self.event_queue = event_queue
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.bus_lock = bus_lock
         self.running = False
         self.worker_thread = None
         self.controllers = {}
         
         # Initialize the I2C controllers with the shared bus_lock
-        self.sx1509 = SX1509(bus_lock=self.bus_lock)
-        self.gyro_sensor = Gyro(bus_lock=self.bus_lock)
+        self.sx1509 = SX1509(bus_lock=self.bus_lock, clock=self.clock)
+        self.gyro_sensor = Gyro(bus_lock=self.bus_lock, clock=self.clock)
         
         self.polling_functions = []
         
@@ -51,7 +52,7 @@ class InputManager:
         def check_button():
             state = self.sx1509.debounced_read_pin(pin)
             if state == 0:
-                event = InputEvent("button", color)
+                event = InputEvent("button", color, timestamp=self.clock.now())
                 self.event_queue.put(event)
                 print(f"{Style.DIM}SX1509 Button {color} pressed.{Style.RESET_ALL}")
         return check_button
@@ -65,7 +66,7 @@ class InputManager:
             try:
                 state = self.gyro_sensor.check_state()
                 if state["shaking"]:
-                    event = InputEvent("gyro", "shaking", {"details": state})
+                    event = InputEvent("gyro", "shaking", {"details": state}, timestamp=self.clock.now())
                     self.event_queue.put(event)
                     print("Gyro shaking detected.")
             except OSError as e:
@@ -78,11 +79,7 @@ class InputManager:
         dt_pin = config["dt_pin"]
         button_pin = config["button_pin"]
         
-        options = []
-        if name == "rotary_encoder_picture":
-            options = IMAGE_OPTIONS
-        elif name == "rotary_encoder_number":
-            options = NUMBER_OPTIONS
+        options = get_encoder_options(name)
         
         encoder_controller = RotaryEncoderController(
             name=name,
@@ -90,7 +87,8 @@ class InputManager:
             clk_pin=clk_pin,
             dt_pin=dt_pin,
             button_pin=button_pin,
-            options=options
+            options=options,
+            clock=self.clock
         )
         self.controllers[name] = encoder_controller
         print(f"{Style.DIM}Configured rotary encoder '{name}' with {len(options)} options.{Style.RESET_ALL}")
@@ -104,7 +102,8 @@ class InputManager:
             name=name,
             event_queue=self.event_queue,
             trigger_pin=trigger_pin,
-            echo_pin=echo_pin
+            echo_pin=echo_pin,
+            clock=self.clock
         )
         self.controllers[name] = distance_controller
         print(f"{Style.DIM}Configured distance sensor '{name}' on pins TRIG={trigger_pin}, ECHO={echo_pin}{Style.RESET_ALL}")
@@ -142,7 +141,7 @@ class InputManager:
         while self.running:
             for check_func in self.polling_functions:
                 check_func()
-                time.sleep(0.05) 
+                self.clock.sleep(0.05)
 
 # Example usage for testing
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
-import time
 from gpiozero import MCP3008
+from clock import SYSTEM_CLOCK
 
 class Joystick:
     """Manages a joystick connected to an MCP3008 ADC with calibration."""
 
-    def __init__(self, x_channel=0, y_channel=1, threshold=0.45, calibration_time=1):
+    def __init__(self, x_channel=0, y_channel=1, threshold=0.45, calibration_time=1, clock=None):
         """
         Initializes the Joystick object and calibrates the center position.
 
@@ -13,7 +13,9 @@ class Joystick:
             y_channel (int): MCP3008 channel for the Y-axis.
             threshold (float): Threshold for direction detection (0.0-0.5).
             calibration_time (int): Time in seconds to sample for calibration.
+            clock: Time source for calibration and polling (default: the system's monotonic clock).
         """
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.joystick_x = MCP3008(channel=x_channel)
         self.joystick_y = MCP3008(channel=y_channel)
         self.threshold = threshold
@@ -34,12 +36,12 @@ class Joystick:
         y_sum = 0.0
         samples = 0
 
-        start_time = time.time()
-        while time.time() - start_time < calibration_time:
+        start_time = self.clock.now()
+        while self.clock.now() - start_time < calibration_time:
             x_sum += self.joystick_x.value
             y_sum += self.joystick_y.value
             samples += 1
-            time.sleep(0.01)
+            self.clock.sleep(0.01)
 
         if samples > 0:
             self.x_offset = x_sum / samples
@@ -115,7 +117,7 @@ if __name__ == "__main__":
     try:
         while True:
             joystick.print_direction()
-            time.sleep(0.1)
+            joystick.clock.sleep(0.1)
 
     except KeyboardInterrupt:
         print("\nExiting program.")
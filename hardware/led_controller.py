@@ -9,6 +9,7 @@ import queue
 from neopixel import NeoPixel
 from board import D18
 from colorama import Fore, Style
+from clock import SYSTEM_CLOCK
 
 # GPIO-Pin für LEDs
 LED_PIN = D18
@@ -24,10 +25,12 @@ COLORS = {
     "yellow": (255, 255, 0),
     "orange-red": (255, 120, 0),
     "red": (255, 0, 0),
+    "purple": (160, 32, 240),
 }
 
 class LEDController:
-    def __init__(self):
+    def __init__(self, clock=None):
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.strip = NeoPixel(LED_PIN, NUM_PIXELS, brightness=BRIGHTNESS, auto_write=False)
         self.led_queue = queue.Queue()
         self.stop_worker_event = threading.Event()
@@ -77,7 +80,7 @@ class LEDController:
             try:
                 effect = self.led_queue.get(timeout=0.1)
                 self.stop_effect_event.set()
-                time.sleep(0.05)
+                self.clock.sleep(0.05)
                 self.stop_effect_event.clear()
 
                 mode = effect.get("mode")
@@ -98,6 +101,8 @@ class LEDController:
             self._blink(color, **params)
         elif mode == "pulse":
             self._pulse(color, **params)
+        elif mode == "fade":
+            self._fade_in(color, **params)
 
     def _blink(self, color, repeat=5, blink_interval=0.3):
         for _ in range(repeat):
@@ -105,9 +110,9 @@ class LEDController:
                 self.set_color("off")
                 return
             self.set_color(color)
-            time.sleep(blink_interval)
+            self.clock.sleep(blink_interval)
             self.set_color("off")
-            time.sleep(blink_interval)
+            self.clock.sleep(blink_interval)
         self.set_color("off")
 
     def _pulse(self, color, repeat=5, delay=0.03):
@@ -126,6 +131,12 @@ class LEDController:
         
         self.set_color("off")
         
+    def _fade_in(self, color, delay=0.03):
+        """Fades from off to the color and keeps it lit."""
+        if color not in COLORS:
+            return
+        self._fade(COLORS["off"], COLORS[color], steps=50, delay=delay)
+
     def _fade(self, start_color, end_color, steps, delay):
         for i in range(steps):
             if self.stop_effect_event.is_set():
@@ -138,7 +149,7 @@ class LEDController:
             
             self.strip.fill((r, g, b))
             self.strip.show()
-            time.sleep(delay)
+            self.clock.sleep(delay)
 
 # Main for testing
 if __name__ == "__main__":
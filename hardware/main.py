@@ -21,30 +21,43 @@ sys.path.append(parent_dir)
 # Import shared service setup (assuming your elevenlabsAPI folder/files are correctly named)
 from geminiAPI.gemini_client import generate_room_configuration
 from elevenlabsAPI.tts_service import TTSService 
-from game_audio_generator import GameAudioGenerator
+from game_audio_generator import GameAudioGenerator, EarlyVoicing
+from audio_transcoder import AudioTranscoder, MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS
+from audio_latency import load_mixer_settings
+from audio_stream import AudioStream
 from filename_service import FileNameService
 
 # Import Core Game Components
 from game_sequence import GameSequence
+from game_config_compiler import GameConfigError
 from input_manager import InputManager
 from output_manager import OutputManager
 from led_controller import LEDController
-# from sound_controller import SoundController 
+from sound_controller import SoundController
 from vibration_motor_controller import VibrationController
 from bus_manager import I2C_BUS_LOCK
+from device_configs import DEVICE_CONFIGS
 
 # Import the new Menu Manager
 from menu_manager import MenuManager 
+from game_pool import GamePool
 
 BASE_DIR = Path(__file__).parent.parent
+# Start a freshly generated game once its first clip is voiced; the rest is voiced in the background
+PIPELINED_STARTUP = True
+# Stream Gemini's answer and voice each field as soon as it is written
+STREAMED_GENERATION = True
 
 
 def main():
+    input_manager_instance = output_manager_instance = game_pool = None
     try:
         # Force ALSA driver to prevent defaulting to HDMI or failing without a monitor
         os.environ['SDL_AUDIODRIVER'] = 'alsa' 
-        # Pre-initialize the mixer with standard settings
-        pygame.mixer.pre_init(44100, -16, 2, 512)
+        # Pre-initialize the mixer with the buffer (and device) measured by audio_latency.py
+        mixer_settings = load_mixer_settings()
+        pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, mixer_settings["buffer"],
+                              devicename=mixer_settings["devicename"])
         pygame.init()  # Initialize Pygame
 
         # --- 1. INITIALIZE THREAD MANAGERS (needed for menu input/output) ---
@@ -61,28 +74,16 @@ def main():
         led_controller = LEDController()
         vibration_controller = VibrationController()
         file_service = FileNameService(str(BASE_DIR)) # <-- Needs to be defined before SoundController
-        # sound_controller = SoundController(file_service) # TTS for game audio
+        sound_controller = SoundController(file_service) # Narration, hints, SFX and audio cues
 
         # Add controllers to the OutputManager
         output_manager_instance = OutputManager(output_command_queue)
-        # output_manager_instance.add_controller("light", led_controller)
-        # output_manager_instance.add_controller("vibration", vibration_controller)
+        output_manager_instance.add_controller("light", led_controller)
+        output_manager_instance.add_controller("vibration", vibration_controller)
         output_manager_instance.add_controller("tts_service", audio_service)
-        # output_manager_instance.add_controller("sound", sound_controller)
-
-        # Define device configurations (Hint and Repeat are crucial here)
-        device_configs = [
-            {"type": "sx1509_button", "value": "red", "pin": 1},
-            {"type": "sx1509_button", "value": "yellow", "pin": 2},
-            {"type": "sx1509_button", "value": "blue", "pin": 3},
-            {"type": "sx1509_button", "value": "green", "pin": 4},
-            {"type": "sx1509_button", "value": "hint", "pin": 13}, # MENU START GAME/HINT
-            {"type": "sx1509_button", "value": "repeat", "pin": 14},# MENU SWITCH GAME/REPEAT
-            {"type": "gyro", "value": "shaking"},
-            {"type": "rotary_encoder", "name": "rotary_encoder_picture", "clk_pin": 20, "dt_pin": 21, "button_pin": 16},
-            {"type": "rotary_encoder", "name": "rotary_encoder_number", "clk_pin": 13, "dt_pin": 19, "button_pin": 26},
-            {"type": "distance_sensor", "trigger_pin": 23, "echo_pin": 24},
-        ]
+        output_manager_instance.add_controller("sound", sound_controller)
+
+        device_configs = DEVICE_CONFIGS
 
         # Initialize Input Manager
         input_manager_instance = InputManager(input_event_queue, bus_lock=I2C_BUS_LOCK, device_configs=device_configs)
@@ -103,26 +104,51 @@ def main():
         time.sleep(1) # Give threads time to initialize
 
         # --- 2. RUN MENU LOOP ---
-        menu_manager = MenuManager(input_event_queue, output_manager_instance, file_service)
+        # Pre-generates complete games in the background while the menu idles
+        game_pool = GamePool(BASE_DIR)
+        game_pool.start()
+        menu_manager = MenuManager(input_event_queue, output_manager_instance, file_service, game_pool=game_pool)
         # The menu manager will return the selected game name or the GENERATE_NEW_GAME signal
         selected_game_name = menu_manager.run_menu()
 
         # --- 3. LOAD/GENERATE GAME CONFIG ---
         game_name = None
+        intro_stream = None
+        # No background generation competing with live generation or play
+        game_pool.pause()
         if selected_game_name == MenuManager.GENERATE_NEW_GAME:
+            game_name = game_pool.take()
+            if game_name:
+                print(f"--- 3. Starting Pre-Generated Game: {game_name} ---")
+        if selected_game_name == MenuManager.GENERATE_NEW_GAME and not game_name:
             print("--- 3. Generating New Game via Gemini ---")
-            game_name = generate_room_configuration()
+            if STREAMED_GENERATION:
+                # Voices the paths (and, unless it will be streamed, the starting description)
+                # while Gemini is still writing them
+                fields = EarlyVoicing.VOICED_FIELDS - {"starting_description"} if PIPELINED_STARTUP else None
+                early_voicing = EarlyVoicing(audio_service, fields=fields)
+                game_name = generate_room_configuration(on_field=early_voicing.on_field)
+                early_voicing.close()
+            else:
+                game_name = generate_room_configuration()
             if not game_name:
                 print("FATAL ERROR: Failed to generate a new room configuration. Exiting.")
                 return
             
             # Audio generation runs ONLY for newly generated games
-            audio_generator = GameAudioGenerator(str(BASE_DIR), audio_service)
-            audio_success = audio_generator.generate_all_game_audio(game_name)
-            
-            if not audio_success:
+            audio_generator = GameAudioGenerator(str(BASE_DIR), audio_service, transcoder=AudioTranscoder())
+            # The starting description plays while it is synthesized, instead of after it
+            intro_stream = AudioStream() if PIPELINED_STARTUP else None
+            generation = audio_generator.start_generation(game_name, intro_stream=intro_stream)
+            if not generation:
+                intro_stream = None
+                print("Warning: Audio generation could not start. Continuing without audio.")
+            elif PIPELINED_STARTUP:
+                # Clips are generated in play order; playback waits for any clip that isn't there yet
+                sound_controller.set_generation(generation)
+            elif not generation.wait():
                 print("Warning: Some audio files failed to generate. Continuing with available files.")
-        else:
+        elif selected_game_name != MenuManager.GENERATE_NEW_GAME:
             # Load a pre-existing game
             game_name = selected_game_name
             print(f"--- 3. Loading Saved Game: {game_name} ---")
@@ -137,17 +163,23 @@ def main():
             input_queue=input_event_queue,
             output_manager=output_manager_instance,
             game_name=game_name,
-            file_service=file_service
+            file_service=file_service,
+            intro_stream=intro_stream
         )
 
         print("Starting game loop...")
         game_sequence_instance.run_sequence()
+    except GameConfigError as e:
+        # Unplayable (e.g. malformed AI-generated) games are rejected before play starts
+        print(f"\nFATAL ERROR: {e}")
     except (KeyboardInterrupt, RuntimeError) as e:
         # Catch Ctrl+C or our custom runtime error
         print(f"\nExiting due to: {e}")
     finally:
         # --- THIS CLEANUP CODE IS NOW GUARANTEED TO RUN ---
         print("--- Shutting down all systems ---")
+        if game_pool:
+            game_pool.stop()
         if input_manager_instance:
             input_manager_instance.stop()
         if output_manager_instance:
@@ -1,12 +1,12 @@
 # menu_manager.py
 
 import os
-import time
 from queue import Queue
 from colorama import Fore, Style
 from typing import Literal
 
 from filename_service import FileNameService 
+from clock import SYSTEM_CLOCK
 
 #colorama.init(autoreset=True)
 
@@ -16,8 +16,11 @@ class MenuManager:
     # Menu State constant
     GENERATE_NEW_GAME = "GENERATE_NEW_GAME"
     
-    def __init__(self, input_queue: Queue, output_manager, file_service: FileNameService):
+    def __init__(self, input_queue: Queue, output_manager, file_service: FileNameService, game_pool=None,
+                 clock=None):
         self.input_queue = input_queue
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.game_pool = game_pool  # optional GamePool: pre-generated games for "Generate New Game"
         self.output_manager = output_manager
         self.file_service = file_service
         self.available_games = self._load_available_games()
@@ -62,7 +65,10 @@ class MenuManager:
         print("="*50)
         
         # Display all options
-        options = ["GENERATE NEW GAME"] + self.available_games
+        generate_label = "GENERATE NEW GAME"
+        if self.game_pool:
+            generate_label += f" ({len(self.game_pool.ready_games())} ready)"
+        options = [generate_label] + self.available_games
         for i, option in enumerate(options):
             prefix = f"{Fore.GREEN}>>{Style.RESET_ALL}" if (i - 1) == self.current_selection_index else "  "
             print(f"{prefix} {option}")
@@ -101,7 +107,7 @@ class MenuManager:
             try:
                 input_event = self.input_queue.get_nowait() 
             except:
-                time.sleep(0.1)
+                self.clock.sleep(0.1)
                 continue
             
             # Check for hint/switch button press
@@ -41,7 +41,21 @@ class OutputManager:
             if hasattr(controller, 'stop'):
                 controller.stop()
 
-    # output_manager.py
+    def dispatch(self, device_type, params):
+        """
+        Hands a command straight to its controller on the calling thread.
+        Used by the worker loop and by the CueTimeline, which needs exact timing.
+        Returns whatever the controller's set_effect returns (e.g. the SoundController's Future).
+        """
+        if device_type in self.controllers:
+            controller = self.controllers[device_type]
+            
+            if hasattr(controller, 'set_effect'):
+                return controller.set_effect(**params)
+            else:
+                print(f"{Fore.YELLOW}Warning: Controller for '{device_type}' has no 'set_effect' method.{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}Warning: No controller found for device type '{device_type}'.{Style.RESET_ALL}")
 
     def _worker_loop(self):
         """The main loop that waits for and executes commands."""
@@ -53,15 +67,7 @@ class OutputManager:
                 print(f"{Fore.MAGENTA}--- OutputManager: Dequeued command for '{device_type}' ---{Style.RESET_ALL}")
                 # --- END DEBUG ---
 
-                if device_type in self.controllers:
-                    controller = self.controllers[device_type]
-                    
-                    if hasattr(controller, 'set_effect'):
-                        controller.set_effect(**params)
-                    else:
-                        print(f"{Fore.YELLOW}Warning: Controller for '{device_type}' has no 'set_effect' method.{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.YELLOW}Warning: No controller found for device type '{device_type}'.{Style.RESET_ALL}")
+                self.dispatch(device_type, params)
                 
                 self.command_queue.task_done()
                 
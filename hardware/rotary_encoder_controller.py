@@ -4,10 +4,12 @@ import threading
 from input_event import InputEvent 
 import queue
 from colorama import Fore, Style
+from clock import SYSTEM_CLOCK
 
 class RotaryEncoderController:
-    def __init__(self, name, event_queue, clk_pin, dt_pin, button_pin, options=None, steps_per_option=4):
+    def __init__(self, name, event_queue, clk_pin, dt_pin, button_pin, options=None, steps_per_option=4, clock=None):
         self.name = name
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.event_queue = event_queue
         self.clk_pin = clk_pin
         self.dt_pin = dt_pin
@@ -36,10 +38,10 @@ class RotaryEncoderController:
             # Check for button press
             button_state = GPIO.input(self.button_pin)
             if not button_state:
-                event = InputEvent(self.name, self.options[self.current_index], {"name": self.name})
+                event = InputEvent(self.name, self.options[self.current_index], {"name": self.name}, timestamp=self.clock.now())
                 self.event_queue.put(event)
                 print(f"[{self.name}] Button pressed. Selected: {self.options[self.current_index]}")
-                time.sleep(0.3)
+                self.clock.sleep(0.3)
             
             # Rotation logic
             clk_current_state = GPIO.input(self.clk_pin)
@@ -56,16 +58,16 @@ class RotaryEncoderController:
                 if self.step_counter >= self.steps_per_option:
                     self.current_index = (self.current_index + 1) % len(self.options)
                     self.step_counter = 0  # Reset counter
-                    event = InputEvent("encoder_rotation", self.options[self.current_index], {"name": self.name})
+                    event = InputEvent("encoder_rotation", self.options[self.current_index], {"name": self.name}, timestamp=self.clock.now())
                     print(f"{Style.DIM}[{self.name}] Rotated: {direction}. {Style.DIM}{Style.NORMAL}New selection: {self.options[self.current_index]}{Style.RESET_ALL}")
                 elif self.step_counter <= -self.steps_per_option:
                     self.current_index = (self.current_index - 1) % len(self.options)
                     self.step_counter = 0  # Reset counter
-                    event = InputEvent("encoder_rotation", self.options[self.current_index], {"name": self.name})
+                    event = InputEvent("encoder_rotation", self.options[self.current_index], {"name": self.name}, timestamp=self.clock.now())
                     print(f"{Style.DIM}[{self.name}] Rotated: {direction}. {Style.DIM}{Style.NORMAL}New selection: {self.options[self.current_index]}{Style.RESET_ALL}")
             
             self.clk_last_state = clk_current_state
-            time.sleep(0.001)
+            self.clock.sleep(0.001)
 
     def start(self):
         if not self.running:
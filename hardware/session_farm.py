@@ -0,0 +1,146 @@
+# session_farm.py
+
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from colorama import Fore, Style
+
+from filename_service import FileNameService
+from device_configs import DEVICE_CONFIGS
+from game_config_compiler import GameConfigCompiler
+from game_simulator import (
+    SimulatedGameSequence, device_event_space, solution_script, noisy_script
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Per-process state for pool workers (set by _init_worker)
+_worker_state = {}
+
+
+def _init_worker(base_dir: str, quiet: bool):
+    """Builds the shared, read-only pieces once per worker process."""
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+    _worker_state["file_service"] = FileNameService(base_dir)
+    _worker_state["compiler"] = GameConfigCompiler(DEVICE_CONFIGS)
+    _worker_state["event_space"] = device_event_space(DEVICE_CONFIGS)
+
+
+def run_session(game_name: str, seed: int, noise: float = 0.3) -> dict:
+    """
+    Plays one complete session against a scripted player. Every session owns its
+    virtual clock, input queue, audio sink and output manager; only the compiled
+    (read-only) game config is shared.
+
+    Returns:
+        dict: {"game", "seed", "won", "events", "virtual_seconds", "cpu_seconds"}
+    """
+    file_service = _worker_state["file_service"]
+    compiler = _worker_state["compiler"]
+    config = compiler.load(file_service.get_game_json_path(game_name))
+
+    rng = random.Random(seed)
+    script, _ = solution_script(config, _worker_state["event_space"], think_time=rng.uniform(1.0, 6.0))
+    script = noisy_script(script, _worker_state["event_space"], rng, noise=noise)
+
+    start = time.thread_time()
+    game = SimulatedGameSequence(
+        config_path=file_service.get_game_json_path(game_name),
+        game_name=game_name,
+        file_service=file_service,
+        script=script,
+        compiler=compiler,
+        quiet=True,
+    )
+    won = game.run_sequence()
+    return {
+        "game": game_name,
+        "seed": seed,
+        "won": won,
+        "events": game.input_queue.delivered,
+        "virtual_seconds": game.clock.now(),
+        "cpu_seconds": time.thread_time() - start,
+    }
+
+
+class SessionFarm:
+    """Runs many independent simulated sessions on a thread or process pool."""
+
+    def __init__(self, game_names: list[str], workers: int = os.cpu_count(), mode: str = "process", base_dir: str = BASE_DIR):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown farm mode '{mode}' (use 'thread' or 'process').")
+        self.game_names = game_names
+        self.workers = workers
+        self.mode = mode
+        self.base_dir = base_dir
+
+    def run(self, sessions: int, seed: int = 0) -> dict:
+        """
+        Plays `sessions` sessions, round-robin over the games.
+
+        Returns:
+            dict: Throughput summary (events/s, sessions/s, sessions per core, ...).
+        """
+        jobs = [(self.game_names[i % len(self.game_names)], seed + i) for i in range(sessions)]
+        wall_start = time.perf_counter()
+
+        if self.mode == "process":
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.base_dir, True))
+            with executor:
+                results = list(executor.map(run_session, *zip(*jobs), chunksize=max(1, sessions // (self.workers * 4))))
+        else:
+            # Threads share this process and its stdout; the sessions themselves are quiet
+            _init_worker(self.base_dir, quiet=False)
+            with ThreadPoolExecutor(self.workers) as executor:
+                results = list(executor.map(run_session, *zip(*jobs)))
+
+        wall_seconds = time.perf_counter() - wall_start
+        events = sum(r["events"] for r in results)
+        cpu_seconds = sum(r["cpu_seconds"] for r in results)
+        return {
+            "sessions": sessions,
+            "workers": self.workers,
+            "mode": self.mode,
+            "won": sum(r["won"] for r in results),
+            "events": events,
+            "wall_seconds": wall_seconds,
+            "events_per_second": events / wall_seconds if wall_seconds else 0.0,
+            "sessions_per_second": sessions / wall_seconds if wall_seconds else 0.0,
+            # How many real-time boxes one core could drive (CPU per session vs. its play time)
+            "sessions_per_core": sum(r["virtual_seconds"] for r in results) / cpu_seconds if cpu_seconds else 0.0,
+            "virtual_play_hours": sum(r["virtual_seconds"] for r in results) / 3600,
+        }
+
+
+# Load test: python session_farm.py --sessions 1000 --workers 4 --mode process
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many simulated QuestBox sessions to measure engine throughput.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--mode", choices=["thread", "process"], default="process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("games", nargs="*", help="Game names (default: every available game)")
+    args = parser.parse_args()
+
+    file_service = FileNameService(BASE_DIR)
+    game_names = args.games
+    if not game_names:
+        with open(os.path.join(file_service.get_game_folder_path(""), 'available_games.txt'), 'r') as f:
+            game_names = [line.strip().lower() for line in f if line.strip()]
+
+    # Compile once up front so workers only ever read the cache
+    compiler = GameConfigCompiler(DEVICE_CONFIGS)
+    for game_name in game_names:
+        compiler.load(file_service.get_game_json_path(game_name))
+
+    summary = SessionFarm(game_names, workers=args.workers, mode=args.mode).run(args.sessions, seed=args.seed)
+    print(f"{Fore.BLUE}--- Session Farm ({summary['mode']}, {summary['workers']} workers) ---{Style.RESET_ALL}")
+    print(f"Sessions:            {summary['sessions']} ({summary['won']} won)")
+    print(f"Wall time:           {summary['wall_seconds']:.2f} s for {summary['virtual_play_hours']:.1f} h of play")
+    print(f"Events/second:       {summary['events_per_second']:.0f}")
+    print(f"Sessions/second:     {summary['sessions_per_second']:.1f}")
+    print(f"Boxes per core:      {summary['sessions_per_core']:.0f} (real-time sessions one core could drive)")
@@ -1,206 +1,333 @@
-# # sound_controller.py
-
-# import pygame
-# import os
-# import time
-# from colorama import Fore, Style
-# from pathlib import Path
-# from filename_service import FileNameService 
-
-# class SoundController:
-#     def __init__(self, file_service):
-#         self.file_service = file_service
-#         self.device_name = "plughw:8,0" # Define your audio device here
-#         self._is_initialized = False
-        
-#         # Initialize the mixer specifically. 
-#         # pygame.init() must have been called beforehand.
-#         try:
-#             pygame.mixer.init(frequency=44100, devicename=self.device_name)
-#             self._is_initialized = True
-#             print(f"SoundController: Pygame mixer initialized successfully on {self.device_name}.")
-#         except pygame.error as e:
-#             print(f"SoundController Error: Failed to initialize mixer: {e}")
-#             self._is_initialized = False
-
-#     def set_effect(self, type_prefix: str, path_name: str, game_name: str, loop: bool = False):
-#         if not self._is_initialized:
-#             print("SoundController: Mixer not initialized, skipping playback.")
-#             return
-
-#         # 1. Logic to get the file path (using self.file_service)
-#         try:
-#             file_name = self.file_service.get_audio_filename(type_prefix, path_name)
-#             folder = self.file_service.get_audio_folder_path(game_name)
-#             path = Path(folder) / file_name
-            
-#             if not path.exists():
-#                 print(f"SoundController Error: File not found: {path}")
-#                 return
-
-#             # 2. Play the sound (actual Pygame calls)
-#             # -1 for infinite loop, 0 for once
-#             pygame.mixer.music.stop()
-#             pygame.mixer.music.load(str(path))
-#             pygame.mixer.music.play(-1 if loop else 0)
-#             print(f"SoundController: Playing {path.name} (Loop: {loop})")
-#         except Exception as e:
-#             print(f"SoundController Playback Error: {e}")
-
-#     # Add a stop/cleanup method for the output manager to use
-#     def stop(self):
-#         if self._is_initialized:
-#             pygame.mixer.music.stop()
-#             # Note: pygame.quit() is handled by main.py
-#             print("SoundController: Music stopped.")
-            
-#             # # sound_controller.py
-
-# # import pygame
-# # import os
-# # import time
-# # from colorama import Fore, Style
-# # from pathlib import Path
-# # from filename_service import FileNameService 
-
-# # try:
-# #     pygame.mixer.init()
-# # except Exception as e:
-# #     print(f"{Fore.RED}FATAL ERROR: Could not initialize Pygame Mixer: {e}. Sound will not work.{Style.RESET_ALL}")
-
-
-# # class SoundController:
-# #     """
-# #     Controller for playing audio files using pygame.mixer.
-# #     It is designed to be run from the OutputManager's worker thread.
-# #     """
-# #     def __init__(self, file_service: FileNameService):
-# #         self.file_service = file_service
-# #         # Check if the mixer is ready
-# #         if not pygame.mixer.get_init():
-# #             print(f"{Fore.RED}SoundController initialized but Pygame Mixer is NOT running.{Style.RESET_ALL}")
-        
-# #     def start(self):
-# #         """Placeholder for consistency with other controllers. Mixer is already running."""
-# #         print(f"{Style.DIM}SoundController is ready.{Style.RESET_ALL}")
-
-# #     def stop(self):
-# #         """Stops any currently playing music."""
-# #         pygame.mixer.music.stop()
-# #         print(f"{Fore.RED}SoundController stopped.{Style.RESET_ALL}")
-    
-# #     # sound_controller.py
-
-# #     def set_effect(self, type_prefix: str, path_name: str, game_name: str, loop: bool = False, **kwargs):
-# #         """
-# #         Plays the audio file by using the FileNameService to build the path.
-# #         """
-# #         # --- DEBUG: Show what was received ---
-# #         print(f"{Fore.CYAN}--- SoundController: Received command ---{Style.RESET_ALL}")
-# #         print(f"{Fore.CYAN}  - type_prefix: {type_prefix}{Style.RESET_ALL}")
-# #         print(f"{Fore.CYAN}  - path_name:   {path_name}{Style.RESET_ALL}")
-# #         print(f"{Fore.CYAN}  - game_name:   {game_name}{Style.RESET_ALL}")
-# #         # --- END DEBUG ---
-
-# #         audio_file_name = self.file_service.get_audio_filename(type_prefix, path_name)
-# #         audio_folder = self.file_service.get_audio_folder_path(game_name)
-# #         full_path = Path(os.path.join(audio_folder, audio_file_name))
-        
-# #         file_path_object = full_path.resolve()
-
-# #         # --- DEBUG: Show the calculated path ---
-# #         print(f"{Fore.CYAN}  - Calculated Filename: {audio_file_name}{Style.RESET_ALL}")
-# #         print(f"{Fore.CYAN}  - Final Absolute Path: {file_path_object}{Style.RESET_ALL}")
-# #         # --- END DEBUG ---
-        
-# #         if not file_path_object.exists():
-# #             print(f"{Fore.RED}Sound Error: File not found at path: {file_path_object}{Style.RESET_ALL}")
-# #             return
-        
-# #         if not pygame.mixer.get_init():
-# #             print(f"{Fore.RED}Sound Error: Pygame Mixer is not initialized.{Style.RESET_ALL}")
-# #             return
-            
-# #         try:
-# #             pygame.mixer.music.stop()
-# #             pygame.mixer.music.load(str(file_path_object))
-# #             print(f"{Fore.CYAN}  - Pygame: File loaded successfully.{Style.RESET_ALL}") # <-- DEBUG
-            
-# #             loop_count = -1 if loop else 0 
-# #             pygame.mixer.music.play(loop_count)
-# #             print(f"{Fore.GREEN}🔊 Playing sound: {file_path_object.name}{Style.RESET_ALL}") # <-- DEBUG
-
-# #         except pygame.error as e:
-# #             print(f"{Fore.RED}Pygame Playback Error: {e} for file {file_path_object}{Style.RESET_ALL}")
-# #         except Exception as e:
-# #             print(f"{Fore.RED}Unexpected Sound Error: {e}{Style.RESET_ALL}")
-
-# # if __name__ == "__main__":
-# #     print(f"{Fore.YELLOW}--- SoundController Test Started ---{Style.RESET_ALL}")
-
-# #     # --- Configuration ---
-# #     BASE_DIR = Path(__file__).parent.parent
-# #     TEST_GAME_NAME = "the-curse-of-the-krakens-chest"
-# #     TEST_PATH_NAME = "the_siren's_song"
-# #     TEST_TYPE = "description"
-    
-# #     # --- Dependencies ---
-# #     # This is a simple "mock" of your service for testing purposes.
-# #     # This ensures the test can run even without the full FileNameService implementation.
-# #     class MockFileNameService:
-# #         def __init__(self, base_dir):
-# #             self.base_dir = Path(base_dir)
-# #         def get_audio_filename(self, type_prefix, path_name):
-# #             # Simplified version of your service's logic
-# #             # clean_path = path_name.replace("'", "").replace(" ", "_")
-# #             return f"{type_prefix}_{path_name}.mp3"
-# #         def get_audio_folder_path(self, game_name):
-# #             return str(self.base_dir / "games" / game_name / "audio")
-
-# #     file_service = MockFileNameService(str(BASE_DIR))
-
-# #     # --- Pre-Test File Check ---
-# #     TEST_FILENAME = file_service.get_audio_filename(TEST_TYPE, TEST_PATH_NAME)
-# #     TEST_AUDIO_PATH = Path(file_service.get_audio_folder_path(TEST_GAME_NAME)) / TEST_FILENAME
-
-# #     if not TEST_AUDIO_PATH.exists():
-# #         print(f"{Fore.RED}FATAL TEST ERROR: Test audio file not found!{Style.RESET_ALL}")
-# #         print(f"Please ensure a file exists at path: {TEST_AUDIO_PATH.resolve()}{Style.RESET_ALL}")
-# #     else:
-# #         # Initialize Controller
-# #         controller = SoundController(file_service=file_service)
-        
-# #         # --- Test 1: Single Playback (Blocking) ---
-# #         print("\n--- Test 1: Single Playback (Waiting for finish) ---")
-# #         controller.set_effect(
-# #             type_prefix=TEST_TYPE,
-# #             path_name=TEST_PATH_NAME,
-# #             game_name=TEST_GAME_NAME,
-# #             loop=False
-# #         )
-        
-# #         # IMPROVEMENT: Wait intelligently until the sound is done.
-# #         print("Waiting for sound to finish...")
-# #         while pygame.mixer.music.get_busy():
-# #             time.sleep(0.1) # Check every 100ms
-# #         print("Sound has finished playing.")
-
-# #         # --- Test 2: Looping Playback (Stop after 3 seconds) ---
-# #         print("\n--- Test 2: Looping Playback (Stopping manually) ---")
-# #         controller.set_effect(
-# #             type_prefix=TEST_TYPE,
-# #             path_name=TEST_PATH_NAME,
-# #             game_name=TEST_GAME_NAME,
-# #             loop=True
-# #         )
-        
-# #         print("Waiting 3 seconds while looping...")
-# #         time.sleep(3) 
-# #         controller.stop()
-# #         print("Looping sound stopped.")
-        
-# #     print(f"\n{Fore.YELLOW}--- SoundController Test Finished ---{Style.RESET_ALL}")
-
-# #     # THE MOST IMPORTANT FIX: Cleanly shut down Pygame and release the audio device.
-# #     print("Shutting down Pygame mixer...")
-# #     pygame.quit()
\ No newline at end of file
+# sound_controller.py
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from colorama import Fore, Style
+
+from clock import SYSTEM_CLOCK
+from audio_cache import AudioAssetCache
+from audio_engine import AudioEngine, PlaylistEntry
+from audio_stream import AudioStream
+from audio_prefetcher import NarrationPrefetcher
+from audio_transcoder import playable_path
+
+# Assumes your 'sfx' folder is at the root of the 'quest-box' project
+SFX_DIR = os.path.join(os.path.dirname(__file__), "..", "sfx")
+SFX_FILES = {
+    "correct": "rightanswer.mp3",
+    "wrong": "wronganswer.mp3",
+    "victory": "victory.mp3",
+}
+
+
+class SoundRequest:
+    """A queued audio command. `future` resolves True once the clip played to the end."""
+    def __init__(self, kind: str, params: dict):
+        # "narration", "playlist", "stream", "hint", "sfx", "cue", "preload", "enter_path",
+        # "skip_narration", "stop_narration" or "stop_all"
+        self.kind = kind
+        self.params = params
+        self.future = Future()
+
+    def __repr__(self):
+        return f"SoundRequest({self.kind!r}, {self.params!r})"
+
+
+class SoundController:
+    """
+    The "sound" actuator of the OutputManager. set_effect() only enqueues; a worker
+    thread resolves files, decodes (through the AudioAssetCache) and plays (through
+    the AudioEngine), so the game thread never touches the SD card or the decoder.
+
+    The pending queue is bounded and applies preemption rules before anything plays:
+    a new hint or narration replaces one still waiting, victory drops everything
+    else, and a hint or narration identical to the previous request within
+    DEDUP_WINDOW is merged (sfx and control requests always go through).
+    """
+
+    MAX_PENDING = 8
+    # Identical replays closer together than this are treated as one (e.g. a bouncing hint button)
+    DEDUP_WINDOW = 0.5
+    DEDUP_KINDS = ("hint", "narration")
+
+    def __init__(self, file_service, engine: AudioEngine = None, cache: AudioAssetCache = None, clock=None, max_pending: int = MAX_PENDING):
+        self.file_service = file_service
+        self.clock = clock if clock else SYSTEM_CLOCK
+        self.cache = cache if cache else AudioAssetCache()
+        self.engine = engine if engine else AudioEngine(self.cache, self.clock)
+        self.prefetcher = NarrationPrefetcher(file_service, self.cache)
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.last_request = None  # (kind, params, time, future) of the last accepted request
+        self.generation = None    # AudioGenerationJob of a game whose clips are still being generated
+        self.waiting = []         # requests parked until their clip is generated
+        self.running = False
+        self.worker_thread = None
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self.worker_thread.start()
+
+    def stop(self):
+        """Stops the worker and silences every channel."""
+        with self.condition:
+            self.running = False
+            self._drop(lambda request: True)
+            self.condition.notify()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=1)
+        self.engine.stop()
+        print("SoundController: stopped.")
+
+    # -------- Called from the game thread (all non-blocking) --------
+    def set_effect(self, type_prefix: str = None, path_name: str = None, game_name: str = None,
+                   sfx: str = None, file: str = None, loop: bool = False, fallback_prefix: str = None) -> Future:
+        """
+        Queues one of:
+            narration - type_prefix/path_name/game_name (hints and hint clues play on the
+                        hint channel); fallback_prefix is played if that clip doesn't exist
+            sfx       - sfx='correct' | 'wrong' | 'victory'
+            cue       - file=<path of a sound effect>, optionally looping
+
+        Returns:
+            Future: Resolves True when the clip finished playing, False otherwise.
+        """
+        if sfx:
+            return self._enqueue("sfx", {"sfx": sfx})
+        if file:
+            return self._enqueue("cue", {"file": str(file), "loop": loop})
+        kind = "hint" if type_prefix.startswith("hint") else "narration"
+        return self._enqueue(kind, {"type_prefix": type_prefix, "path_name": path_name, "game_name": game_name,
+                                    "fallback_prefix": fallback_prefix})
+
+    def play_playlist(self, clips: list[tuple], gap: float = 0.0) -> list[PlaylistEntry]:
+        """
+        Queues narration clips [(type_prefix, path_name, game_name), ...] to play back
+        to back on the narration channel, `gap` seconds of silence apart.
+
+        Returns:
+            list[PlaylistEntry]: One per clip; each entry's future resolves when that
+            clip ends and its started_at / ended_at are filled in.
+        """
+        entries = [PlaylistEntry() for _ in clips]
+        self._enqueue("playlist", {"clips": list(clips), "entries": entries, "gap": gap})
+        return entries
+
+    def play_stream(self, stream: AudioStream) -> Future:
+        """
+        Queues narration that is still arriving (e.g. TTS audio while it downloads);
+        it starts on the narration channel as soon as the stream's prebuffer is filled.
+
+        Returns:
+            Future: Resolves True once the whole stream played.
+        """
+        return self._enqueue("stream", {"stream": stream})
+
+    def set_generation(self, job):
+        """
+        Plays a game while its audio is still being generated: a request whose clip
+        the job hasn't produced yet waits (off the queue) until it has, instead of
+        failing. Other sounds keep playing meanwhile.
+        """
+        self.generation = job
+
+    def preload(self, game_name: str, config: dict):
+        """Queues decoding of the sound effects, the starting description and the first path(s)."""
+        self._enqueue("preload", {"game_name": game_name, "config": config})
+
+    def enter_path(self, path_index: int):
+        """Tells the prefetcher which path is playing, so it can stage the next one."""
+        self._enqueue("enter_path", {"path_index": path_index})
+
+    def skip_narration(self):
+        """Cuts the current narration clip; a playlist continues with its next clip."""
+        self._enqueue("skip_narration", {})
+
+    def stop_narration(self):
+        self._enqueue("stop_narration", {})
+
+    def stop_all(self):
+        self._enqueue("stop_all", {})
+
+    def _enqueue(self, kind: str, params: dict) -> Future:
+        self.start()
+        now = self.clock.now()
+        with self.condition:
+            if self.last_request and kind in self.DEDUP_KINDS:
+                last_kind, last_params, last_time, last_future = self.last_request
+                if (kind, params) == (last_kind, last_params) and now - last_time < self.DEDUP_WINDOW:
+                    return last_future
+
+            request = SoundRequest(kind, params)
+            if kind in ("narration", "playlist", "stream"):
+                # Only the newest narration is worth playing
+                self._drop(lambda pending: pending.kind in ("narration", "playlist", "stream"))
+            elif kind == "hint":
+                self._drop(lambda pending: pending.kind == "hint")
+            elif kind == "stop_narration":
+                self._drop(lambda pending: pending.kind in ("narration", "playlist", "stream"))
+            elif kind == "stop_all" or (kind == "sfx" and params["sfx"] == "victory"):
+                self._drop(lambda pending: pending.kind not in ("preload", "enter_path"))
+
+            if len(self.pending) >= self.max_pending:
+                dropped = self.pending.popleft()
+                self._resolve_dropped(dropped)
+                print(f"{Fore.YELLOW}SoundController: queue full, dropped {dropped}.{Style.RESET_ALL}")
+
+            self.pending.append(request)
+            self.last_request = (kind, params, now, request.future)
+            self.condition.notify()
+            return request.future
+
+    def _drop(self, predicate):
+        """Removes (and resolves False) pending and waiting requests matching `predicate` (lock held)."""
+        kept = deque()
+        for request in self.pending:
+            if predicate(request):
+                self._resolve_dropped(request)
+            else:
+                kept.append(request)
+        self.pending = kept
+        for request in [request for request in self.waiting if predicate(request)]:
+            self.waiting.remove(request)
+            self._resolve_dropped(request)
+
+    def _wait_for_clips(self, request: SoundRequest, paths: list) -> bool:
+        """Parks `request` if any of its clips is still being generated; True if it was parked."""
+        generation = self.generation
+        if not generation:
+            return False
+        with self.condition:
+            self.waiting.append(request)
+        if generation.when_ready(paths, lambda: self._resume(request)):
+            print(f"{Style.DIM}Waiting for generated audio: {Path(paths[0]).name}{Style.RESET_ALL}")
+            return True
+        with self.condition:
+            if request not in self.waiting:
+                return True  # dropped meanwhile (already resolved)
+            self.waiting.remove(request)
+        return False
+
+    def _resume(self, request: SoundRequest):
+        """Puts a parked request back at the front of the queue once its clips exist."""
+        with self.condition:
+            if request not in self.waiting:
+                return  # dropped meanwhile
+            self.waiting.remove(request)
+            self.pending.appendleft(request)
+            self.condition.notify()
+
+    @staticmethod
+    def _resolve_dropped(request: SoundRequest):
+        for entry in request.params.get("entries", []):
+            if not entry.future.done():
+                entry.future.set_result(False)
+        if not request.future.done():
+            request.future.set_result(False)
+
+    # -------- Worker thread --------
+    def _worker(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                request = self.pending.popleft()
+            try:
+                self._handle(request)
+            except Exception as e:
+                print(f"{Fore.RED}SoundController Playback Error: {e}{Style.RESET_ALL}")
+                self._resolve_dropped(request)
+
+    def _handle(self, request: SoundRequest):
+        params = request.params
+        if request.kind == "preload":
+            self.cache.preload([playable_path(Path(SFX_DIR) / file_name) for file_name in SFX_FILES.values()])
+            self.prefetcher.plan(params["game_name"], params["config"])
+            self.prefetcher.start()
+            request.future.set_result(True)
+        elif request.kind == "enter_path":
+            self.prefetcher.enter_path(params["path_index"])
+            request.future.set_result(True)
+        elif request.kind == "playlist":
+            if self._wait_for_clips(request, [self._clip_path(*clip) for clip in params["clips"]]):
+                return
+            entries = []
+            for (type_prefix, path_name, game_name), entry in zip(params["clips"], params["entries"]):
+                path = self._resolve(type_prefix, path_name, game_name)
+                if path:
+                    entry.path = str(path)
+                    entries.append(entry)
+                else:
+                    entry.future.set_result(False)
+            if not entries:
+                request.future.set_result(False)
+                return
+            self._chain(self.engine.play_playlist("narration", entries, gap=params["gap"]), request)
+        elif request.kind == "stream":
+            self._chain(self.engine.play_stream("narration", params["stream"]), request)
+        elif request.kind == "skip_narration":
+            self.engine.skip("narration")
+            request.future.set_result(True)
+        elif request.kind == "stop_narration":
+            self.engine.stop_channel("narration")
+            request.future.set_result(True)
+        elif request.kind == "stop_all":
+            self.engine.stop_all()
+            request.future.set_result(True)
+        elif request.kind == "sfx":
+            file_name = SFX_FILES.get(params["sfx"])
+            if not file_name:
+                print(f"{Fore.YELLOW}SoundController: unknown sound effect '{params['sfx']}'.{Style.RESET_ALL}")
+                request.future.set_result(False)
+                return
+            if params["sfx"] == "victory":
+                self.engine.stop_all()
+            self._chain(self.engine.play("sfx", playable_path(os.path.join(SFX_DIR, file_name))), request)
+        elif request.kind == "cue":
+            path = Path(params["file"])
+            if not path.exists():
+                print(f"{Style.DIM}Audio cue not available: {path.name}{Style.RESET_ALL}")
+                request.future.set_result(False)
+                return
+            self._chain(self.engine.play("ambience", playable_path(path), loop=params["loop"]), request)
+        else:
+            if self._wait_for_clips(request, [self._clip_path(params["type_prefix"], params["path_name"], params["game_name"])]):
+                return
+            path = None
+            if params["fallback_prefix"]:
+                path = playable_path(self._clip_path(params["type_prefix"], params["path_name"], params["game_name"]))
+                if not path.exists():
+                    print(f"{Style.DIM}No {params['type_prefix']} clip, playing {params['fallback_prefix']} instead.{Style.RESET_ALL}")
+                    path = self._resolve(params["fallback_prefix"], params["path_name"], params["game_name"])
+            else:
+                path = self._resolve(params["type_prefix"], params["path_name"], params["game_name"])
+            if not path:
+                request.future.set_result(False)
+                return
+            self._chain(self.engine.play("hint" if request.kind == "hint" else "narration", path), request)
+
+    @staticmethod
+    def _chain(engine_future: Future, request: SoundRequest):
+        engine_future.add_done_callback(lambda f: request.future.set_result(f.result()))
+
+    def _clip_path(self, type_prefix: str, path_name: str, game_name: str) -> Path:
+        file_name = self.file_service.get_audio_filename(type_prefix, path_name)
+        return Path(self.file_service.get_audio_folder_path(game_name)) / file_name
+
+    def _resolve(self, type_prefix: str, path_name: str, game_name: str):
+        """Returns the clip's (preferably transcoded) path, or None (and reports it) if it doesn't exist."""
+        path = playable_path(self._clip_path(type_prefix, path_name, game_name))
+        if not path.exists():
+            print(f"{Fore.RED}Audio Error: File not found: {path}{Style.RESET_ALL}")
+            return None
+        return path
@@ -2,15 +2,19 @@ import RPi.GPIO as GPIO
 import time
 import threading
 from colorama import Fore, Style
+from clock import SYSTEM_CLOCK
 
 # Constants
 VIBRATION_PIN = 17
 
 class VibrationController:
     """Controls a set of vibration motors connected to a single GPIO pin."""
-    def __init__(self, pin=VIBRATION_PIN):
+    def __init__(self, pin=VIBRATION_PIN, clock=None):
         self.pin = pin
+        self.clock = clock if clock else SYSTEM_CLOCK
         self.lock = threading.Lock()
+        # Guards the pin, so an effect that was just superseded can't switch it after its successor
+        self.pin_lock = threading.Lock()
         
         GPIO.setmode(GPIO.BCM)
         GPIO.setup(self.pin, GPIO.OUT)
@@ -18,27 +22,34 @@ class VibrationController:
         self.effect_thread = None
         self.stop_event = threading.Event()
 
-    def _vibrate_effect(self, duration):
+    def _output(self, level, stop_event):
+        """Drives the pin, unless this effect has been stopped (a newer one owns the pin then)."""
+        with self.pin_lock:
+            if not stop_event.is_set():
+                GPIO.output(self.pin, level)
+
+    def _vibrate_effect(self, duration, stop_event):
         """A simple, continuous vibration effect."""
         print(f"{Style.DIM}Starting vibration effect for {duration} seconds...{Style.RESET_ALL}")
-        GPIO.output(self.pin, GPIO.HIGH)
-        time.sleep(duration)
-        GPIO.output(self.pin, GPIO.LOW)
+        self._output(GPIO.HIGH, stop_event)
+        # Wait on the stop event so a newer effect can cut this one short
+        self.clock.wait(stop_event, duration)
+        self._output(GPIO.LOW, stop_event)
 
-    def _rattle_effect(self, duration, interval=0.1):
+    def _rattle_effect(self, duration, stop_event, interval=0.1):
         """A rattling effect by pulsing the motors."""
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            GPIO.output(self.pin, GPIO.HIGH)
-            time.sleep(interval)
+        start_time = self.clock.now()
+        while self.clock.now() - start_time < duration:
+            self._output(GPIO.HIGH, stop_event)
+            self.clock.sleep(interval)
             
-            if self.stop_event.is_set():
+            if stop_event.is_set():
                 break
                 
-            GPIO.output(self.pin, GPIO.LOW)
-            time.sleep(interval)
+            self._output(GPIO.LOW, stop_event)
+            self.clock.sleep(interval)
         
-        GPIO.output(self.pin, GPIO.LOW)
+        self._output(GPIO.LOW, stop_event)
 
     def stop(self):
         """Signals the currently running effect to stop."""
@@ -49,15 +60,17 @@ class VibrationController:
 
     def set_effect(self, mode: str, duration: float, **params):
         """
-        Sets a new vibration effect.
+        Sets a new vibration effect. Doesn't wait for the previous effect's thread
+        (the CueTimeline calls this on its timing thread): that effect is stopped,
+        can no longer touch the pin, and winds down on its own.
         """
-        # Ensure only one thread runs at a time
         with self.lock:
-            # Check if an old thread is still running
-            if self.effect_thread and self.effect_thread.is_alive():
-                self.stop()
-                self.effect_thread.join(timeout=1)
-                self.stop_event.clear()
+            # Only signal it (stop() would also release the GPIO pin)
+            with self.pin_lock:
+                self.stop_event.set()
+                GPIO.output(self.pin, GPIO.LOW)
+            # Every effect gets its own stop event, so stopping this one can't be undone by clearing it
+            self.stop_event = threading.Event()
 
             # Select the new effect function
             if mode == "vibrate":
@@ -71,7 +84,7 @@ class VibrationController:
             # Start the new effect thread
             self.effect_thread = threading.Thread(
                 target=target_func,
-                args=(duration,),
+                args=(duration, self.stop_event),
                 kwargs=params,
                 daemon=True
             )
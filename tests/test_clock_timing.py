@@ -0,0 +1,135 @@
+# test_clock_timing.py
+"""
+Debounce -> input -> path timeout on a VirtualClock: button presses are read
+through the SX1509's debouncing and fed to a GameSequence, and 10 s path timers
+run out without any real waiting.
+"""
+
+import sys
+import json
+import time
+import queue
+from pathlib import Path
+
+import pytest
+
+HARDWARE_DIR = Path(__file__).resolve().parent.parent / "hardware"
+sys.path.insert(0, str(HARDWARE_DIR))
+
+pytest.importorskip("smbus2")
+
+from clock import VirtualClock
+from input_event import InputEvent
+from filename_service import FileNameService
+from SX1509_IO_Extension import SX1509, DEBOUNCE_TIME
+from game_simulator import SimulatedGameSequence
+
+RED_PIN = 1
+# InputManager's polling interval
+POLL_INTERVAL = 0.05
+TIME_LIMIT = 10
+
+GAME = {
+    "title": "Clock Test",
+    "starting_description": "A test.",
+    "themes": ["haunted house"],
+    "paths": [{
+        "path_name": "The Two Buttons",
+        "description": "Press red, then blue.",
+        "hint": "Red // Blue",
+        "solution_sequence": [{"sensor": "button", "value": "red"}, {"sensor": "button", "value": "blue"}],
+        "audio_cue": "",
+        "effects": [],
+        "time_limit": TIME_LIMIT,
+        "death_text": "Too slow.",
+    }],
+}
+
+
+class PolledButtonQueue:
+    """
+    Stands in for the InputManager's queue: polls one SX1509 button every
+    POLL_INTERVAL of virtual time and reports a press (once, until it is released)
+    when the debounced pin reads low.
+    """
+
+    def __init__(self, clock: VirtualClock, sx1509: SX1509, pin: int, color: str):
+        self.clock = clock
+        self.sx1509 = sx1509
+        self.pin = pin
+        self.color = color
+        self.released = True
+        self.events = []
+
+    def get(self, timeout: float = None):
+        waited = 0.0
+        while True:
+            if self.sx1509.debounced_read_pin(self.pin) == 0:
+                if self.released:
+                    self.released = False
+                    event = InputEvent("button", self.color, timestamp=self.clock.now())
+                    self.events.append(event)
+                    return event
+            else:
+                self.released = True
+            if timeout is not None and waited >= timeout:
+                raise queue.Empty
+            step = POLL_INTERVAL if timeout is None else min(POLL_INTERVAL, timeout - waited)
+            self.clock.advance(step)
+            waited += step
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def empty(self) -> bool:
+        return True
+
+
+def button_levels(clock: VirtualClock, presses: list[tuple[float, float]]):
+    """A pin reading low (pressed) during each (start, end) of virtual time."""
+    def read_pin(pin):
+        return 0 if any(start <= clock.now() < end for start, end in presses) else 1
+    return read_pin
+
+
+def play(tmp_path, presses):
+    file_service = FileNameService(str(tmp_path))
+    game_path = Path(file_service.get_game_json_path("clock-test"))
+    game_path.parent.mkdir(parents=True)
+    game_path.write_text(json.dumps(GAME))
+
+    clock = VirtualClock()
+    sx1509 = SX1509(bus=None, clock=clock)  # no I2C bus is opened
+    sx1509.read_pin = button_levels(clock, presses)
+    game = SimulatedGameSequence(config_path=game_path, game_name="clock-test", file_service=file_service,
+                                 clock=clock)
+    game.input_queue = PolledButtonQueue(clock, sx1509, RED_PIN, "red")
+
+    started = time.perf_counter()
+    won = game.run_sequence()
+    return won, game, time.perf_counter() - started
+
+
+def test_debounced_press_then_path_timeout(tmp_path):
+    press_start = 5.0
+    won, game, wall_seconds = play(tmp_path, [(press_start, press_start + 0.5)])
+
+    # The press is only reported once the pin has been stable for the debounce time
+    events = game.input_queue.events
+    assert len(events) == 1
+    assert press_start + DEBOUNCE_TIME <= events[0].timestamp < press_start + DEBOUNCE_TIME + 2 * POLL_INTERVAL
+    assert any(kind == "sfx" and detail == "correct" for _, kind, detail in game.audio.log)
+
+    # Blue never comes: the path times out after its time limit of virtual time, in no real time
+    assert won is False
+    assert TIME_LIMIT < game.clock.now() < press_start + TIME_LIMIT + 5
+    assert wall_seconds < 2.0
+
+
+def test_bounce_shorter_than_debounce_time_is_ignored(tmp_path):
+    # A 60 ms contact bounce never settles long enough to count as a press
+    won, game, _ = play(tmp_path, [(5.0, 5.06)])
+
+    assert game.input_queue.events == []
+    assert won is False
+    assert game.clock.now() >= TIME_LIMIT
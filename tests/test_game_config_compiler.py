@@ -0,0 +1,55 @@
+# test_game_config_compiler.py
+"""
+Malformed AI-generated games must be rejected with a GameConfigError (which
+main.py catches), whatever the wrong types are, never with a TypeError.
+"""
+
+import sys
+import copy
+from pathlib import Path
+
+import pytest
+
+HARDWARE_DIR = Path(__file__).resolve().parent.parent / "hardware"
+sys.path.insert(0, str(HARDWARE_DIR))
+
+from game_config_compiler import GameConfigCompiler, GameConfigError
+
+GAME = {
+    "title": "Compiler Test",
+    "starting_description": "A test.",
+    "paths": [{
+        "path_name": "The Two Buttons",
+        "description": "Press red, then blue.",
+        "hint": "Red // Blue",
+        "solution_sequence": [{"sensor": "button", "value": "red"}, {"sensor": "button", "value": "blue"}],
+        "time_limit": 30,
+        "effects": [{"actuator": "vibration", "mode": "vibrate", "duration": 0.5}],
+    }],
+}
+
+
+def with_change(change):
+    game = copy.deepcopy(GAME)
+    change(game["paths"][0])
+    return game
+
+
+def test_valid_game_compiles():
+    compiled = GameConfigCompiler().compile(GAME)
+    assert compiled["paths"][0]["solution_sequence"][0] == {"sensor": "button", "value": "red"}
+
+
+@pytest.mark.parametrize("change, problem", [
+    (lambda path: path["solution_sequence"][0].update(sensor=["gyro"]), "'sensor' must be a string"),
+    (lambda path: path["solution_sequence"][0].update(sensor={"type": "gyro"}), "'sensor' must be a string"),
+    (lambda path: path["solution_sequence"][0].update(value=["red"]), "'value' must be a string"),
+    (lambda path: path["solution_sequence"][0].update(value={"color": "red"}), "'value' must be a string"),
+    (lambda path: path["effects"][0].update(actuator=["light"]), "'actuator' must be a string"),
+    (lambda path: path["effects"][0].update(duration=True), "'duration' must be a non-negative number"),
+    (lambda path: path.update(time_limit=True), "'time_limit' must be a positive number"),
+])
+def test_wrong_types_are_config_errors(change, problem):
+    with pytest.raises(GameConfigError) as error:
+        GameConfigCompiler().compile(with_change(change))
+    assert any(problem in message for message in error.value.errors)
@@ -0,0 +1,31 @@
+# test_game_schema.py
+"""
+A malformed model answer must come back from validate_game as problems (which
+_repair_game turns into a targeted repair request), never as an exception.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from geminiAPI.game_schema import validate_game, group_problems
+
+EXAMPLE_GAME = BASE_DIR / "games" / "the-phantoms-lullaby" / "the-phantoms-lullaby.json"
+
+
+def load_game() -> dict:
+    with open(EXAMPLE_GAME, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_wrong_types_are_problems_of_their_path():
+    game = load_game()
+    game["paths"][1]["solution_sequence"][0]["sensor"] = ["gyro"]
+    game["paths"][2]["solution_sequence"][0]["value"] = {"color": "red"}
+
+    path_problems, _ = group_problems(validate_game(game))
+    assert any("'sensor' must be a string" in problem for problem in path_problems[1])
+    assert any("'value' must be a string" in problem for problem in path_problems[2])
@@ -0,0 +1,59 @@
+# test_tts_store.py
+"""
+Producer ownership in the TTSStore: a caller that gave up waiting for a stuck
+producer must not release that producer's other waiters.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from elevenlabsAPI.tts_store import TTSStore
+
+
+def produce(store, tmp_path, key, name, token):
+    clip = tmp_path / name
+    clip.write_bytes(b"clip")
+    store.put(key, {".mp3": clip}, token)
+
+
+def test_timed_out_caller_does_not_release_the_producers_waiters(tmp_path):
+    store = TTSStore(tmp_path / "store", wait_timeout=0.05)
+    key = store.key("Hello", "voice", "model", "mp3")
+
+    hit, producer_token = store.lookup(key, {".mp3": tmp_path / "a.mp3"})
+    assert not hit
+
+    # Gives up on the stuck producer and synthesizes the clip itself
+    hit, token = store.lookup(key, {".mp3": tmp_path / "b.mp3"})
+    assert not hit
+    store.abandon(key, token)
+    assert key in store.producing
+
+    # Still waits for the real producer, then links its clip
+    waiter = {}
+    store.wait_timeout = 5
+    thread = threading.Thread(target=lambda: waiter.update(hit=store.lookup(key, {".mp3": tmp_path / "c.mp3"})[0]))
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()
+
+    produce(store, tmp_path, key, "a.mp3", producer_token)
+    thread.join(1)
+    assert waiter["hit"] and (tmp_path / "c.mp3").read_bytes() == b"clip"
+    assert key not in store.producing
+
+
+def test_put_prunes_only_over_the_cap(tmp_path):
+    store = TTSStore(tmp_path / "store", max_mb=8 / (1024 * 1024))  # 8 bytes: two 4-byte clips
+    keys = [store.key(text, "voice", "model", "mp3") for text in ("one", "two", "three")]
+    for index, key in enumerate(keys):
+        _, token = store.lookup(key, {".mp3": tmp_path / f"{index}.mp3"})
+        produce(store, tmp_path, key, f"{index}.mp3", token)
+
+    assert store.total_bytes == 8
+    stored = [path.name.split(".")[0] for path in (tmp_path / "store").glob("*/*")]
+    assert sorted(stored) == sorted(keys[1:])
@@ -0,0 +1,37 @@
+# test_tts_stream.py
+"""
+A stream that fails part-way (here: the disk) must still be closed with the
+error, so playback doesn't wait for it forever, and leave no half-written clip.
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "hardware"))
+
+from elevenlabsAPI.standin_server import ElevenLabsStandIn
+from elevenlabsAPI.tts_service import TTSService
+from elevenlabsAPI.tts_store import TTSStore
+from audio_stream import AudioStream
+import audio_transcoder
+
+
+def test_failed_write_closes_the_stream(tmp_path, monkeypatch):
+    def disk_full(self, pcm):
+        raise OSError("No space left on device")
+    monkeypatch.setenv("ELEVEN_API_KEY", "standin")
+    monkeypatch.setattr(audio_transcoder.NativeClipWriter, "write", disk_full)
+
+    standin = ElevenLabsStandIn(speed=50.0, first_byte_latency=0.0)
+    standin.start()
+    try:
+        service = TTSService(str(tmp_path), api_url=standin.url, store=TTSStore(tmp_path / "tts_store"))
+        stream = AudioStream()
+        assert service.stream_and_save_audio("Hello there.", "intro.mp3", "test-game", stream=stream) is None
+    finally:
+        standin.stop()
+
+    assert stream.closed and isinstance(stream.error, OSError)
+    assert not list((tmp_path / "games" / "test-game" / "audio").iterdir())